@@ -0,0 +1,592 @@
+"""Headless scheduling engine.
+
+Every scheduling policy used by the simulator lives here as a plain
+function that takes a workload and returns a schedule.  Nothing in this
+module imports tkinter, matplotlib or scikit-learn, so it can be used
+from scripts and batch workers without a display.
+
+A workload is either a ``workload.Workload`` or a list of process dicts
+with the keys ``pid``, ``arrival``, ``burst``, ``priority`` and ``type``.
+Every policy returns a ``workload.Schedule``: parallel start/end/row
+arrays that also behave as a sequence of Gantt slice dicts with ``pid``,
+``start``, ``end``, ``arrival`` and ``burst``.
+
+Each policy is implemented once, as a ``*_slices`` generator that pulls
+``(key, arrival, burst, priority)`` jobs in arrival order from any
+iterator and yields ``(key, start, end)`` slices.  Jobs are only pulled
+when the clock reaches them, so a generator can be fed from a trace that
+is much larger than memory (see ``traces.py``); the batch functions feed
+it from a ``Workload`` and collect the slices into a ``ScheduleLog``.
+
+Two costs can be switched on.  With ``switch_cost``, dispatching a
+different process than the one that last ran first spends that long
+switching; the switch is not interrupted, and arrivals during it can
+preempt only once it is done.  With I/O bursts, a process's CPU time is
+split into phases of at most ``cpu`` time units with ``io`` time units of
+I/O in between (``IO_PROFILES`` picks the pattern by process type).  The
+jobs then come through an ``IOQueue``, which hands each phase out as a
+job of its own and puts the next one back in the arrival stream once a
+first-come first-served I/O device is done with it, so the engines only
+need to report finished phases.
+"""
+import heapq
+import math
+from array import array
+from itertools import chain
+
+import numpy as np
+
+import instrument
+from workload import TYPE_NAMES, ScheduleLog, as_workload
+
+ALGORITHMS = [
+    "FCFS",
+    "SJF (Non-Preemptive)",
+    "SJF (Preemptive)",
+    "Priority (Non-Preemptive)",
+    "Priority (Preemptive)",
+    "Round Robin",
+    "Multilevel Feedback Queue"
+]
+
+DEFAULT_QUANTUM = 3
+
+# Only these policies take a time quantum
+QUANTUM_ALGORITHMS = ("Round Robin", "Multilevel Feedback Queue")
+
+# (CPU time between I/O requests, I/O time per request) by process type
+IO_PROFILES = {
+    "CPU-Bound": (50, 5),
+    "I/O-Bound": (4, 10),
+    "Interactive": (1, 20),
+}
+DEFAULT_IO_DEVICES = 1
+
+# Slices between progress callbacks in run_algorithm()
+PROGRESS_INTERVAL = 16384
+
+# Sentinel job returned once the job iterator is exhausted; its infinite
+# arrival time lets the loops compare against it without a None check.
+_END = (None, math.inf, 0, 0)
+
+
+class IOQueue:
+    """Job source that adds I/O bursts to the ``(key, arrival, burst,
+    priority)`` jobs of ``jobs``.
+
+    ``patterns[key]`` is the job's ``(cpu, io)`` burst pattern, or None
+    for no I/O.  Each job is handed out as its first CPU phase.  Once an
+    engine reports the phase done with ``complete``, the next phase waits
+    for the first free of ``devices`` I/O devices, takes ``io`` time units
+    there, and then comes back out as a job arriving at that time, after
+    the arrivals of the same instant.  Each request appends ``key, start,
+    end`` to the ``log`` array: the job is blocked from the end of its CPU
+    phase until the I/O is done.
+
+    While phases are out but nothing is queued, iterating yields
+    ``_END`` rather than stopping, so engines keep calling
+    ``next(jobs, _END)``.
+    """
+
+    def __init__(self, jobs, patterns, devices=DEFAULT_IO_DEVICES, log=None):
+        if devices < 1:
+            raise ValueError("Need at least one I/O device")
+        self.patterns = patterns
+        self.log = log
+        self.requests = 0
+        self._heap = []             # (time, 0 = arrival / 1 = I/O return, seq, job)
+        self._held = None           # heap key of the job handed out last
+        self._left = {}             # key -> [CPU time in later phases, priority, pattern]
+        self._devices = [0] * devices
+        self._seq = 0
+        self._jobs = self._pull(jobs)
+
+    def __iter__(self):
+        return self._jobs
+
+    def _pull(self, jobs):
+        heap = self._heap
+        left = self._left
+        patterns = self.patterns
+        for index, job in enumerate(jobs):
+            key, arrival, burst, priority = job
+            while heap and heap[0][:3] < (arrival, 0, index):
+                entry = heapq.heappop(heap)
+                self._held = entry[:3]
+                yield entry[3]
+            self._held = (arrival, 0, index)
+            pattern = patterns[key]
+            if pattern is not None and burst > pattern[0]:
+                left[key] = [burst - pattern[0], priority, pattern]
+                yield key, arrival, pattern[0], priority
+            else:
+                yield job
+        # Only I/O returns from here on
+        while heap or left:
+            if heap:
+                entry = heapq.heappop(heap)
+                self._held = entry[:3]
+                yield entry[3]
+            else:
+                self._held = None
+                yield _END
+
+    def complete(self, key, now, held=None):
+        """Report that ``key`` finished a CPU phase at ``now``.
+
+        ``held`` is the job the engine last took from the queue and has
+        not admitted yet (``_END`` if there was none).  The return value
+        takes its place: it is the next phase of ``key`` if that comes
+        back first.  Engines that hold no job leave ``held`` out.
+        """
+        state = self._left.get(key)
+        if state is None:
+            return held
+        left, priority, (cpu, io) = state
+        phase = cpu if cpu < left else left
+        if left > phase:
+            state[0] = left - phase
+        else:
+            del self._left[key]
+        done = max(now, heapq.heappop(self._devices)) + io
+        heapq.heappush(self._devices, done)
+        if self.log is not None:
+            self.log.extend((key, now, done))
+        self.requests += 1
+        order = (done, 1, self._seq)
+        self._seq += 1
+        job = (key, done, phase, priority)
+        if held is not None and (held is _END or order < self._held):
+            if held is not _END:
+                heapq.heappush(self._heap, (*self._held, held))
+            self._held = order
+            return job
+        heapq.heappush(self._heap, (*order, job))
+        return held
+
+
+def io_patterns(workload, io_profiles, order=None):
+    """Per-process ``(cpu, io)`` patterns from ``io_profiles`` by type name.
+
+    Types missing from ``io_profiles`` do no I/O.  ``order`` lists the
+    workload rows in the order of the result.
+    """
+    patterns = [io_profiles.get(name) for name in TYPE_NAMES]
+    for pattern in patterns:
+        if pattern is not None and (pattern[0] < 1 or pattern[1] < 0):
+            raise ValueError("I/O profiles need a CPU burst >= 1 and an I/O time >= 0")
+    codes = workload.type_code if order is None else workload.type_code[order]
+    return [patterns[code] for code in codes.tolist()]
+
+
+def io_intervals(log, order):
+    """``(io_intervals, blocked)`` of a schedule from an engine's I/O log.
+
+    ``log`` holds ``key, start, end`` triples keyed by position in
+    ``order``.  Returns them as an ``(n, 3)`` array of ``(row, start,
+    end)`` by workload row, and the total blocked time of each row.
+    """
+    if log:
+        intervals = np.frombuffer(log, dtype=np.int64).reshape(-1, 3).copy()
+    else:
+        intervals = np.empty((0, 3), dtype=np.int64)
+    intervals[:, 0] = order[intervals[:, 0]]
+    blocked = np.zeros(len(order), dtype=np.int64)
+    np.add.at(blocked, intervals[:, 0], intervals[:, 2] - intervals[:, 1])
+    return intervals, blocked
+
+
+def fcfs_slices(jobs, switch_cost=0):
+    io = jobs if isinstance(jobs, IOQueue) else None
+    current_time = 0
+    last = None
+
+    for key, arrival, burst, _ in jobs:
+        if current_time < arrival:
+            current_time = arrival
+        if switch_cost and key != last:
+            if last is not None:
+                current_time += switch_cost
+            last = key
+        end = current_time + burst
+        yield key, current_time, end
+        current_time = end
+        if io is not None:
+            io.complete(key, end)
+
+
+def sjf_slices(jobs, preemptive=False, switch_cost=0, counts=None):
+    # Event-driven: the next pending job feeds a heap keyed on remaining
+    # time, and the clock jumps straight to the next arrival or completion.
+    # Heap entries are (remaining, arrival sequence, key), so ties break
+    # on arrival order and keys are never compared.
+    io = jobs if isinstance(jobs, IOQueue) else None
+    ops = instrument.heap_ops(counts)
+    heappush, heappop = ops.heappush, ops.heappop
+    jobs = iter(jobs)
+    nxt = next(jobs, _END)
+    current_time = 0
+    ready_queue = []
+    seq = 0
+    last = None
+
+    while nxt is not _END or ready_queue:
+        # Idle CPU - jump to the next arrival
+        if not ready_queue and current_time < nxt[1]:
+            current_time = nxt[1]
+
+        # Admit everything that has arrived by now
+        while nxt[1] <= current_time:
+            heappush(ready_queue, (nxt[2], seq, nxt[0]))
+            seq += 1
+            nxt = next(jobs, _END)
+
+        remaining, order, key = heappop(ready_queue)
+        preempted = False
+        if switch_cost and key != last:
+            if last is not None:
+                # Arrivals during the switch queue up behind it
+                current_time += switch_cost
+                while nxt[1] <= current_time:
+                    heappush(ready_queue, (nxt[2], seq, nxt[0]))
+                    seq += 1
+                    nxt = next(jobs, _END)
+                # An arrival during the switch preempts as soon as it is done
+                preempted = preemptive and bool(ready_queue) and ready_queue[0][0] < remaining
+            last = key
+        start = current_time
+
+        if preemptive:
+            # Keep running until completion or until an arrival is shorter
+            # than what is left; arrivals that don't preempt extend the
+            # current slice instead of splitting it.
+            while not preempted and nxt[1] < current_time + remaining:
+                remaining -= nxt[1] - current_time
+                current_time = nxt[1]
+                while nxt[1] <= current_time:
+                    heappush(ready_queue, (nxt[2], seq, nxt[0]))
+                    seq += 1
+                    nxt = next(jobs, _END)
+                if ready_queue[0][0] < remaining:
+                    preempted = True
+
+        if preempted:
+            heappush(ready_queue, (remaining, order, key))
+            if current_time == start:
+                # ... as soon as its switch was done
+                continue
+        else:
+            current_time += remaining
+            if io is not None:
+                nxt = io.complete(key, current_time, nxt)
+
+        yield key, start, current_time
+
+
+def priority_slices(jobs, preemptive=False, switch_cost=0, counts=None):
+    # Lower number = higher priority.  Heap entries are
+    # (priority, arrival sequence, key, remaining), so ties break on
+    # arrival order.
+    io = jobs if isinstance(jobs, IOQueue) else None
+    ops = instrument.heap_ops(counts)
+    heappush, heappop = ops.heappush, ops.heappop
+    jobs = iter(jobs)
+    nxt = next(jobs, _END)
+    current_time = 0
+    ready_queue = []
+    seq = 0
+    last = None
+
+    while nxt is not _END or ready_queue:
+        # Idle CPU - jump to the next arrival
+        if not ready_queue and current_time < nxt[1]:
+            current_time = nxt[1]
+
+        while nxt[1] <= current_time:
+            heappush(ready_queue, (nxt[3], seq, nxt[0], nxt[2]))
+            seq += 1
+            nxt = next(jobs, _END)
+
+        entry = heappop(ready_queue)
+        preempted = False
+        if switch_cost and entry[2] != last:
+            if last is not None:
+                current_time += switch_cost
+                while nxt[1] <= current_time:
+                    heappush(ready_queue, (nxt[3], seq, nxt[0], nxt[2]))
+                    seq += 1
+                    nxt = next(jobs, _END)
+                # An arrival during the switch preempts as soon as it is done
+                preempted = preemptive and bool(ready_queue) and ready_queue[0][:2] < entry[:2]
+            last = entry[2]
+        remaining = entry[3]
+        start = current_time
+
+        if preemptive:
+            # Run until completion or until a higher-priority arrival
+            while not preempted and nxt[1] < current_time + remaining:
+                remaining -= nxt[1] - current_time
+                current_time = nxt[1]
+                while nxt[1] <= current_time:
+                    heappush(ready_queue, (nxt[3], seq, nxt[0], nxt[2]))
+                    seq += 1
+                    nxt = next(jobs, _END)
+                if ready_queue[0][:2] < entry[:2]:
+                    preempted = True
+
+        if preempted:
+            heappush(ready_queue, (entry[0], entry[1], entry[2], remaining))
+            if current_time == start:
+                continue
+        else:
+            current_time += remaining
+            if io is not None:
+                nxt = io.complete(entry[2], current_time, nxt)
+
+        yield entry[2], start, current_time
+
+
+def round_robin_slices(jobs, quantum=DEFAULT_QUANTUM, switch_cost=0, counts=None):
+    io = jobs if isinstance(jobs, IOQueue) else None
+    jobs = iter(jobs)
+    nxt = next(jobs, _END)
+    ready_queue = instrument.queue_class(counts)()
+    current_time = 0
+    last = None
+
+    while nxt is not _END or ready_queue:
+        if not ready_queue:
+            # Idle CPU - jump to the next arrival
+            if current_time < nxt[1]:
+                current_time = nxt[1]
+            while nxt[1] <= current_time:
+                ready_queue.append([nxt[0], nxt[2]])
+                nxt = next(jobs, _END)
+
+        job = ready_queue.popleft()
+        if switch_cost and job[0] != last:
+            if last is not None:
+                current_time += switch_cost
+            last = job[0]
+        remaining = job[1]
+        execute_time = quantum if quantum < remaining else remaining
+        end = current_time + execute_time
+        yield job[0], current_time, end
+        current_time = end
+        if io is not None and remaining == execute_time:
+            nxt = io.complete(job[0], end, nxt)
+
+        # Add newly arrived processes
+        while nxt[1] <= current_time:
+            ready_queue.append([nxt[0], nxt[2]])
+            nxt = next(jobs, _END)
+
+        if remaining > execute_time:
+            job[1] = remaining - execute_time
+            ready_queue.append(job)
+
+
+def mlfq_slices(jobs, quantum=DEFAULT_QUANTUM, quanta=None, boost_interval=None, switch_cost=0,
+                counts=None):
+    """Multilevel feedback queue.
+
+    ``quanta`` gives the time slice of each level, highest priority first;
+    it defaults to ``(quantum, 2*quantum, 4*quantum)``.  New arrivals enter
+    the top level, a process that uses its whole slice is demoted one level,
+    and an arrival preempts a process running below the top level.  Every
+    ``boost_interval`` time units (default ``10 * quanta[-1]``) all waiting
+    processes are moved back to the top level.  A process coming back
+    from I/O counts as a new arrival.
+    """
+    if quanta is None:
+        quanta = (quantum, 2 * quantum, 4 * quantum)
+    if boost_interval is None:
+        boost_interval = 10 * quanta[-1]
+    levels = len(quanta)
+    bottom = levels - 1
+
+    io = jobs if isinstance(jobs, IOQueue) else None
+    jobs = iter(jobs)
+    nxt = next(jobs, _END)
+    queue = instrument.queue_class(counts)
+    queues = [queue() for _ in range(levels)]
+    top = queues[0]
+    current_time = 0
+    next_boost = boost_interval
+    waiting = 0
+    last = None
+
+    while nxt is not _END or waiting:
+        # Idle CPU - jump to the next arrival
+        if not waiting and current_time < nxt[1]:
+            current_time = nxt[1]
+
+        while nxt[1] <= current_time:
+            top.append([nxt[0], nxt[2]])
+            waiting += 1
+            nxt = next(jobs, _END)
+
+        # Periodic priority boost
+        if current_time >= next_boost:
+            for q in queues[1:]:
+                top.extend(q)
+                q.clear()
+            next_boost = (current_time // boost_interval + 1) * boost_interval
+
+        lvl = 0
+        while not queues[lvl]:
+            lvl += 1
+        job = queues[lvl].popleft()
+        waiting -= 1
+        if switch_cost and job[0] != last:
+            if last is not None:
+                current_time += switch_cost
+            last = job[0]
+
+        slice_len = quanta[lvl]
+        remaining = job[1]
+        end = current_time + (slice_len if slice_len < remaining else remaining)
+        preempted = False
+        if lvl and nxt[1] < end:
+            # A new arrival lands in the top queue and preempts, at the
+            # earliest once the switch is done
+            end = nxt[1] if nxt[1] > current_time else current_time
+            preempted = True
+
+        if end > current_time:
+            yield job[0], current_time, end
+
+        remaining -= end - current_time
+        used_full_slice = end - current_time == slice_len
+        current_time = end
+        if io is not None and not remaining:
+            nxt = io.complete(job[0], end, nxt)
+
+        # Arrivals during the slice queue ahead of the returning process
+        while nxt[1] <= current_time:
+            top.append([nxt[0], nxt[2]])
+            waiting += 1
+            nxt = next(jobs, _END)
+
+        if remaining > 0:
+            job[1] = remaining
+            if used_full_slice and not preempted and lvl < bottom:
+                lvl += 1
+            queues[lvl].append(job)
+            waiting += 1
+
+
+def iter_slices(algorithm, jobs, quantum=DEFAULT_QUANTUM, switch_cost=0, counts=None):
+    """Stream ``(key, start, end)`` slices of ``algorithm`` over ``jobs``.
+
+    ``jobs`` yields ``(key, arrival, burst, priority)`` tuples in
+    non-decreasing arrival order; ``key`` is passed through untouched.
+    Pass an ``IOQueue`` as ``jobs`` to simulate I/O bursts.  With a
+    ``counts`` Counter, run-queue operations are counted into it (see
+    ``instrument.py``).
+    """
+    if algorithm == "FCFS":
+        return fcfs_slices(jobs, switch_cost)
+    elif algorithm == "SJF (Non-Preemptive)":
+        return sjf_slices(jobs, False, switch_cost, counts)
+    elif algorithm == "SJF (Preemptive)":
+        return sjf_slices(jobs, True, switch_cost, counts)
+    elif algorithm == "Priority (Non-Preemptive)":
+        return priority_slices(jobs, False, switch_cost, counts)
+    elif algorithm == "Priority (Preemptive)":
+        return priority_slices(jobs, True, switch_cost, counts)
+    elif algorithm == "Round Robin":
+        return round_robin_slices(jobs, quantum, switch_cost, counts)
+    elif algorithm == "Multilevel Feedback Queue":
+        return mlfq_slices(jobs, quantum, switch_cost=switch_cost, counts=counts)
+    raise ValueError(f"Unknown scheduling algorithm: {algorithm!r}")
+
+
+def _schedule(processes, slices, progress=None, io_profiles=None, io_devices=DEFAULT_IO_DEVICES,
+              counts=None):
+    # Feed the workload to ``slices(jobs)`` in arrival order, keyed by
+    # position in that order, and log the slices straight into the packed
+    # array.
+    with instrument.phase('ingest'):
+        workload = as_workload(processes)
+        order = workload.arrival_order()
+        jobs = zip(range(len(order)), workload.arrival[order].tolist(),
+                   workload.burst[order].tolist(), workload.priority[order].tolist())
+        io_log = None
+        if io_profiles:
+            io_log = array('q')
+            jobs = IOQueue(jobs, io_patterns(workload, io_profiles, order), io_devices, io_log)
+
+    with instrument.phase('schedule'):
+        log = ScheduleLog()
+        if progress is None:
+            log.extend(chain.from_iterable(slices(jobs)))
+        else:
+            # Progress is the share of total CPU work scheduled so far
+            total = int(workload.burst.sum()) or 1
+            done = 0
+            emit = log.extend
+            for count, piece in enumerate(slices(jobs), 1):
+                emit(piece)
+                done += piece[2] - piece[1]
+                if not count % PROGRESS_INTERVAL:
+                    progress(done / total)
+            progress(1.0)
+        schedule = log.freeze(workload, order)
+        if io_log is not None:
+            schedule.io_intervals, schedule.blocked = io_intervals(io_log, order)
+
+    if counts is not None:
+        instrument.count_run(counts, len(schedule),
+                             len(order) + (jobs.requests if io_log is not None else 0))
+    return schedule
+
+
+def fcfs(processes):
+    return _schedule(processes, fcfs_slices)
+
+
+def sjf(processes, preemptive=False):
+    return _schedule(processes, lambda jobs: sjf_slices(jobs, preemptive))
+
+
+def priority(processes, preemptive=False):
+    return _schedule(processes, lambda jobs: priority_slices(jobs, preemptive))
+
+
+def round_robin(processes, quantum=DEFAULT_QUANTUM):
+    return _schedule(processes, lambda jobs: round_robin_slices(jobs, quantum))
+
+
+def mlfq(processes, quantum=DEFAULT_QUANTUM, quanta=None, boost_interval=None):
+    """Multilevel feedback queue; see ``mlfq_slices`` for the parameters."""
+    return _schedule(processes, lambda jobs: mlfq_slices(jobs, quantum, quanta, boost_interval))
+
+
+def run_algorithm(algorithm, processes, quantum=DEFAULT_QUANTUM, progress=None, switch_cost=0,
+                  io_profiles=None, io_devices=DEFAULT_IO_DEVICES, counts=None):
+    """Run the policy named ``algorithm`` (one of ``ALGORITHMS``).
+
+    If given, ``progress(fraction)`` is called every ``PROGRESS_INTERVAL``
+    slices with the share of CPU work scheduled so far; an exception raised
+    from it aborts the run.
+
+    ``switch_cost`` is the time a context switch takes.  ``io_profiles``
+    maps process type names to ``(cpu, io)`` burst patterns (see
+    ``IO_PROFILES``; types left out do no I/O), served by ``io_devices``
+    devices; the schedule's ``blocked`` array then holds each process's
+    time blocked on I/O.
+
+    ``counts`` is a ``Counter`` the run's operation counts are added to;
+    by default it is the algorithm's counter while ``instrument.py``
+    instrumentation is on.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown scheduling algorithm: {algorithm!r}")
+    if switch_cost < 0:
+        raise ValueError("Context switch cost can't be negative")
+    if counts is None:
+        counts = instrument.counts_for(algorithm)
+    return _schedule(processes,
+                     lambda jobs: iter_slices(algorithm, jobs, quantum, switch_cost, counts),
+                     progress, io_profiles, io_devices, counts)
@@ -0,0 +1,445 @@
+"""Saving and reloading workloads and schedules.
+
+A schedule file holds a workload, optionally a schedule simulated on it,
+and a little JSON metadata (algorithm, quantum, ...) in one versioned
+binary file:
+
+* a 256-byte header: magic ``CPUSCHED``, format version, flags, codec,
+  core count, process, slice and I/O request counts, and the offset and
+  stored size of each section;
+* process records in the 32-byte layout of ``traces.py`` binary traces;
+* when needed, the time each process spent blocked on I/O (8 bytes each)
+  and the process ids as text (when they are not integers);
+* 24-byte slice records: start, end, workload row and core;
+* the metadata;
+* when needed, 24-byte I/O records: workload row, start and end of the
+  time blocked.
+
+Version 1 files (a 128-byte header without I/O records) still load.
+
+Sections start on 64-byte boundaries.  Uncompressed files are opened
+with ``np.memmap``, so a multi-GB schedule can be reopened for metrics
+or a Gantt chart without re-running the simulation or reading the file
+into memory.  With ``compress=True`` every section is a zlib stream;
+loading such a file inflates it into memory instead, so compress files
+for storage or transfer and save them uncompressed to replay them.
+
+``write_csv`` and ``write_json`` export the same data as text.  Run
+``python archive.py --help`` to simulate, save, convert or export from
+the command line.
+"""
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from algorithms import ALGORITHMS, DEFAULT_QUANTUM, run_algorithm
+from smp import MODES, run_smp
+from traces import (BINARY_MAGIC, DEFAULT_CHUNK_SIZE, RECORD_DTYPE, iter_trace_chunks,
+                    open_binary, pack_records)
+from workload import TYPE_NAMES, Schedule, Workload
+
+FORMAT_VERSION = 2
+MAGIC = b"CPUSCHED"
+
+# Header: magic, version, flags, codec, cores, processes, slices, I/O
+# requests, then (offset, stored size) for each section in SECTIONS order
+HEADER = struct.Struct("<8sHHB3xIQQQ")
+SECTION = struct.Struct("<QQ")
+SECTIONS = ('processes', 'blocked', 'pids', 'slices', 'meta', 'io')
+HEADER_SIZE = 256
+# Version 1: no I/O request count or section
+HEADER_V1 = struct.Struct("<8sHHB3xIQQ")
+HEADER_SIZE_V1 = 128
+ALIGNMENT = 64
+
+# Flags
+HAS_SCHEDULE = 1
+HAS_CPU = 2             # slices carry their core (multi-core schedules)
+HAS_BLOCKED = 4
+TEXT_PIDS = 8
+HAS_IO = 16             # I/O records (version 2)
+
+# Codecs
+RAW = 0
+ZLIB = 1
+COMPRESS_LEVEL = 6
+
+SLICE_DTYPE = np.dtype([('start', '<i8'), ('end', '<i8'), ('row', '<i4'), ('cpu', '<i4')])
+BLOCKED_DTYPE = np.dtype('<i8')
+IO_DTYPE = np.dtype([('row', '<i8'), ('start', '<i8'), ('end', '<i8')])
+MAX_ROWS = 2 ** 31 - 1
+READ_SIZE = 1 << 20     # compressed bytes read at a time
+
+
+def _chunks(n, chunk_size=DEFAULT_CHUNK_SIZE):
+    for lo in range(0, n, chunk_size):
+        yield slice(lo, min(lo + chunk_size, n))
+
+
+def _write_section(f, compress, pieces):
+    # Sections start on an aligned offset so their memory maps are aligned
+    f.write(bytes(-f.tell() % ALIGNMENT))
+    offset = f.tell()
+    packer = zlib.compressobj(COMPRESS_LEVEL) if compress else None
+    for piece in pieces:
+        f.write(packer.compress(piece) if packer else piece)
+    if packer:
+        f.write(packer.flush())
+    return offset, f.tell() - offset
+
+
+def save(path, data, meta=None, compress=False):
+    """Write a ``Schedule`` (with its workload) or a ``Workload`` to ``path``.
+
+    ``meta`` is any JSON-serializable dict, e.g. the algorithm and quantum
+    that produced the schedule.
+    """
+    schedule = data if isinstance(data, Schedule) else None
+    workload = schedule.workload if schedule is not None else data
+    n = len(workload)
+    if n > MAX_ROWS:
+        raise ValueError(f"Schedule files hold at most {MAX_ROWS} processes")
+    flags = 0
+    if schedule is not None:
+        flags |= HAS_SCHEDULE
+        if schedule.cpu is not None:
+            flags |= HAS_CPU
+        if schedule.blocked is not None:
+            flags |= HAS_BLOCKED
+        if schedule.io_intervals is not None:
+            flags |= HAS_IO
+    text_pids = not np.issubdtype(workload.pid.dtype, np.integer)
+    if text_pids:
+        flags |= TEXT_PIDS
+    slices = len(schedule) if schedule is not None else 0
+    requests = len(schedule.io_intervals) if flags & HAS_IO else 0
+    cpus = schedule.cpus if schedule is not None else 1
+
+    def processes():
+        for rows in _chunks(n):
+            yield pack_records(workload.take(rows), rows.start)
+
+    def blocked():
+        if flags & HAS_BLOCKED:
+            for rows in _chunks(n):
+                yield np.ascontiguousarray(schedule.blocked[rows], dtype=BLOCKED_DTYPE)
+
+    def pids():
+        if text_pids and n:
+            text = "\n".join(map(str, workload.pid.tolist()))
+            if text.count("\n") != n - 1:
+                raise ValueError("Process ids can't contain newlines")
+            yield text.encode()
+
+    def slice_records():
+        for rows in _chunks(slices):
+            records = np.empty(rows.stop - rows.start, dtype=SLICE_DTYPE)
+            records['start'] = schedule.start[rows]
+            records['end'] = schedule.end[rows]
+            records['row'] = schedule.row[rows]
+            records['cpu'] = schedule.cpu[rows] if flags & HAS_CPU else 0
+            yield records
+
+    def io_records():
+        for rows in _chunks(requests):
+            intervals = schedule.io_intervals[rows]
+            records = np.empty(len(intervals), dtype=IO_DTYPE)
+            records['row'] = intervals[:, 0]
+            records['start'] = intervals[:, 1]
+            records['end'] = intervals[:, 2]
+            yield records
+
+    # Write next to the target and rename: the old file may still be
+    # memory-mapped, even by the schedule being saved
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(bytes(HEADER_SIZE))
+            table = [_write_section(f, compress, pieces) for pieces in (
+                processes(), blocked(), pids(), slice_records(),
+                [json.dumps(meta or {}).encode()], io_records())]
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, ZLIB if compress else RAW, cpus, n,
+                                slices, requests))
+            for offset, size in table:
+                f.write(SECTION.pack(offset, size))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _read_section(path, f, codec, section, dtype, count):
+    offset, size = section
+    if not count:
+        return np.zeros(0, dtype=dtype)
+    if codec == RAW:
+        return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+    # Inflate straight into the array, a block at a time
+    out = np.empty(count, dtype=dtype)
+    buffer = out.view(np.uint8)
+    unpacker = zlib.decompressobj()
+    f.seek(offset)
+    filled = 0
+    left = size
+    while True:
+        block = f.read(min(left, READ_SIZE)) if left else b""
+        left -= len(block)
+        try:
+            data = unpacker.decompress(block) if block else unpacker.flush()
+        except zlib.error:
+            raise ValueError(f"{path}: corrupt section") from None
+        if filled + len(data) > len(buffer):
+            raise ValueError(f"{path}: corrupt section")
+        buffer[filled:filled + len(data)] = np.frombuffer(data, dtype=np.uint8)
+        filled += len(data)
+        if not block:
+            break
+    if filled != len(buffer):
+        raise ValueError(f"{path}: truncated section")
+    return out
+
+
+def _read_bytes(path, f, codec, section):
+    offset, size = section
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError(f"{path}: truncated section")
+    if codec == ZLIB and data:
+        try:
+            return zlib.decompress(data)
+        except zlib.error:
+            raise ValueError(f"{path}: corrupt section") from None
+    return data
+
+
+def load(path):
+    """Open a schedule file (or a ``traces.py`` binary trace).
+
+    Returns ``{'workload': Workload, 'schedule': Schedule or None,
+    'meta': dict}``.  Uncompressed files are memory-mapped, not read.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if header[:8] == BINARY_MAGIC:
+            return {'workload': open_binary(path), 'schedule': None, 'meta': {}}
+        if len(header) < HEADER_SIZE_V1 or header[:8] != MAGIC:
+            raise ValueError(f"{path}: not a schedule file")
+        version = HEADER.unpack_from(header)[1]
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {version} is newer than this reader "
+                             f"(version {FORMAT_VERSION})")
+        if version == 1:
+            layout, sections = HEADER_V1, SECTIONS[:-1]
+            _, _, flags, codec, cpus, n, slices = layout.unpack_from(header)
+            requests = 0
+        else:
+            if len(header) != HEADER_SIZE:
+                raise ValueError(f"{path}: not a schedule file")
+            layout, sections = HEADER, SECTIONS
+            _, _, flags, codec, cpus, n, slices, requests = layout.unpack_from(header)
+        if codec not in (RAW, ZLIB):
+            raise ValueError(f"{path}: unknown compression codec {codec}")
+        table = dict(zip(sections, (SECTION.unpack_from(header, layout.size + i * SECTION.size)
+                                    for i in range(len(sections)))))
+
+        records = _read_section(path, f, codec, table['processes'], RECORD_DTYPE, n)
+        pid = records['pid']
+        if flags & TEXT_PIDS and n:
+            pid = np.array(_read_bytes(path, f, codec, table['pids']).decode().split("\n"))
+        workload = Workload(records['arrival'], records['burst'], records['priority'],
+                            records['type_code'], pid)
+        meta = json.loads(_read_bytes(path, f, codec, table['meta']) or b"{}")
+        if not flags & HAS_SCHEDULE:
+            return {'workload': workload, 'schedule': None, 'meta': meta}
+
+        blocked = intervals = None
+        if flags & HAS_BLOCKED:
+            blocked = _read_section(path, f, codec, table['blocked'], BLOCKED_DTYPE, n)
+        if flags & HAS_IO:
+            records = _read_section(path, f, codec, table['io'], IO_DTYPE, requests)
+            # A view, so mapped records stay on disk until used
+            intervals = records.view(np.int64).reshape(-1, 3)
+        table = _read_section(path, f, codec, table['slices'], SLICE_DTYPE, slices)
+    cpu = table['cpu'] if flags & HAS_CPU else None
+    schedule = Schedule(workload, table['start'], table['end'], table['row'], cpu=cpu, cpus=cpus,
+                        blocked=blocked, io_intervals=intervals)
+    return {'workload': workload, 'schedule': schedule, 'meta': meta}
+
+
+def _process_columns(workload, blocked, rows):
+    columns = [workload.pid[rows].tolist(), workload.arrival[rows].tolist(),
+               workload.burst[rows].tolist(), workload.priority[rows].tolist(),
+               [TYPE_NAMES[code] for code in workload.type_code[rows].tolist()]]
+    if blocked is not None:
+        columns.append(blocked[rows].tolist())
+    return columns
+
+
+def _slice_columns(schedule, rows):
+    columns = [schedule.workload.pid[schedule.row[rows]].tolist(), schedule.start[rows].tolist(),
+               schedule.end[rows].tolist()]
+    if schedule.cpu is not None:
+        columns.append(schedule.cpu[rows].tolist())
+    return columns
+
+
+def _fields(schedule):
+    blocked = schedule.blocked if schedule is not None else None
+    process_fields = ['pid', 'arrival', 'burst', 'priority', 'type']
+    if blocked is not None:
+        process_fields.append('blocked')
+    slice_fields = ['pid', 'start', 'end']
+    if schedule is not None and schedule.cpu is not None:
+        slice_fields.append('cpu')
+    return process_fields, slice_fields, blocked
+
+
+def write_csv(data, out):
+    """Write a ``Schedule``'s slices or a ``Workload``'s processes as CSV.
+
+    Workload CSV files can be replayed with ``traces.py``.
+    """
+    writer = csv.writer(out)
+    if isinstance(data, Schedule):
+        writer.writerow(_fields(data)[1])
+        for rows in _chunks(len(data)):
+            writer.writerows(zip(*_slice_columns(data, rows)))
+    else:
+        writer.writerow(_fields(None)[0])
+        for rows in _chunks(len(data)):
+            writer.writerows(zip(*_process_columns(data, None, rows)))
+
+
+def _json_metrics(metrics):
+    # The averages, percentiles and per-core use; per-process rows follow
+    # from the processes and slices
+    return {name: value for name, value in metrics.items() if name != 'per_process'}
+
+
+def write_json(data, out, meta=None, metrics=None):
+    """Write a ``Schedule`` or ``Workload`` as one JSON document.
+
+    Processes and slices are lists of rows, with their column names under
+    ``process_fields`` and ``slice_fields``; rows are written a chunk at a
+    time, so the document is never built in memory.
+    """
+    schedule = data if isinstance(data, Schedule) else None
+    workload = schedule.workload if schedule is not None else data
+    process_fields, slice_fields, blocked = _fields(schedule)
+
+    def rows(count, columns):
+        first = True
+        for chunk in _chunks(count):
+            body = json.dumps([list(row) for row in zip(*columns(chunk))])[1:-1]
+            if body:
+                out.write(("" if first else ", ") + body)
+                first = False
+
+    out.write(f'{{"version": {FORMAT_VERSION}, "meta": {json.dumps(meta or {})}, '
+              f'"cpus": {schedule.cpus if schedule is not None else 1}, '
+              f'"process_fields": {json.dumps(process_fields)}, "processes": [')
+    rows(len(workload), lambda chunk: _process_columns(workload, blocked, chunk))
+    out.write("]")
+    if schedule is not None:
+        out.write(f', "slice_fields": {json.dumps(slice_fields)}, "slices": [')
+        rows(len(schedule), lambda chunk: _slice_columns(schedule, chunk))
+        out.write("]")
+    if metrics is not None:
+        out.write(f', "metrics": {json.dumps(_json_metrics(metrics))}')
+    out.write("}\n")
+
+
+def _read_workload(path):
+    # Schedule files and binary traces are mapped; other traces are read whole
+    with open(path, "rb") as f:
+        magic = f.read(8)
+    if magic in (MAGIC, BINARY_MAGIC):
+        return load(path)
+    chunks = list(iter_trace_chunks(path))
+    names = ('arrival', 'burst', 'priority', 'type_code', 'pid')
+    if not chunks:
+        return {'workload': Workload([], []), 'schedule': None, 'meta': {}}
+    workload = Workload(*(np.concatenate([getattr(chunk, name) for chunk in chunks])
+                          for name in names))
+    return {'workload': workload, 'schedule': None, 'meta': {}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Save, reopen and export schedules.")
+    parser.add_argument("input", help="schedule file, or a CSV, Parquet or binary trace")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, metavar="ALGORITHM",
+                        help="simulate the input's workload with this algorithm")
+    parser.add_argument("--quantum", type=int, default=DEFAULT_QUANTUM)
+    parser.add_argument("--cpus", type=int, default=1)
+    parser.add_argument("--mode", default=MODES[0], choices=MODES, help="run queues when --cpus > 1")
+    parser.add_argument("--output", "-o", help="schedule file to write")
+    parser.add_argument("--compress", action="store_true", help="zlib-compress the schedule file")
+    parser.add_argument("--csv", metavar="FILE", help="export the slices (or processes) as CSV")
+    parser.add_argument("--json", metavar="FILE", help="export the workload, schedule and metrics as JSON")
+    parser.add_argument("--metrics", action="store_true", help="print the schedule's metrics")
+    parser.add_argument("--gantt", metavar="IMAGE", help="render the Gantt chart to an image file")
+    args = parser.parse_args(argv)
+
+    loaded = _read_workload(args.input)
+    workload, schedule, meta = loaded['workload'], loaded['schedule'], loaded['meta']
+    if args.algorithm:
+        if args.cpus > 1:
+            schedule = run_smp(args.algorithm, workload, args.cpus, args.quantum, args.mode)
+        else:
+            schedule = run_algorithm(args.algorithm, workload, args.quantum)
+        meta = {'algorithm': args.algorithm, 'quantum': args.quantum, 'cpus': args.cpus,
+                'mode': args.mode if args.cpus > 1 else None}
+    data = schedule if schedule is not None else workload
+    if meta:
+        print(", ".join(f"{name}: {value}" for name, value in meta.items() if value is not None))
+    print(f"{len(workload)} processes" + (f", {len(schedule)} slices" if schedule is not None else ""))
+
+    metrics = None
+    if schedule is not None and (args.metrics or args.json):
+        from metrics import calculate_metrics
+
+        metrics = calculate_metrics(schedule)
+    if args.metrics:
+        if metrics is None:
+            print("No metrics: the input holds no schedule")
+        else:
+            for name, value in metrics['average'].items():
+                unit = "%" if name == 'Utilization' else ""
+                print(f"  {name}: {value:.2f}{unit}")
+            for name, values in metrics['percentiles'].items():
+                print(f"  {name} " + ", ".join(f"{p}: {v:.2f}" for p, v in values.items()))
+
+    if args.output:
+        save(args.output, data, meta, args.compress)
+        print(f"Wrote {args.output} ({os.path.getsize(args.output):,} bytes)")
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            write_csv(data, f)
+        print(f"Wrote {args.csv}")
+    if args.json:
+        with open(args.json, "w") as f:
+            write_json(data, f, meta, metrics)
+        print(f"Wrote {args.json}")
+    if args.gantt:
+        if schedule is None:
+            parser.error("--gantt needs a schedule: give --algorithm or a schedule file")
+        from matplotlib.figure import Figure
+        from gantt import draw_gantt
+
+        fig = Figure(figsize=(10, 5))
+        draw_gantt(fig.add_subplot(), schedule)
+        fig.savefig(args.gantt)
+        print(f"Wrote {args.gantt}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
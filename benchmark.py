@@ -0,0 +1,218 @@
+"""Throughput and peak-memory benchmarks for the engine hot paths.
+
+Every scheduling algorithm, ``calculate_metrics`` and Gantt rendering (of
+Round Robin and SRTF schedules) are run over synthetic workloads of
+increasing size.  Each case is timed (best of ``--repeat`` runs) and then
+run once more under ``tracemalloc`` for its peak memory.  Results are written as JSON so runs can be compared
+and plotted as scaling curves::
+
+    python benchmark.py -o bench.json                       # 10 .. 1M processes
+    python benchmark.py --sizes 10 1000 10000000 -o big.json
+    python benchmark.py --baseline bench.json               # exit 1 on regressions
+    python benchmark.py --cases "Round Robin" --profile rr.folded
+
+Sizes whose estimated run time would exceed ``--max-seconds`` are skipped,
+based on the previous size of the same case.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+import algorithms
+import instrument
+from metrics import calculate_metrics
+from synthetic import generate_workload
+
+DEFAULT_SIZES = (10, 100, 1000, 10_000, 100_000, 1_000_000)
+# Schedules fed to the metrics and Gantt cases as (algorithm, quantum).
+# Both split processes over many slices, so the per-process reductions
+# and Gantt LOD merging get exercised
+SCHEDULES = {'rr': ("Round Robin", 2), 'srtf': ("SJF (Preemptive)", 2)}
+REPEAT = 3
+# Cases faster than this are too noisy to flag as regressions
+NOISE_FLOOR = 0.01
+
+
+def _algorithm_case(name):
+    def setup(workload):
+        return workload
+
+    def run(workload):
+        return len(algorithms.run_algorithm(name, workload))
+    return setup, run
+
+
+def _schedule_setup(algorithm, quantum):
+    def setup(workload):
+        return algorithms.run_algorithm(algorithm, workload, quantum=quantum)
+    return setup
+
+
+def _metrics_run(schedule):
+    calculate_metrics(schedule)
+    return len(schedule)
+
+
+def _gantt_setup(schedule_setup):
+    def setup(workload):
+        import matplotlib
+        matplotlib.use("Agg")
+        from matplotlib.figure import Figure
+
+        return Figure(figsize=(10, 6), dpi=100), schedule_setup(workload)
+    return setup
+
+
+def _gantt_run(state):
+    from gantt import draw_gantt
+
+    figure, schedule = state
+    figure.clear()
+    draw_gantt(figure.add_subplot(111), schedule)
+    figure.canvas.draw()
+    return len(schedule)
+
+
+def cases():
+    """Benchmark cases as ``{name: (setup, run)}``.
+
+    ``setup(workload)`` prepares the untimed input; ``run(state)`` is the
+    timed part and returns the number of Gantt slices it handled.
+    """
+    table = {name: _algorithm_case(name) for name in algorithms.ALGORITHMS}
+    for label, (algorithm, quantum) in SCHEDULES.items():
+        schedule_setup = _schedule_setup(algorithm, quantum)
+        table[f'calculate_metrics[{label}]'] = (schedule_setup, _metrics_run)
+        table[f'gantt[{label}]'] = (_gantt_setup(schedule_setup), _gantt_run)
+    return table
+
+
+def measure(setup, run, workload, repeat=REPEAT):
+    """``(best seconds, peak bytes, slices)`` for one case and workload."""
+    state = setup(workload)
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        slices = run(state)
+        best = min(best, time.perf_counter() - start)
+
+    # Separate run for memory: tracemalloc slows allocation-heavy code
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, slices
+
+
+def run_benchmarks(names, sizes, repeat=REPEAT, max_seconds=60.0, seed=0, log=print):
+    table = cases()
+    results = []
+    last = {}    # case -> (size, seconds) of its previous run
+    for size in sizes:
+        workload = generate_workload(size, seed=seed)
+        for name in names:
+            if name in last:
+                prev_size, prev_seconds = last[name]
+                # Assume at worst n log n growth from the previous size
+                growth = size / prev_size * max(1.0, np.log(size) / np.log(max(prev_size, 2)))
+                if prev_seconds * growth * (repeat + 1) > max_seconds:
+                    log(f"{name:<28} {size:>10}  skipped (estimated over {max_seconds:g} s)")
+                    continue
+            setup, run = table[name]
+            try:
+                seconds, peak, slices = measure(setup, run, workload, repeat)
+            except ImportError as e:
+                log(f"{name:<28} {size:>10}  skipped ({e})")
+                continue
+            last[name] = (size, seconds)
+            results.append({
+                'case': name,
+                'processes': size,
+                'slices': slices,
+                'seconds': seconds,
+                'processes_per_second': size / seconds if seconds else None,
+                'peak_bytes': peak
+            })
+            log(f"{name:<28} {size:>10}  {seconds * 1000:10.2f} ms  "
+                f"{size / seconds if seconds else 0:12,.0f} proc/s  {peak / 2 ** 20:8.1f} MiB")
+    return results
+
+
+def regressions(results, baseline, threshold):
+    """Cases that got slower than ``baseline`` by more than ``threshold``."""
+    before = {(r['case'], r['processes']): r['seconds'] for r in baseline['results']}
+    slower = []
+    for r in results:
+        old = before.get((r['case'], r['processes']))
+        if old and r['seconds'] > NOISE_FLOOR and r['seconds'] > old * (1 + threshold):
+            slower.append((r['case'], r['processes'], old, r['seconds']))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduling engines.")
+    parser.add_argument("--cases", nargs="+", default=None, metavar="CASE",
+                        help="cases to run (default: all): " + ", ".join(cases()))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per case (best is kept)")
+    parser.add_argument("--max-seconds", type=float, default=60.0,
+                        help="skip sizes estimated to take longer than this per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="JSON file to write")
+    parser.add_argument("--baseline", help="earlier JSON results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default: 25%%)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the run: cProfile stats for a .prof file, "
+                             "otherwise collapsed stacks for a flame graph")
+    args = parser.parse_args(argv)
+
+    names = args.cases or list(cases())
+    unknown = sorted(set(names) - set(cases()))
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    if args.profile:
+        with instrument.profiled(args.profile):
+            results = run_benchmarks(names, sorted(args.sizes), args.repeat, args.max_seconds, args.seed)
+    else:
+        results = run_benchmarks(names, sorted(args.sizes), args.repeat, args.max_seconds, args.seed)
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = regressions(results, baseline, args.threshold)
+        for name, size, old, new in slower:
+            print(f"REGRESSION {name} at {size}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms")
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""Content-addressed cache of simulation results.
+
+Results are keyed by a hash of the workload's columns plus the algorithm
+and its parameters, so an identical workload gets the same key no matter
+where it came from: a repeated "Run Simulation" click, a quantum sweep
+or auto mode trying every algorithm.
+
+``ResultCache`` has two tiers:
+
+* memory: an LRU ``OrderedDict`` bounded by entry count and by the
+  bytes of the NumPy arrays it holds;
+* disk (optional): one pickle per key in a directory.  Least recently
+  used files are deleted once the directory grows past ``max_disk_bytes``.
+
+Entries are treated as immutable; cached arrays are marked read-only.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from algorithms import DEFAULT_QUANTUM, QUANTUM_ALGORITHMS
+
+# Part of every key: bump it when engine output changes so stale disk
+# entries are never read back
+CACHE_VERSION = 3
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 256 << 20
+DEFAULT_MAX_DISK_BYTES = 1 << 30
+
+
+def workload_digest(workload, labels=False):
+    """Hash of the workload columns the engines read.
+
+    With ``labels=True`` the pids are hashed too, for results that show
+    them (per-process metrics).
+    """
+    h = hashlib.blake2b(digest_size=20)
+    columns = [workload.arrival, workload.burst, workload.priority, workload.type_code]
+    if labels:
+        columns.append(workload.pid)
+    for column in columns:
+        column = np.ascontiguousarray(column)
+        h.update(f"{column.dtype.str}{column.shape}".encode())
+        if column.dtype.hasobject:
+            h.update(repr(column.tolist()).encode())
+        else:
+            h.update(column.data)
+    return h.digest()
+
+
+def result_key(digest, kind, algorithm, quantum=DEFAULT_QUANTUM, **params):
+    """Cache key for one result of ``kind`` on a workload ``digest``.
+
+    The quantum is dropped for algorithms that ignore it, so a quantum
+    sweep reuses their results.
+    """
+    if algorithm not in QUANTUM_ALGORITHMS:
+        quantum = None
+    parts = [CACHE_VERSION, kind, algorithm, quantum] + sorted(params.items())
+    h = hashlib.blake2b(digest, digest_size=20)
+    h.update(repr(parts).encode())
+    return h.hexdigest()
+
+
+def _nbytes(value):
+    # Rough in-memory size: the NumPy arrays dominate
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values()) + 64
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value) + 64
+    slots = getattr(type(value), '__slots__', ())
+    if slots:
+        return sum(_nbytes(getattr(value, name, None)) for name in slots) + 64
+    return 64
+
+
+def _freeze(value):
+    # Cached arrays are shared between callers; make accidental writes fail
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    else:
+        for name in getattr(type(value), '__slots__', ()):
+            _freeze(getattr(value, name, None))
+    return value
+
+
+class ResultCache:
+    """Two-tier LRU cache of simulation results keyed by ``result_key``."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 directory=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(os.path.getsize(path) for path in self._disk_files())
+        else:
+            self._disk_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (
+            self.directory is not None and os.path.exists(self._path(key)))
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        value = self._load(key)
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store ``value`` (which must not be None) under ``key``."""
+        _freeze(value)
+        self._remember(key, value)
+        if self.directory is not None:
+            self._store(key, value)
+        return value
+
+    def clear(self):
+        """Empty the memory tier and delete the disk tier's files."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for path in self._disk_files():
+                os.remove(path)
+            self._disk_bytes = 0
+
+    # Memory tier
+
+    def _remember(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    # Disk tier
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def _disk_files(self):
+        return [entry.path for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(".pkl")]
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            # Touch the file: eviction goes by modification time
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return _freeze(value)
+
+    def _store(self, key, value):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(tmp)
+        with self._lock:
+            if os.path.exists(path):
+                self._disk_bytes -= os.path.getsize(path)
+            os.replace(tmp, path)
+            self._disk_bytes += size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        # Oldest first, down to 90% of the budget so eviction isn't rerun
+        # on every store
+        files = sorted(self._disk_files(), key=os.path.getmtime)
+        target = self.max_disk_bytes * 0.9
+        for path in files:
+            if self._disk_bytes <= target:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            self._disk_bytes -= size
+
+
+def run_cached(cache, algorithm, processes, quantum=DEFAULT_QUANTUM, cpus=1, mode="global",
+               progress=None, switch_cost=0, io_profiles=None):
+    """``(schedule, metrics)`` for one configuration, reusing ``cache``.
+
+    On a hit the ``Schedule`` is rebuilt over ``processes`` from the
+    cached arrays.  ``cache`` may be None to always simulate.
+    ``switch_cost`` and ``io_profiles`` are as in ``run_algorithm``.
+    """
+    from algorithms import run_algorithm
+    from metrics import calculate_metrics
+    from smp import run_smp
+    from workload import Schedule, as_workload
+
+    workload = as_workload(processes)
+    key = None
+    if cache is not None:
+        key = result_key(workload_digest(workload, labels=True), 'schedule', algorithm, quantum,
+                         cpus=cpus, mode=mode if cpus > 1 else None, switch_cost=switch_cost,
+                         io=sorted(io_profiles.items()) if io_profiles else None)
+        hit = cache.get(key)
+        if hit is not None:
+            if progress is not None:
+                progress(1.0)
+            return Schedule(workload, **hit['schedule']), hit['metrics']
+
+    if cpus > 1:
+        schedule = run_smp(algorithm, workload, cpus, quantum, mode, progress=progress,
+                           switch_cost=switch_cost, io_profiles=io_profiles)
+    else:
+        schedule = run_algorithm(algorithm, workload, quantum, progress, switch_cost, io_profiles)
+    metrics = calculate_metrics(schedule)
+    if cache is not None:
+        cache.put(key, {
+            'schedule': {'start': schedule.start, 'end': schedule.end, 'row': schedule.row,
+                         'cpu': schedule.cpu, 'cpus': schedule.cpus, 'blocked': schedule.blocked,
+                         'io_intervals': schedule.io_intervals},
+            'metrics': metrics
+        })
+    return schedule, metrics
@@ -0,0 +1,254 @@
+"""Batch comparison of scheduling algorithms.
+
+``compare`` runs every algorithm over a grid of time quanta and a list of
+workloads, fanned out over a ``ProcessPoolExecutor``.  The workloads are
+packed once into a shared-memory block that every worker attaches to, so
+tasks only carry ``(workload, algorithm, quantum)`` triples.  The result is
+a tidy table: one dict per configuration.
+
+Run ``python compare.py --help`` for the command-line interface.
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from algorithms import ALGORITHMS, DEFAULT_QUANTUM, QUANTUM_ALGORITHMS, run_algorithm
+from metrics import calculate_metrics
+from workload import Workload
+
+RESULT_FIELDS = ['workload', 'algorithm', 'quantum', 'processes', 'slices', 'makespan',
+                 'avg_waiting', 'avg_turnaround', 'avg_response', 'p95_waiting', 'p99_waiting',
+                 'p95_response', 'p99_response', 'utilization']
+
+# Worker-side state, set by _attach()
+_shm = None
+_workloads = None
+
+
+class SharedWorkloads:
+    """Workloads packed into one shared-memory int64 block.
+
+    Layout: ``[count, offsets[count + 1], arrival[N], burst[N], priority[N]]``
+    where workload ``k`` occupies rows ``offsets[k]:offsets[k + 1]``.
+    """
+
+    def __init__(self, workloads):
+        count = len(workloads)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(w) for w in workloads])
+        total = int(offsets[-1])
+
+        size = (2 + count + 3 * total) * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        buf = np.ndarray(size // 8, dtype=np.int64, buffer=self.shm.buf)
+        buf[0] = count
+        buf[1:count + 2] = offsets
+        columns = buf[count + 2:].reshape(3, total)
+        for k, w in enumerate(workloads):
+            lo, hi = offsets[k], offsets[k + 1]
+            columns[0, lo:hi] = w.arrival
+            columns[1, lo:hi] = w.burst
+            columns[2, lo:hi] = w.priority
+        # Drop the views so the block can be closed later
+        del buf, columns
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def unpack_workloads(buffer):
+    """Zero-copy ``Workload`` views over a ``SharedWorkloads`` buffer."""
+    buf = np.ndarray(len(buffer) // 8, dtype=np.int64, buffer=buffer)
+    count = int(buf[0])
+    offsets = buf[1:count + 2]
+    total = int(offsets[-1])
+    arrival, burst, priority = buf[count + 2:count + 2 + 3 * total].reshape(3, total)
+    workloads = []
+    for k in range(count):
+        lo, hi = int(offsets[k]), int(offsets[k + 1])
+        workloads.append(Workload(arrival[lo:hi], burst[lo:hi], priority[lo:hi]))
+    return workloads
+
+
+def _attach(name):
+    global _shm, _workloads
+    _shm = shared_memory.SharedMemory(name=name)
+    _workloads = unpack_workloads(_shm.buf)
+
+
+def simulate(workload, algorithm, quantum=DEFAULT_QUANTUM, switch_cost=0):
+    """Run one configuration and summarise it as a results-table row."""
+    schedule = run_algorithm(algorithm, workload, quantum, switch_cost=switch_cost)
+    metrics = calculate_metrics(schedule)
+    row = {
+        'algorithm': algorithm,
+        'quantum': quantum if algorithm in QUANTUM_ALGORITHMS else None,
+        'processes': len(workload),
+        'slices': len(schedule),
+        'makespan': int(schedule.end.max()) if len(schedule) else 0,
+        'avg_waiting': None,
+        'avg_turnaround': None,
+        'avg_response': None,
+        'p95_waiting': None,
+        'p99_waiting': None,
+        'p95_response': None,
+        'p99_response': None,
+        'utilization': None,
+    }
+    if metrics:
+        average = metrics['average']
+        row.update(avg_waiting=average['Waiting'],
+                   avg_turnaround=average['Turnaround'],
+                   avg_response=average['Response'],
+                   p95_waiting=metrics['percentiles']['Waiting']['p95'],
+                   p99_waiting=metrics['percentiles']['Waiting']['p99'],
+                   p95_response=metrics['percentiles']['Response']['p95'],
+                   p99_response=metrics['percentiles']['Response']['p99'],
+                   utilization=average['Utilization'])
+    return row
+
+
+def _run_batch(configs, switch_cost=0):
+    rows = []
+    for workload_id, algorithm, quantum in configs:
+        row = simulate(_workloads[workload_id], algorithm, quantum, switch_cost)
+        row['workload'] = workload_id
+        rows.append(row)
+    return rows
+
+
+def configurations(n_workloads, algorithms=ALGORITHMS, quanta=(DEFAULT_QUANTUM,)):
+    """Every (workload, algorithm, quantum) triple of the sweep."""
+    configs = []
+    for workload_id in range(n_workloads):
+        for algorithm in algorithms:
+            if algorithm in QUANTUM_ALGORITHMS:
+                configs.extend((workload_id, algorithm, q) for q in quanta)
+            else:
+                configs.append((workload_id, algorithm, DEFAULT_QUANTUM))
+    return configs
+
+
+def compare(workloads, algorithms=ALGORITHMS, quanta=(DEFAULT_QUANTUM,), max_workers=None,
+            batch_size=None, cache=None, switch_cost=0):
+    """Run every algorithm/quantum combination on every workload.
+
+    Returns a list of dicts with the keys in ``RESULT_FIELDS``, in
+    configuration order.  ``batch_size`` configurations are sent to a worker
+    per task; by default the sweep is split into about four tasks per
+    worker.  With a ``cache.ResultCache``, rows for configurations seen
+    before are reused and only the rest are simulated.  ``switch_cost``
+    is the context switch time of every run.
+    """
+    workloads = list(workloads)
+    for algorithm in algorithms:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown scheduling algorithm: {algorithm!r}")
+    configs = configurations(len(workloads), algorithms, quanta)
+    if not configs:
+        return []
+    if cache is None:
+        return _simulate_all(workloads, configs, max_workers, batch_size, switch_cost)
+
+    from cache import result_key, workload_digest
+
+    digests = [workload_digest(w) for w in workloads]
+    keys = [result_key(digests[w], 'row', algorithm, quantum, switch_cost=switch_cost)
+            for w, algorithm, quantum in configs]
+    rows = [None] * len(configs)
+    missing = []
+    for i, key in enumerate(keys):
+        row = cache.get(key)
+        if row is None:
+            missing.append(i)
+        else:
+            rows[i] = dict(row, workload=configs[i][0])
+    if missing:
+        computed = _simulate_all(workloads, [configs[i] for i in missing], max_workers, batch_size,
+                                 switch_cost)
+        for i, row in zip(missing, computed):
+            rows[i] = row
+            cache.put(keys[i], {k: v for k, v in row.items() if k != 'workload'})
+    return rows
+
+
+def _simulate_all(workloads, configs, max_workers, batch_size, switch_cost=0):
+    # Fan ``configs`` out over the process pool; rows come back in order
+    max_workers = max_workers or os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = max(1, len(configs) // (max_workers * 4))
+    batches = [configs[i:i + batch_size] for i in range(0, len(configs), batch_size)]
+
+    shared = SharedWorkloads(workloads)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach,
+                                 initargs=(shared.name,)) as executor:
+            rows = []
+            for batch_rows in executor.map(_run_batch, batches, repeat(switch_cost)):
+                rows.extend(batch_rows)
+    finally:
+        shared.close()
+    return rows
+
+
+def random_workloads(count, processes, seed=None, max_arrival=None, max_burst=10, max_priority=5):
+    """Uniform random workloads in the style of the GUI's "Generate Random"."""
+    rng = np.random.default_rng(seed)
+    if max_arrival is None:
+        max_arrival = processes
+    return [Workload(rng.integers(0, max_arrival + 1, processes),
+                     rng.integers(1, max_burst + 1, processes),
+                     rng.integers(1, max_priority + 1, processes))
+            for _ in range(count)]
+
+
+def write_csv(rows, out):
+    writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare CPU scheduling algorithms over many workloads.")
+    parser.add_argument("--workloads", type=int, default=100, help="number of random workloads")
+    parser.add_argument("--processes", type=int, default=50, help="processes per workload")
+    parser.add_argument("--quanta", type=int, nargs="+", default=[DEFAULT_QUANTUM],
+                        help="time quanta for Round Robin and MLFQ")
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS,
+                        metavar="ALGORITHM", help="algorithms to run (default: all)")
+    parser.add_argument("--switch-cost", type=int, default=0, help="context switch time (default: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--output", "-o", default="-", help="CSV file to write (default: stdout)")
+    parser.add_argument("--cache", metavar="DIR", help="reuse results cached in DIR across runs")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        from cache import ResultCache
+        cache = ResultCache(directory=args.cache)
+
+    workloads = random_workloads(args.workloads, args.processes, seed=args.seed)
+    rows = compare(workloads, args.algorithms, args.quanta, max_workers=args.workers, cache=cache,
+                   switch_cost=args.switch_cost)
+
+    if args.output == "-":
+        write_csv(rows, sys.stdout)
+    else:
+        with open(args.output, "w", newline="") as f:
+            write_csv(rows, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Gantt chart rendering for large schedules.
+
+All slices are drawn as a single ``PolyCollection`` whose vertices are
+built with NumPy, instead of one ``broken_barh`` call per slice.  Each
+process gets a lane, and slices are pre-sorted by lane and start time so
+bars in the same lane can be merged with one vectorized pass.
+
+When more slices are visible than the axes has pixels for, slices in the
+same lane (or group of lanes, if there are more lanes than vertical
+pixels) that are closer than one pixel apart are merged before drawing.
+The level of detail is recomputed whenever the view limits change, so
+zooming in reveals individual slices again.
+
+Multi-core schedules can be drawn with one lane per core instead of one
+per process (``lanes='cpu'``).
+
+This module imports matplotlib, so import it only when a chart is needed.
+"""
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+import instrument
+from metrics import _as_schedule
+
+BAR_HEIGHT = 0.8
+BAR_COLOR = 'tab:blue'
+
+# Fewer visible slices than this are drawn exactly, without merging
+EXACT_LIMIT = 20000
+
+
+class GanttRenderer:
+    """Draws a schedule into ``ax`` and keeps it updated on pan/zoom."""
+
+    def __init__(self, ax, schedule, color=BAR_COLOR, exact_limit=EXACT_LIMIT, lanes='process'):
+        self.ax = ax
+        self.exact_limit = exact_limit
+        schedule = _as_schedule(schedule)
+
+        if lanes == 'cpu':
+            if schedule.cpu is None:
+                raise ValueError("Per-CPU lanes need a multi-core schedule")
+            self.labels = np.array([f"CPU {c}" for c in range(schedule.cpus)])
+            lane = schedule.cpu
+        else:
+            # One lane per process, ordered by pid like the original chart
+            rows, slice_lane = np.unique(schedule.row, return_inverse=True)
+            labels = schedule.workload.pid[rows]
+            by_label = np.argsort(labels, kind='stable')
+            lane_of = np.empty(len(rows), dtype=np.int64)
+            lane_of[by_label] = np.arange(len(rows))
+            self.labels = labels[by_label]
+            lane = lane_of[slice_lane.reshape(-1)]
+
+        order = np.lexsort((schedule.start, lane))
+        self.lane = lane[order]
+        self.start = schedule.start[order]
+        self.end = schedule.end[order]
+
+        # A thin edge in the bar colour keeps sub-pixel bars visible
+        self.collection = PolyCollection([], facecolors=color, edgecolors=color, linewidths=0.5)
+        ax.add_collection(self.collection)
+
+        n_lanes = len(self.labels)
+        if len(self.start):
+            ax.set_xlim(self.start.min(), max(self.end.max(), self.start.min() + 1))
+        ax.set_ylim(-0.5, n_lanes - 0.5)
+        ax.yaxis.set_major_locator(MaxNLocator(nbins=min(n_lanes, 25), integer=True))
+        ax.yaxis.set_major_formatter(FuncFormatter(self._lane_label))
+
+        self.update()
+        ax.callbacks.connect('xlim_changed', self._limits_changed)
+        ax.callbacks.connect('ylim_changed', self._limits_changed)
+
+    def _lane_label(self, value, pos=None):
+        lane = int(round(value))
+        if 0 <= lane < len(self.labels) and abs(value - lane) < 1e-6:
+            return str(self.labels[lane])
+        return ""
+
+    def _limits_changed(self, ax):
+        self.update()
+        ax.figure.canvas.draw_idle()
+
+    def segments(self):
+        """``(lane, start, end, lanes_per_bar)`` to draw for the current view.
+
+        Each bar covers lanes ``lane`` to ``lane + lanes_per_bar - 1``.
+        """
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        visible = ((self.end >= x0) & (self.start <= x1) &
+                   (self.lane >= np.floor(y0)) & (self.lane <= np.ceil(y1)))
+        lane = self.lane[visible]
+        start = self.start[visible]
+        end = self.end[visible]
+        if len(start) <= self.exact_limit:
+            return lane, start, end, 1
+
+        # Level of detail: lanes that share a vertical pixel are drawn as
+        # one, and bars in the same lane closer than a pixel are merged.
+        bbox = self.ax.get_window_extent()
+        time_per_px = (x1 - x0) / max(bbox.width, 1)
+        lanes_per_px = max(1, int((y1 - y0) / max(bbox.height, 1)))
+        if lanes_per_px > 1:
+            lane = lane // lanes_per_px * lanes_per_px
+            order = np.lexsort((start, lane))
+            lane, start, end = lane[order], start[order], end[order]
+            # Overlapping bars from merged lanes: carry the running end
+            # forward so gaps are measured from the furthest end so far
+            end = _running_max_per_lane(lane, end)
+
+        new_run = np.ones(len(start), dtype=bool)
+        new_run[1:] = (lane[1:] != lane[:-1]) | (start[1:] - end[:-1] > time_per_px)
+        first = np.flatnonzero(new_run)
+        merged_end = np.maximum.reduceat(end, first)
+        return lane[first], start[first], merged_end, lanes_per_px
+
+    @instrument.phase('render')
+    def update(self):
+        lane, start, end, lanes_per_bar = self.segments()
+        half = BAR_HEIGHT / 2
+        verts = np.empty((len(start), 4, 2))
+        verts[:, 0, 0] = verts[:, 1, 0] = start
+        verts[:, 2, 0] = verts[:, 3, 0] = end
+        verts[:, 0, 1] = verts[:, 3, 1] = lane - half
+        verts[:, 1, 1] = verts[:, 2, 1] = lane + (lanes_per_bar - 1) + half
+        self.collection.set_verts(verts)
+
+
+def _running_max_per_lane(lane, end):
+    # Cumulative max of ``end`` that restarts at every lane change
+    boundaries = np.flatnonzero(np.r_[True, lane[1:] != lane[:-1]])
+    out = np.empty_like(end)
+    for lo, hi in zip(boundaries, np.r_[boundaries[1:], len(end)]):
+        np.maximum.accumulate(end[lo:hi], out=out[lo:hi])
+    return out
+
+
+@instrument.phase('render')
+def draw_gantt(ax, schedule, title='CPU Scheduling Gantt Chart', lanes=None):
+    """Draw ``schedule`` into ``ax``; returns the ``GanttRenderer``.
+
+    ``lanes`` is ``'process'`` or ``'cpu'``; by default multi-core
+    schedules get one lane per core.
+    """
+    if lanes is None:
+        lanes = 'cpu' if getattr(schedule, 'cpu', None) is not None else 'process'
+    renderer = GanttRenderer(ax, schedule, lanes=lanes)
+    ax.set_xlabel('Time')
+    ax.set_ylabel('CPUs' if lanes == 'cpu' else 'Processes')
+    ax.set_title(title)
+    ax.grid(True)
+    return renderer
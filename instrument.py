@@ -0,0 +1,259 @@
+"""Opt-in instrumentation and profiling of the scheduling engines.
+
+Nothing here costs anything until it is switched on.  Inside
+``with instrumented() as instr:`` on a thread, every run on that thread
+
+* counts its scheduling heap pushes and pops and run-queue appends and
+  pops under its algorithm's name.  The engines take the ``Counter`` as
+  a ``counts`` argument and get their heap functions and queue class
+  from ``heap_ops(counts)`` and ``queue_class(counts)``: plain ``heapq``
+  and ``deque`` without one, counting stand-ins with one.  Heaps of the
+  I/O model are never counted;
+* counts its dispatches and preemptions (dispatches that end before the
+  process's CPU burst does, quantum expiry included), and multi-core
+  runs add their migrations, steals and queue scans;
+* adds up the time spent in ``phase(name)`` blocks: the ingest,
+  schedule, metrics and render phases.  Phases nest exclusively: time
+  spent in an inner phase is not charged to the outer one.
+
+Outside ``instrumented()``, ``active()`` is None and ``phase`` does
+nothing, which is all the engines check, once per run.  Runs on other
+threads are only counted if they are passed ``counts`` explicitly, e.g.
+``instr.counts(algorithm)``.
+
+``profiled(path)`` profiles a block instead: a ``.prof`` path gets a
+cProfile dump (for ``pstats`` or snakeviz); any other path gets collapsed
+stacks (``frame;frame;frame count`` lines) sampled on a CPU-time timer,
+ready for flamegraph.pl or speedscope.
+"""
+import heapq
+import signal
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+PHASES = ('ingest', 'schedule', 'metrics', 'render')
+SAMPLE_INTERVAL = 0.001     # seconds of CPU time between stack samples (the
+                            # kernel may round it up to its tick)
+
+_state = threading.local()       # .instr: the thread's Instrumentation
+_DONE = object()
+
+
+def active():
+    """The ``Instrumentation`` switched on by ``instrumented()`` on this
+    thread, or None."""
+    return getattr(_state, 'instr', None)
+
+
+class Instrumentation:
+    """Counters per algorithm and time per phase."""
+
+    def __init__(self):
+        self.counters = {}              # algorithm -> Counter
+        self.timers = Counter()         # phase -> seconds
+        self._local = threading.local()
+
+    def counts(self, algorithm):
+        """The ``Counter`` that runs of ``algorithm`` count into."""
+        return self.counters.setdefault(algorithm, Counter())
+
+    def start(self, name):
+        stack = self._stack()
+        now = time.perf_counter()
+        if stack:
+            outer = stack[-1]
+            self.timers[outer[0]] += now - outer[1]
+        stack.append([name, now])
+
+    def stop(self):
+        stack = self._stack()
+        now = time.perf_counter()
+        name, started = stack.pop()
+        self.timers[name] += now - started
+        if stack:
+            stack[-1][1] = now
+
+    def _stack(self):
+        # Open phases per thread, so a GUI thread and a worker don't mix
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def to_dict(self):
+        return {'timers': dict(self.timers),
+                'counters': {name: dict(counts) for name, counts in self.counters.items()}}
+
+    def report(self):
+        """The timers and counters as text, one line each."""
+        lines = []
+        if self.timers:
+            lines.append("Phases:")
+            names = [p for p in PHASES if p in self.timers] + sorted(set(self.timers) - set(PHASES))
+            lines.extend(f"  {name:<10} {self.timers[name]:9.3f} s" for name in names)
+        for algorithm, counts in self.counters.items():
+            lines.append(f"{algorithm}:")
+            lines.extend(f"  {name:<14} {value:>12,}" for name, value in sorted(counts.items()))
+        return "\n".join(lines)
+
+
+class _CountingHeapq:
+    # Stands in for the heapq module inside the engines
+
+    def __init__(self, counts):
+        self._counts = counts
+
+    def heappush(self, heap, item):
+        self._counts['heap_push'] += 1
+        heapq.heappush(heap, item)
+
+    def heappop(self, heap):
+        self._counts['heap_pop'] += 1
+        return heapq.heappop(heap)
+
+    def heapreplace(self, heap, item):
+        counts = self._counts
+        counts['heap_pop'] += 1
+        counts['heap_push'] += 1
+        return heapq.heapreplace(heap, item)
+
+    def heapify(self, heap):
+        self._counts['heapify'] += 1
+        heapq.heapify(heap)
+
+    def __getattr__(self, name):
+        return getattr(heapq, name)
+
+
+def heap_ops(counts=None):
+    """``heapq``, or a stand-in that also counts into ``counts``."""
+    return heapq if counts is None else _CountingHeapq(counts)
+
+
+def queue_class(counts=None):
+    """``deque``, or a subclass that counts appends and pops into ``counts``."""
+    if counts is None:
+        return deque
+
+    class CountingDeque(deque):
+        __slots__ = ()
+
+        def append(self, item):
+            counts['queue_push'] += 1
+            deque.append(self, item)
+
+        def extend(self, items):
+            before = len(self)
+            deque.extend(self, items)
+            counts['queue_push'] += len(self) - before
+
+        def popleft(self):
+            counts['queue_pop'] += 1
+            return deque.popleft(self)
+
+    return CountingDeque
+
+
+def count_run(counts, dispatches, bursts):
+    """Count a finished run of ``dispatches`` over ``bursts`` CPU bursts."""
+    counts['runs'] += 1
+    counts['dispatches'] += dispatches
+    # Every CPU burst ends with one dispatch; the others were cut short
+    counts['preemptions'] += dispatches - bursts
+
+
+@contextmanager
+def instrumented(instr=None):
+    """Switch instrumentation on for the block on this thread; yields the
+    ``Instrumentation``."""
+    if instr is None:
+        instr = Instrumentation()
+    saved = active()
+    _state.instr = instr
+    try:
+        yield instr
+    finally:
+        _state.instr = saved
+
+
+def counts_for(algorithm):
+    """The ``Counter`` a run of ``algorithm`` counts into while
+    instrumentation is on, else None."""
+    instr = active()
+    return instr.counts(algorithm) if instr is not None else None
+
+
+@contextmanager
+def phase(name):
+    """Time the block as phase ``name`` while instrumentation is on.
+
+    Also works as a function decorator.
+    """
+    instr = active()
+    if instr is None:
+        yield
+        return
+    instr.start(name)
+    try:
+        yield
+    finally:
+        instr.stop()
+
+
+def timed(iterable, name):
+    """``iterable``, with the time spent producing each item charged to
+    phase ``name`` while instrumentation is on."""
+    if active() is None:
+        return iterable
+    return _timed(iter(iterable), name)
+
+
+def _timed(iterator, name):
+    while True:
+        with phase(name):
+            item = next(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+@contextmanager
+def profiled(path, interval=SAMPLE_INTERVAL):
+    """Profile the block into ``path`` (see the module docstring)."""
+    if path.endswith('.prof'):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+        return
+
+    if not hasattr(signal, 'setitimer'):
+        raise ValueError("Stack sampling needs signal.setitimer; profile to a .prof file instead")
+    stacks = Counter()
+
+    def sample(signum, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get('__name__', '?')
+            names.append(f"{module}:{getattr(code, 'co_qualname', code.co_name)}")
+            frame = frame.f_back
+        stacks[';'.join(reversed(names))] += 1
+
+    previous = signal.signal(signal.SIGPROF, sample)
+    signal.setitimer(signal.ITIMER_PROF, interval, interval)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous)
+        with open(path, 'w') as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
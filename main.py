@@ -1,14 +1,22 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import heapq
-import random
+from tkinter import ttk, messagebox, filedialog
 # import pandas as pd
 import numpy as np
-from collections import deque, defaultdict
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
+
+import algorithms
+import archive
+import ml_optimizer
+import smp
+from cache import ResultCache, run_cached
+from metrics import calculate_metrics
+from process_table import MetricsModel, ProcessModel, VirtualTable
+from selector import OBJECTIVES, select_algorithm
+from timeseries import schedule_series, write_csv
+from synthetic import generate_workload
+from worker import BackgroundTask, CANCELLED, DONE, FAILED
+
+# Rows of the Gantt chart and metrics tables shown in the results text
+DISPLAY_LIMIT = 1000
 
 class CPUSchedulerSimulator:
     def __init__(self, root):
@@ -17,36 +25,22 @@ class CPUSchedulerSimulator:
         self.root.geometry("1200x800")
         
         # Variables
-        self.processes = []
+        self.process_model = ProcessModel()
         self.time_quantum = tk.IntVar(value=3)
+        self.random_count = tk.IntVar(value=5)
+        self.cpus = tk.IntVar(value=1)
+        self.smp_mode = tk.StringVar(value=smp.MODES[0])
         self.selected_algorithm = tk.StringVar(value="FCFS")
         self.auto_mode = tk.BooleanVar(value=False)
+        self.objective = tk.StringVar(value="waiting")
+        self.switch_cost = tk.IntVar(value=0)
+        self.io_bursts = tk.BooleanVar(value=False)
         
         # Algorithms
-        self.algorithms = [
-            "FCFS",
-            "SJF (Non-Preemptive)",
-            "SJF (Preemptive)",
-            "Priority (Non-Preemptive)",
-            "Priority (Preemptive)",
-            "Round Robin",
-            "Multilevel Feedback Queue"
-        ]
-        
-        # ML Model for Quantum Optimization
-        self.quantum_model = self.train_quantum_model()
+        self.algorithms = list(algorithms.ALGORITHMS)
         
         self.setup_ui()
     
-    def train_quantum_model(self):
-        # Generate synthetic training data
-        X = np.random.randint(1, 20, (1000, 3))  # burst1, burst2, burst3
-        y = np.random.randint(1, 10, 1000)        # optimal quantum
-        
-        model = RandomForestRegressor(n_estimators=10)
-        model.fit(X, y)
-        return model
-    
     def setup_ui(self):
         # Main frames
         main_frame = ttk.Frame(self.root, padding="10")
@@ -56,15 +50,9 @@ class CPUSchedulerSimulator:
         input_frame = ttk.LabelFrame(main_frame, text="Process Input", padding="10")
         input_frame.pack(fill=tk.X, pady=5)
         
-        # Process table
-        self.tree = ttk.Treeview(input_frame, columns=("PID", "Arrival", "Burst", "Priority", "Type"), 
-                                show="headings", height=5)
-        self.tree.heading("PID", text="PID")
-        self.tree.heading("Arrival", text="Arrival")
-        self.tree.heading("Burst", text="Burst")
-        self.tree.heading("Priority", text="Priority")
-        self.tree.heading("Type", text="Type")
-        self.tree.pack(fill=tk.X)
+        # Process table: only the visible rows are widget items
+        self.table = VirtualTable(input_frame, self.process_model)
+        self.table.pack(fill=tk.X)
         
         # Process input controls
         control_frame = ttk.Frame(input_frame)
@@ -89,7 +77,7 @@ class CPUSchedulerSimulator:
         ttk.Label(control_frame, text="Type:").grid(row=0, column=8, padx=2)
         self.type_combobox = ttk.Combobox(control_frame, 
                                          values=["CPU-Bound", "I/O-Bound", "Interactive"], 
-                                         width=10)
+                                         width=10, state="readonly")
         self.type_combobox.grid(row=0, column=9, padx=2)
         self.type_combobox.current(0)
         
@@ -97,8 +85,9 @@ class CPUSchedulerSimulator:
                   command=self.add_process).grid(row=0, column=10, padx=5)
         ttk.Button(control_frame, text="Generate Random", 
                   command=self.generate_random).grid(row=0, column=11, padx=5)
+        ttk.Entry(control_frame, textvariable=self.random_count, width=8).grid(row=0, column=12, padx=2)
         ttk.Button(control_frame, text="Clear All", 
-                  command=self.clear_processes).grid(row=0, column=12, padx=5)
+                  command=self.clear_processes).grid(row=0, column=13, padx=5)
         
         # Algorithm selection
         algo_frame = ttk.LabelFrame(main_frame, text="Scheduling Configuration", padding="10")
@@ -114,6 +103,25 @@ class CPUSchedulerSimulator:
         
         ttk.Checkbutton(algo_frame, text="Auto Mode (AI Selects Best Algorithm)", 
                        variable=self.auto_mode).grid(row=0, column=4, padx=10)
+        ttk.Button(algo_frame, text="Suggest Quantum", 
+                  command=self.suggest_quantum).grid(row=0, column=5, padx=5)
+        
+        ttk.Label(algo_frame, text="CPUs:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Spinbox(algo_frame, from_=1, to=1024, textvariable=self.cpus, 
+                   width=6).grid(row=1, column=1, sticky=tk.W, pady=(5, 0))
+        ttk.Label(algo_frame, text="Run Queues:").grid(row=1, column=2, padx=5, pady=(5, 0))
+        ttk.Combobox(algo_frame, textvariable=self.smp_mode, values=smp.MODES, 
+                    state="readonly", width=8).grid(row=1, column=3, pady=(5, 0))
+        ttk.Label(algo_frame, text="Auto Mode Objective:").grid(row=1, column=4, padx=5, pady=(5, 0))
+        ttk.Combobox(algo_frame, textvariable=self.objective, values=list(OBJECTIVES), 
+                    state="readonly", width=12).grid(row=1, column=5, sticky=tk.W, pady=(5, 0))
+        
+        ttk.Label(algo_frame, text="Context Switch Cost:").grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Spinbox(algo_frame, from_=0, to=100, textvariable=self.switch_cost, 
+                   width=6).grid(row=2, column=1, sticky=tk.W, pady=(5, 0))
+        ttk.Checkbutton(algo_frame, text="I/O Bursts by Process Type", 
+                       variable=self.io_bursts).grid(row=2, column=2, columnspan=2, sticky=tk.W,
+                                                     padx=5, pady=(5, 0))
         
         # Buttons
         button_frame = ttk.Frame(main_frame)
@@ -125,9 +133,21 @@ class CPUSchedulerSimulator:
                   command=self.show_gantt).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Show Metrics", 
                   command=self.show_metrics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Show Time Series", 
+                  command=self.show_timeseries).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Save Results", 
+                  command=self.save_results).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Open Results", 
+                  command=self.open_results).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Reset", 
                   command=self.reset).pack(side=tk.LEFT, padx=5)
         
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", 
+                                        command=self.cancel_simulation, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.progress = ttk.Progressbar(button_frame, length=200, maximum=1.0)
+        self.progress.pack(side=tk.RIGHT, padx=5)
+        
         # Results frame
         self.results_frame = ttk.LabelFrame(main_frame, text="Simulation Results", padding="10")
         self.results_frame.pack(fill=tk.BOTH, expand=True)
@@ -143,7 +163,14 @@ class CPUSchedulerSimulator:
         # Initialize simulation data
         self.simulation_data = None
         self.gantt_data = None
+        self.task = None
+        # Re-running an unchanged workload reuses the earlier result
+        self.cache = ResultCache()
         self.metrics = None
+        # Settings of the run in progress and of the results shown, saved
+        # with them
+        self.run_settings = {}
+        self.simulation_meta = {}
     
     def add_process(self):
         try:
@@ -153,7 +180,8 @@ class CPUSchedulerSimulator:
             priority = int(self.priority_entry.get())
             process_type = self.type_combobox.get()
             
-            self.tree.insert("", tk.END, values=(pid, arrival, burst, priority, process_type))
+            self.process_model.append(pid, arrival, burst, priority, process_type)
+            self.table.refresh()
             
             # Clear entries
             self.pid_entry.delete(0, tk.END)
@@ -165,345 +193,142 @@ class CPUSchedulerSimulator:
             messagebox.showerror("Input Error", "Please enter valid numbers for arrival, burst and priority")
     
     def generate_random(self):
-        for i in range(5):  # Generate 5 random processes
-            pid = f"P{i+1}"
-            arrival = random.randint(0, 5)
-            burst = random.randint(1, 10)
-            priority = random.randint(1, 5)
-            process_type = random.choice(["CPU-Bound", "I/O-Bound", "Interactive"])
-            
-            self.tree.insert("", tk.END, values=(pid, arrival, burst, priority, process_type))
+        try:
+            n = self.random_count.get()
+        except tk.TclError:
+            n = 0
+        if n < 1:
+            messagebox.showerror("Input Error", "Please enter a positive number of processes")
+            return
+        
+        workload = generate_workload(n)
+        workload.pid = np.char.add("P", workload.pid.astype(f"U{len(str(n))}"))
+        self.process_model.extend(workload)
+        self.table.refresh()
     
     def clear_processes(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.process_model.clear()
+        self.table.refresh()
+    
+    def get_processes(self):
+        # The model, not the table widget, holds the processes
+        return self.process_model.workload
     
     def run_simulation(self):
-        # Get processes from tree
-        processes = []
-        for item in self.tree.get_children():
-            values = self.tree.item(item, 'values')
-            processes.append({
-                'pid': values[0],
-                'arrival': int(values[1]),
-                'burst': int(values[2]),
-                'priority': int(values[3]),
-                'type': values[4]
-            })
-        
+        if self.task is not None:
+            messagebox.showinfo("Simulation", "A simulation is already running")
+            return
+        processes = self.get_processes()
         if not processes:
             messagebox.showwarning("Warning", "No processes to schedule")
             return
         
         # Get algorithm
         algorithm = self.selected_algorithm.get()
+        auto = None
         
-        # Auto mode - select best algorithm
+        # Auto mode - the worker picks the best algorithm for the objective,
+        # trying the current quantum and the optimizer's suggestion
         if self.auto_mode.get():
-            algorithm = self.select_best_algorithm(processes)
-            self.output_text.insert(tk.END, f"Auto Mode Selected: {algorithm}\n")
-        
-        # Run selected algorithm
-        if algorithm == "FCFS":
-            results = self.fcfs(processes)
-        elif algorithm == "SJF (Non-Preemptive)":
-            results = self.sjf(processes, preemptive=False)
-        elif algorithm == "SJF (Preemptive)":
-            results = self.sjf(processes, preemptive=True)
-        elif algorithm == "Priority (Non-Preemptive)":
-            results = self.priority(processes, preemptive=False)
-        elif algorithm == "Priority (Preemptive)":
-            results = self.priority(processes, preemptive=True)
-        elif algorithm == "Round Robin":
-            results = self.round_robin(processes)
-        elif algorithm == "Multilevel Feedback Queue":
-            results = self.mlfq(processes)
-        
-        # Store results
-        self.simulation_data = results
-        self.calculate_metrics(results)
-        
-        # Display results
-        self.display_results(results)
-    
-    def select_best_algorithm(self, processes):
-        # Simple heuristic - in real implementation would use ML model
-        avg_burst = sum(p['burst'] for p in processes) / len(processes)
-        variance = np.var([p['burst'] for p in processes])
-        
-        if variance < 2 and avg_burst < 5:
-            return "SJF (Non-Preemptive)"
-        elif variance > 5 and len(processes) > 5:
-            return "Round Robin"
-        else:
-            return "FCFS"
-    
-    def fcfs(self, processes):
-        # Sort by arrival time
-        processes = sorted(processes, key=lambda x: x['arrival'])
-        
-        current_time = 0
-        results = []
-        
-        for p in processes:
-            if current_time < p['arrival']:
-                current_time = p['arrival']
-            
-            results.append({
-                'pid': p['pid'],
-                'start': current_time,
-                'end': current_time + p['burst'],
-                'arrival': p['arrival'],
-                'burst': p['burst']
-            })
-            
-            current_time += p['burst']
+            auto = (self.objective.get(), [self.time_quantum.get()])
+            algorithm = "auto mode selection"
         
-        return results
+        # Simulate on a worker thread; _poll_simulation picks up the result
+        self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, f"Running {algorithm}...\n")
+        self.progress['value'] = 0
+        self.cancel_button.configure(state=tk.NORMAL)
+        io_profiles = algorithms.IO_PROFILES if self.io_bursts.get() else None
+        self.run_settings = {'cpus': self.cpus.get(), 'mode': self.smp_mode.get(),
+                             'switch_cost': self.switch_cost.get(), 'io_bursts': bool(io_profiles)}
+        self.task = BackgroundTask(_simulate, algorithm, processes, self.time_quantum.get(),
+                                   self.cpus.get(), self.smp_mode.get(), self.cache, auto,
+                                   self.switch_cost.get(), io_profiles).start()
+        self.root.after(50, self._poll_simulation)
     
-    def sjf(self, processes, preemptive=False):
-        processes = sorted(processes, key=lambda x: x['arrival'])
-        
-        current_time = 0
-        ready_queue = []
-        results = []
-        remaining_time = {p['pid']: p['burst'] for p in processes}
-        n = len(processes)
-        completed = 0
-        
-        while completed < n:
-            # Add arriving processes to ready queue
-            for p in processes:
-                if p['arrival'] == current_time:
-                    heapq.heappush(ready_queue, (p['burst'], p['pid'], p))
-            
-            if ready_queue:
-                burst, pid, p = heapq.heappop(ready_queue)
-                
-                if preemptive:
-                    execute_time = 1
-                else:
-                    execute_time = burst
-                
-                # Check if new process arrives with shorter burst during execution
-                if preemptive:
-                    for new_p in processes:
-                        if new_p['arrival'] > current_time and new_p['arrival'] < current_time + execute_time:
-                            if new_p['burst'] < remaining_time[pid]:
-                                # Preempt current process
-                                remaining_time[pid] -= (new_p['arrival'] - current_time)
-                                heapq.heappush(ready_queue, (remaining_time[pid], pid, p))
-                                execute_time = new_p['arrival'] - current_time
-                                break
-                
-                results.append({
-                    'pid': pid,
-                    'start': current_time,
-                    'end': current_time + execute_time,
-                    'arrival': p['arrival'],
-                    'burst': p['burst']
-                })
-                
-                remaining_time[pid] -= execute_time
-                current_time += execute_time
-                
-                if remaining_time[pid] > 0:
-                    heapq.heappush(ready_queue, (remaining_time[pid], pid, p))
-                else:
-                    completed += 1
-            else:
-                current_time += 1
+    def _poll_simulation(self):
+        task = self.task
+        self.progress['value'] = task.progress
+        if not task.finished:
+            self.root.after(50, self._poll_simulation)
+            return
         
-        return results
-    
-    def round_robin(self, processes):
-        quantum = self.time_quantum.get()
-        processes = sorted(processes, key=lambda x: x['arrival'])
-        
-        ready_queue = deque()
-        current_time = 0
-        results = []
-        remaining_time = {p['pid']: p['burst'] for p in processes}
-        n = len(processes)
-        completed = 0
-        
-        # Initial population of ready queue
-        i = 0
-        while i < n and processes[i]['arrival'] <= current_time:
-            ready_queue.append(processes[i])
-            i += 1
-        
-        while completed < n:
-            if ready_queue:
-                p = ready_queue.popleft()
-                execute_time = min(quantum, remaining_time[p['pid']])
-                
-                results.append({
-                    'pid': p['pid'],
-                    'start': current_time,
-                    'end': current_time + execute_time,
-                    'arrival': p['arrival'],
-                    'burst': p['burst']
-                })
-                
-                remaining_time[p['pid']] -= execute_time
-                current_time += execute_time
-                
-                # Add newly arrived processes
-                while i < n and processes[i]['arrival'] <= current_time:
-                    ready_queue.append(processes[i])
-                    i += 1
-                
-                if remaining_time[p['pid']] > 0:
-                    ready_queue.append(p)
-                else:
-                    completed += 1
+        self.task = None
+        self.cancel_button.configure(state=tk.DISABLED)
+        if task.state == DONE:
+            results, metrics, text, algorithm, quantum = task.result
+            self.selected_algorithm.set(algorithm)
+            self.time_quantum.set(quantum)
+            self.simulation_data = results
+            self.metrics = metrics
+            self.simulation_meta = dict(self.run_settings, algorithm=algorithm, quantum=quantum)
+            self.output_text.delete(1.0, tk.END)
+            self.output_text.insert(tk.END, text)
+        elif task.state == CANCELLED:
+            self.progress['value'] = 0
+            self.output_text.insert(tk.END, "Simulation cancelled\n")
+        elif task.state == FAILED:
+            self.progress['value'] = 0
+            if isinstance(task.error, ValueError):
+                messagebox.showerror("Algorithm Error", str(task.error))
             else:
-                current_time += 1
-                # Check for new arrivals
-                while i < n and processes[i]['arrival'] <= current_time:
-                    ready_queue.append(processes[i])
-                    i += 1
-        
-        return results
+                messagebox.showerror("Simulation Error", repr(task.error))
+    
+    def cancel_simulation(self):
+        if self.task is not None:
+            self.task.cancel()
+    
+    def suggest_quantum(self, processes=None):
+        # Loads the trained optimizer on first use
+        if processes is None:
+            processes = self.get_processes()
+            if not processes:
+                messagebox.showwarning("Warning", "No processes to schedule")
+                return None
+        try:
+            optimizer = ml_optimizer.get_optimizer()
+        except (OSError, ValueError) as e:
+            messagebox.showwarning("Quantum Optimizer", str(e))
+            return None
+        
+        quantum = optimizer.predict_one(processes)
+        self.time_quantum.set(quantum)
+        return quantum
     
     def calculate_metrics(self, results):
-        if not results:
-            return
-        
-        # Calculate metrics
-        process_data = {}
-        for event in results:
-            pid = event['pid']
-            if pid not in process_data:
-                process_data[pid] = {
-                    'arrival': event['arrival'],
-                    'burst': event['burst'],
-                    'start_times': [],
-                    'end_times': []
-                }
-            process_data[pid]['start_times'].append(event['start'])
-            process_data[pid]['end_times'].append(event['end'])
-        
-        metrics = []
-        total_waiting = 0
-        total_turnaround = 0
-        total_response = 0
-        
-        for pid, data in process_data.items():
-            start = min(data['start_times'])
-            end = max(data['end_times'])
-            arrival = data['arrival']
-            burst = data['burst']
-            
-            turnaround = end - arrival
-            waiting = turnaround - burst
-            response = start - arrival
-            
-            total_waiting += waiting
-            total_turnaround += turnaround
-            total_response += response
-            
-            metrics.append({
-                'PID': pid,
-                'Arrival': arrival,
-                'Burst': burst,
-                'Start': start,
-                'Finish': end,
-                'Waiting': waiting,
-                'Turnaround': turnaround,
-                'Response': response
-            })
-        
-        n = len(process_data)
-        avg_waiting = total_waiting / n
-        avg_turnaround = total_turnaround / n
-        avg_response = total_response / n
-        
-        # Calculate CPU utilization
-        total_time = max(event['end'] for event in results)
-        busy_time = sum(event['end'] - event['start'] for event in results)
-        utilization = (busy_time / total_time) * 100
-        
-        self.metrics = {
-            'per_process': metrics,
-            'average': {
-                'Waiting': avg_waiting,
-                'Turnaround': avg_turnaround,
-                'Response': avg_response,
-                'Utilization': utilization
-            }
-        }
+        self.metrics = calculate_metrics(results)
     
     def display_results(self, results):
         self.output_text.delete(1.0, tk.END)
-        
-        # Display Gantt chart
-        self.output_text.insert(tk.END, "Gantt Chart:\n")
-        self.output_text.insert(tk.END, "Time\tProcess\n")
-        
-        for event in results:
-            self.output_text.insert(tk.END, f"{event['start']}-{event['end']}\t{event['pid']}\n")
-        
-        # Display metrics if calculated
-        if self.metrics:
-            self.output_text.insert(tk.END, "\nProcess Metrics:\n")
-            self.output_text.insert(tk.END, "PID\tArrival\tBurst\tStart\tFinish\tWaiting\tTurnaround\tResponse\n")
-            
-            for metric in self.metrics['per_process']:
-                self.output_text.insert(tk.END, 
-                    f"{metric['PID']}\t{metric['Arrival']}\t{metric['Burst']}\t"
-                    f"{metric['Start']}\t{metric['Finish']}\t{metric['Waiting']}\t"
-                    f"{metric['Turnaround']}\t{metric['Response']}\n")
-            
-            self.output_text.insert(tk.END, "\nAverage Metrics:\n")
-            self.output_text.insert(tk.END, 
-                f"Waiting Time: {self.metrics['average']['Waiting']:.2f}\n")
-            self.output_text.insert(tk.END, 
-                f"Turnaround Time: {self.metrics['average']['Turnaround']:.2f}\n")
-            self.output_text.insert(tk.END, 
-                f"Response Time: {self.metrics['average']['Response']:.2f}\n")
-            self.output_text.insert(tk.END, 
-                f"CPU Utilization: {self.metrics['average']['Utilization']:.2f}%\n")
+        self.output_text.insert(tk.END, format_results(results, self.metrics))
     
     def show_gantt(self):
         if not self.simulation_data:
             messagebox.showwarning("Warning", "No simulation data to display")
             return
         
+        # matplotlib takes longer to import than the rest of the app, so
+        # it is only loaded once a chart is actually requested
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from gantt import draw_gantt
+        
         # Create a new window
         gantt_window = tk.Toplevel(self.root)
         gantt_window.title("Gantt Chart")
         gantt_window.geometry("800x400")
         
-        # Create figure
-        fig, ax = plt.subplots(figsize=(8, 4))
-        
-        # Process IDs for y-axis
-        processes = sorted(list(set(event['pid'] for event in self.simulation_data)))
-        y_ticks = range(len(processes))
-        y_labels = processes
-        
-        # Create bars
-        for event in self.simulation_data:
-            start = event['start']
-            duration = event['end'] - event['start']
-            pid = event['pid']
-            y_pos = processes.index(pid)
-            
-            ax.broken_barh([(start, duration)], (y_pos-0.4, 0.8), 
-                          facecolors=('tab:blue'))
-        
-        ax.set_yticks(y_ticks)
-        ax.set_yticklabels(y_labels)
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Processes')
-        ax.set_title('CPU Scheduling Gantt Chart')
-        ax.grid(True)
+        # Create figure; the renderer merges slices to screen resolution
+        # and refines them as the view is zoomed
+        fig = Figure(figsize=(8, 4))
+        ax = fig.add_subplot()
+        # Keep a reference: matplotlib only holds its callbacks weakly
+        gantt_window.renderer = draw_gantt(ax, self.simulation_data)
         
         # Embed in Tkinter
         canvas = FigureCanvasTkAgg(fig, master=gantt_window)
         canvas.draw()
+        NavigationToolbar2Tk(canvas, gantt_window).update()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Close button
@@ -520,23 +345,13 @@ class CPUSchedulerSimulator:
         metrics_window.title("Detailed Metrics")
         metrics_window.geometry("600x400")
         
-        # Create treeview
-        tree = ttk.Treeview(metrics_window, columns=("PID", "Waiting", "Turnaround", "Response"), 
-                           show="headings")
-        tree.heading("PID", text="PID")
-        tree.heading("Waiting", text="Waiting Time")
-        tree.heading("Turnaround", text="Turnaround Time")
-        tree.heading("Response", text="Response Time")
-        
-        for metric in self.metrics['per_process']:
-            tree.insert("", tk.END, values=(
-                metric['PID'],
-                metric['Waiting'],
-                metric['Turnaround'],
-                metric['Response']
-            ))
-        
-        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Virtualized table: only the visible rows become Treeview items
+        model = MetricsModel(self.metrics['per_process'])
+        table = VirtualTable(metrics_window, model, columns=model.columns, height=10)
+        table.tree.heading("Waiting", text="Waiting Time")
+        table.tree.heading("Turnaround", text="Turnaround Time")
+        table.tree.heading("Response", text="Response Time")
+        table.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Add average metrics
         avg_frame = ttk.Frame(metrics_window)
@@ -546,19 +361,222 @@ class CPUSchedulerSimulator:
         ttk.Label(avg_frame, text=f"Average Turnaround Time: {self.metrics['average']['Turnaround']:.2f}").pack()
         ttk.Label(avg_frame, text=f"Average Response Time: {self.metrics['average']['Response']:.2f}").pack()
         ttk.Label(avg_frame, text=f"CPU Utilization: {self.metrics['average']['Utilization']:.2f}%").pack()
+        for name in ('Waiting', 'Response'):
+            tail = self.metrics['percentiles'][name]
+            ttk.Label(avg_frame, text=f"{name} Time p95 / p99: {tail['p95']:.2f} / {tail['p99']:.2f}").pack()
         
         # Close button
         ttk.Button(metrics_window, text="Close", 
                   command=metrics_window.destroy).pack(pady=10)
     
+    def show_timeseries(self):
+        if not self.simulation_data:
+            messagebox.showwarning("Warning", "No simulation data to display")
+            return
+        
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        
+        series = schedule_series(self.simulation_data)
+        series_window = tk.Toplevel(self.root)
+        series_window.title(f"Time Series ({series['window']} time units per window)")
+        series_window.geometry("800x600")
+        
+        # One panel per series, sharing the time axis
+        fig = Figure(figsize=(8, 6))
+        panels = fig.subplots(3, 1, sharex=True)
+        for ax, (name, label) in zip(panels, (('ready_queue', "Ready Queue"),
+                                              ('utilization', "Utilization %"),
+                                              ('context_switches', "Context Switches"))):
+            ax.step(series['time'], series[name], where='post')
+            ax.set_ylabel(label)
+            ax.grid(True, alpha=0.3)
+        panels[-1].set_xlabel("Time")
+        fig.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(fig, master=series_window)
+        canvas.draw()
+        NavigationToolbar2Tk(canvas, series_window).update()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        def export():
+            path = filedialog.asksaveasfilename(parent=series_window, defaultextension=".csv",
+                                                filetypes=[("CSV files", "*.csv")])
+            if path:
+                with open(path, "w", newline="") as f:
+                    write_csv(series, f)
+        
+        buttons = ttk.Frame(series_window)
+        buttons.pack(pady=10)
+        ttk.Button(buttons, text="Export CSV", command=export).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Close", command=series_window.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def save_results(self):
+        if not self.simulation_data:
+            messagebox.showwarning("Warning", "No simulation data to save")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".sched",
+                                            filetypes=[("Schedule files", "*.sched"),
+                                                       ("CSV files", "*.csv"),
+                                                       ("JSON files", "*.json")])
+        if not path:
+            return
+        try:
+            if path.lower().endswith(".csv"):
+                with open(path, "w", newline="") as f:
+                    archive.write_csv(self.simulation_data, f)
+            elif path.lower().endswith(".json"):
+                with open(path, "w") as f:
+                    archive.write_json(self.simulation_data, f, self.simulation_meta, self.metrics)
+            else:
+                archive.save(path, self.simulation_data, self.simulation_meta)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Save Results", str(e))
+    
+    def open_results(self):
+        if self.task is not None:
+            messagebox.showinfo("Simulation", "A simulation is already running")
+            return
+        path = filedialog.askopenfilename(filetypes=[("Schedule files", "*.sched"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            loaded = archive.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Open Results", str(e))
+            return
+        
+        # The file's workload becomes the process list, so it can be re-run
+        self.process_model.clear()
+        self.process_model.extend(loaded['workload'])
+        self.table.refresh()
+        meta = loaded['meta']
+        for var, name in ((self.selected_algorithm, 'algorithm'), (self.time_quantum, 'quantum'),
+                          (self.cpus, 'cpus'), (self.smp_mode, 'mode'),
+                          (self.switch_cost, 'switch_cost'), (self.io_bursts, 'io_bursts')):
+            if meta.get(name) is not None:
+                var.set(meta[name])
+        self.simulation_data = None
+        self.metrics = None
+        self.output_text.delete(1.0, tk.END)
+        schedule = loaded['schedule']
+        if schedule is None:
+            self.output_text.insert(tk.END, f"Opened {len(loaded['workload'])} processes from {path}\n")
+            return
+        
+        # Metrics of a large schedule take a while: compute them like a run
+        self.output_text.insert(tk.END, f"Opening {path}...\n")
+        self.progress['value'] = 0
+        self.run_settings = {name: value for name, value in meta.items()
+                             if name not in ('algorithm', 'quantum')}
+        self.task = BackgroundTask(_open_results, schedule, f"Opened {path}\n",
+                                   self.selected_algorithm.get(), self.time_quantum.get()).start()
+        self.root.after(50, self._poll_simulation)
+    
     def reset(self):
+        self.cancel_simulation()
         self.clear_processes()
         self.output_text.delete(1.0, tk.END)
         self.simulation_data = None
         self.metrics = None
+        self.simulation_meta = {}
         self.time_quantum.set(3)
         self.selected_algorithm.set("FCFS")
         self.auto_mode.set(False)
+        self.switch_cost.set(0)
+        self.io_bursts.set(False)
+
+def _simulate(progress, algorithm, processes, quantum, cpus, mode, cache=None, auto=None,
+              switch_cost=0, io_profiles=None):
+    # Runs on the worker thread: no Tk calls in here
+    header = ""
+    if auto is not None:
+        objective, quanta = auto
+        # Loading the optimizer imports scikit-learn and unpickles the
+        # model, so it happens here rather than on the Tk thread.  Any
+        # error but a missing model fails the task like a simulation error.
+        try:
+            quanta = quanta + [ml_optimizer.get_optimizer().predict_one(processes)]
+        except FileNotFoundError:
+            pass
+        # Selection gets the first half of the progress bar
+        choice = select_algorithm(processes, objective, quanta=quanta, cpus=cpus, mode=mode,
+                                  cache=cache, progress=lambda done: progress(done / 2),
+                                  switch_cost=switch_cost, io_profiles=io_profiles)
+        algorithm = choice['algorithm']
+        quantum = choice['quantum'] or quantum
+        evaluations = sum(row['how'] in ('simulated', 'closed-form') for row in choice['evaluated'])
+        header = (f"Auto Mode Selected: {algorithm}"
+                  + (f" (quantum {quantum})" if choice['quantum'] else "")
+                  + f" for {OBJECTIVES[objective].lower()}, "
+                  f"{evaluations} evaluations "
+                  f"on up to {choice['sample']} processes\n")
+        report = progress
+        progress = lambda done: report(0.5 + done / 2)
+    results, metrics = run_cached(cache, algorithm, processes, quantum, cpus, mode, progress,
+                                  switch_cost, io_profiles)
+    if cpus > 1:
+        header += f"{cpus} CPUs, {mode} run queues\n"
+    if switch_cost:
+        header += f"Context switch cost: {switch_cost}\n"
+    if io_profiles:
+        header += ("I/O bursts (CPU time, I/O time): "
+                   + ", ".join(f"{name} {cpu}/{io}" for name, (cpu, io) in io_profiles.items()) + "\n")
+    return results, metrics, header + format_results(results, metrics), algorithm, quantum
+
+
+def _open_results(progress, schedule, header, algorithm, quantum):
+    # Runs on the worker thread, like _simulate
+    metrics = calculate_metrics(schedule)
+    progress(1.0)
+    return schedule, metrics, header + format_results(schedule, metrics), algorithm, quantum
+
+
+def format_results(results, metrics, limit=DISPLAY_LIMIT):
+    """Results text for the output pane, built in one string.
+
+    Only the first ``limit`` slices and processes are listed; the full
+    data stays available through the Gantt chart and metrics windows.
+    """
+    if getattr(results, 'cpu', None) is not None:
+        lines = ["Gantt Chart:", "Time\tProcess\tCPU"]
+        for event in results[:limit]:
+            lines.append(f"{event['start']}-{event['end']}\t{event['pid']}\t{event['cpu']}")
+    else:
+        lines = ["Gantt Chart:", "Time\tProcess"]
+        for event in results[:limit]:
+            lines.append(f"{event['start']}-{event['end']}\t{event['pid']}")
+    if len(results) > limit:
+        lines.append(f"... ({len(results) - limit} more slices)")
+    
+    # Display metrics if calculated
+    if metrics:
+        per_process = metrics['per_process']
+        lines += ["", "Process Metrics:",
+                  "PID\tArrival\tBurst\tStart\tFinish\tWaiting\tTurnaround\tResponse"]
+        for metric in per_process[:limit]:
+            lines.append(
+                f"{metric['PID']}\t{metric['Arrival']}\t{metric['Burst']}\t"
+                f"{metric['Start']}\t{metric['Finish']}\t{metric['Waiting']}\t"
+                f"{metric['Turnaround']}\t{metric['Response']}")
+        if len(per_process) > limit:
+            lines.append(f"... ({len(per_process) - limit} more processes)")
+        
+        average = metrics['average']
+        lines += ["", "Average Metrics:",
+                  f"Waiting Time: {average['Waiting']:.2f}",
+                  f"Turnaround Time: {average['Turnaround']:.2f}",
+                  f"Response Time: {average['Response']:.2f}",
+                  f"CPU Utilization: {average['Utilization']:.2f}%"]
+        lines += ["", "Percentiles (p50 / p95 / p99):"]
+        for name, tail in metrics['percentiles'].items():
+            lines.append(f"{name} Time: {tail['p50']:.2f} / {tail['p95']:.2f} / {tail['p99']:.2f}")
+        if 'per_core' in metrics:
+            lines += ["", "Per-CPU Utilization:"]
+            lines += [f"CPU {c}: {busy:.2f}%" for c, busy in enumerate(metrics['per_core'][:limit])]
+    return "\n".join(lines) + "\n"
+
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,190 @@
+"""Round Robin time-quantum optimizer.
+
+The model is trained offline on labels produced by the simulator itself:
+every training workload is run under Round Robin for each candidate
+quantum (via ``compare.compare``), paying ``switch_cost`` per context
+switch, and labelled with the quantum that gave the lowest average
+turnaround.  The fitted model is pickled next to this
+module and only loaded when auto mode or a quantum suggestion needs it;
+scikit-learn is imported at that point, not when the simulator starts.
+
+Train a model with::
+
+    python ml_optimizer.py --workloads 2000
+"""
+import argparse
+import os
+import pickle
+
+import numpy as np
+
+from algorithms import DEFAULT_QUANTUM
+from workload import TYPE_NAMES, Workload, as_workload
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quantum_model.pkl")
+
+QUANTUM_CANDIDATES = (1, 2, 3, 4, 5, 6, 8, 10, 12, 16, 20, 24, 32)
+
+FEATURE_NAMES = [
+    'log_processes', 'burst_mean', 'burst_std', 'burst_cv', 'burst_min', 'burst_p25',
+    'burst_median', 'burst_p75', 'burst_p90', 'burst_max', 'mean_interarrival', 'load',
+    'priority_std'
+] + [f'type_{name}' for name in TYPE_NAMES]
+
+
+def workload_features(processes):
+    """Fixed-length feature vector describing a workload."""
+    workload = as_workload(processes)
+    n = len(workload)
+    if n == 0:
+        return np.zeros(len(FEATURE_NAMES))
+    burst = workload.burst.astype(np.float64)
+    arrival = workload.arrival
+    mean = burst.mean()
+    std = burst.std()
+    p25, median, p75, p90 = np.percentile(burst, [25, 50, 75, 90])
+    span = float(arrival.max() - arrival.min())
+    interarrival = span / (n - 1) if n > 1 else 0.0
+    # Offered load: work arriving per unit time (> 1 means a growing queue)
+    load = burst.sum() / span if span > 0 else float(n)
+    types = np.bincount(workload.type_code, minlength=len(TYPE_NAMES))[:len(TYPE_NAMES)] / n
+    return np.concatenate([
+        [np.log(n), mean, std, std / mean if mean else 0.0, burst.min(), p25, median, p75, p90,
+         burst.max(), interarrival, load, workload.priority.std()],
+        types
+    ])
+
+
+# Context switch cost of the labelling runs.  With free switches the
+# smallest quantum always has the lowest turnaround.
+DEFAULT_SWITCH_COST = 1
+
+
+def label_workloads(workloads, candidates=QUANTUM_CANDIDATES, max_workers=None,
+                    switch_cost=DEFAULT_SWITCH_COST):
+    """Simulate every candidate quantum; returns (best quanta, score table).
+
+    The score table holds the average turnaround, one row per workload and
+    one column per candidate.
+    """
+    from compare import compare
+
+    rows = compare(workloads, ["Round Robin"], candidates, max_workers=max_workers,
+                   switch_cost=switch_cost)
+    column = {q: k for k, q in enumerate(candidates)}
+    scores = np.full((len(workloads), len(candidates)), np.inf)
+    for row in rows:
+        if row['avg_turnaround'] is not None:
+            scores[row['workload'], column[row['quantum']]] = row['avg_turnaround']
+    best = np.asarray(candidates)[np.argmin(scores, axis=1)]
+    return best, scores
+
+
+def training_workloads(count, seed=None, max_processes=200):
+    """Varied random workloads: sizes, burst spreads and arrival densities."""
+    rng = np.random.default_rng(seed)
+    workloads = []
+    for _ in range(count):
+        n = int(rng.integers(5, max_processes + 1))
+        burst = np.maximum(1, np.rint(rng.lognormal(rng.uniform(0.5, 3.0), rng.uniform(0.1, 1.5), n)))
+        span = rng.uniform(0.1, 2.0) * burst.sum()
+        arrival = np.sort(rng.integers(0, int(span) + 1, n))
+        workloads.append(Workload(arrival, burst, rng.integers(1, 6, n), rng.integers(0, len(TYPE_NAMES), n)))
+    return workloads
+
+
+class QuantumOptimizer:
+    """Predicts a good Round Robin quantum from workload features."""
+
+    def __init__(self, model=None, candidates=QUANTUM_CANDIDATES):
+        self.model = model
+        self.candidates = np.asarray(candidates)
+
+    def fit(self, workloads, quanta, n_estimators=100, seed=None):
+        from sklearn.ensemble import RandomForestRegressor
+
+        X = np.array([workload_features(w) for w in workloads])
+        self.model = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=-1)
+        # Quanta span an order of magnitude, so regress in log space
+        self.model.fit(X, np.log(np.asarray(quanta, dtype=np.float64)))
+        return self
+
+    def predict(self, workloads):
+        """Suggested quantum for each workload, snapped to a candidate."""
+        if self.model is None:
+            raise RuntimeError("QuantumOptimizer has no trained model")
+        X = np.array([workload_features(w) for w in workloads])
+        if not len(X):
+            return np.zeros(0, dtype=np.int64)
+        predicted = self.model.predict(X)
+        nearest = np.abs(np.log(self.candidates)[None, :] - predicted[:, None]).argmin(axis=1)
+        return self.candidates[nearest]
+
+    def predict_one(self, processes):
+        return int(self.predict([processes])[0])
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        with open(path, "wb") as f:
+            pickle.dump({'model': self.model, 'candidates': self.candidates.tolist(),
+                         'features': FEATURE_NAMES}, f)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get('features') != FEATURE_NAMES:
+            raise ValueError(f"{path} was trained on a different feature set; retrain it")
+        return cls(state['model'], state['candidates'])
+
+
+_optimizer = None
+
+
+def get_optimizer(path=DEFAULT_MODEL_PATH):
+    """The persisted optimizer, loaded on first use.
+
+    Raises ``FileNotFoundError`` if no model has been trained yet.
+    """
+    global _optimizer
+    if _optimizer is None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"No trained quantum model at {path}; run 'python ml_optimizer.py' to train one")
+        _optimizer = QuantumOptimizer.load(path)
+    return _optimizer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the Round Robin quantum optimizer.")
+    parser.add_argument("--workloads", type=int, default=2000, help="training workloads to simulate")
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction kept back for evaluation")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for labelling")
+    parser.add_argument("--switch-cost", type=int, default=DEFAULT_SWITCH_COST,
+                        help=f"context switch time of the labelling runs (default: {DEFAULT_SWITCH_COST})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    workloads = training_workloads(args.workloads, seed=args.seed)
+    best, scores = label_workloads(workloads, max_workers=args.workers, switch_cost=args.switch_cost)
+
+    split = int(len(workloads) * (1 - args.holdout))
+    optimizer = QuantumOptimizer().fit(workloads[:split], best[:split], seed=args.seed)
+    optimizer.save(args.output)
+    print(f"Trained on {split} workloads, saved to {args.output}")
+
+    if split < len(workloads):
+        # Regret: how much longer turnaround is with the suggested quantum than the best one
+        predicted = optimizer.predict(workloads[split:])
+        column = {q: k for k, q in enumerate(QUANTUM_CANDIDATES)}
+        held = scores[split:]
+        chosen = held[np.arange(len(held)), [column[q] for q in predicted.tolist()]]
+        regret = chosen / held.min(axis=1) - 1
+        default = held[:, column[DEFAULT_QUANTUM]] / held.min(axis=1) - 1
+        print(f"Holdout: exact match {np.mean(predicted == best[split:]):.1%}, "
+              f"mean regret {regret.mean():.2%} "
+              f"(fixed quantum {DEFAULT_QUANTUM}: {default.mean():.2%})")
+
+
+if __name__ == "__main__":
+    main()
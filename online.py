@@ -0,0 +1,377 @@
+"""Incremental schedulers for live arrival streams.
+
+Where ``algorithms`` schedules a complete workload in one call, the
+classes here keep their state between calls so processes can be submitted
+while the simulation is running::
+
+    sched = RoundRobinScheduler(quantum=4)
+    sched.submit({'pid': 'P1', 'arrival': 0, 'burst': 10})
+    sched.advance_to(5)
+    for event in sched.poll_events():
+        ...
+    sched.submit({'pid': 'P2', 'burst': 3})   # arrives now
+    sched.drain()
+
+Every state change is reported as an ``Event`` (``dispatch``,
+``preempt`` or ``complete``); quantum expiry counts as a preemption.
+Pending arrivals sit in a heap and the ready queue is a heap (SJF,
+Priority) or deques (RR, MLFQ), so each event costs O(log n).  The
+schedules produced match the batch engines for the same workload.
+"""
+import heapq
+import math
+from collections import deque, namedtuple
+
+from algorithms import DEFAULT_QUANTUM
+
+Event = namedtuple('Event', ['time', 'kind', 'pid'])
+
+DISPATCH = 'dispatch'
+PREEMPT = 'preempt'
+COMPLETE = 'complete'
+
+
+class _Job:
+    __slots__ = ('pid', 'arrival', 'burst', 'priority', 'seq', 'remaining', 'first_start', 'level')
+
+    def __init__(self, pid, arrival, burst, priority, seq):
+        self.pid = pid
+        self.arrival = arrival
+        self.burst = burst
+        self.priority = priority
+        self.seq = seq
+        self.remaining = burst
+        self.first_start = None
+        self.level = 0
+
+
+class OnlineScheduler:
+    """Base class: the event loop, arrivals and rolling metrics.
+
+    Subclasses supply the ready queue (``_push``, ``_pop``, ``_has_ready``)
+    and may override ``_slice_limit``, ``_preempts`` and ``_requeue``.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self._pending = []          # (arrival, seq, job) not yet arrived
+        self._seq = 0
+        self._running = None
+        self._run_start = 0         # when the running job was dispatched
+        self._run_remaining = 0     # its remaining time at dispatch
+        self._run_limit = math.inf  # when its current slice must end
+        self._events = []
+
+        self.completed = 0
+        self.busy_time = 0
+        self._first_arrival = None
+        self._total_waiting = 0
+        self._total_turnaround = 0
+        self._total_response = 0
+
+    # Policy hooks
+
+    def _push(self, job):
+        raise NotImplementedError
+
+    def _pop(self):
+        raise NotImplementedError
+
+    def _has_ready(self):
+        raise NotImplementedError
+
+    def _slice_limit(self, job):
+        # Longest the job may run once dispatched
+        return math.inf
+
+    def _preempts(self, job, running, running_remaining):
+        # Does the newly arrived ``job`` preempt ``running``?
+        return False
+
+    def _requeue(self, job, preempted):
+        # Put a job back after its slice ended early or expired
+        self._push(job)
+
+    # Public API
+
+    def submit(self, process):
+        """Add a process dict; ``arrival`` defaults to the current time."""
+        arrival = process.get('arrival')
+        if arrival is None:
+            arrival = self.now
+        if arrival < self.now:
+            raise ValueError(f"Process {process['pid']!r} arrives at {arrival}, "
+                             f"before the scheduler clock ({self.now})")
+        job = _Job(process['pid'], arrival, process['burst'], process.get('priority', 1), self._seq)
+        self._seq += 1
+        heapq.heappush(self._pending, (arrival, job.seq, job))
+
+    def next_event_time(self):
+        """Time of the next scheduled event, or None if idle with nothing pending."""
+        times = []
+        if self._running is not None:
+            times.append(min(self._run_start + self._run_remaining, self._run_limit))
+        elif self._has_ready():
+            times.append(self.now)
+        if self._pending:
+            times.append(self._pending[0][0])
+        return min(times) if times else None
+
+    def advance_to(self, t):
+        """Run the simulation forward to time ``t``.
+
+        Events at exactly ``t`` are left for the next call, so processes
+        submitted with ``arrival == t`` still take part in the decisions
+        made at ``t``.
+        """
+        if t < self.now:
+            raise ValueError(f"Cannot advance to {t}, the clock is already at {self.now}")
+        pending = self._pending
+
+        while True:
+            if self._running is None:
+                self._admit()
+                if self.now >= t:
+                    break
+                if self._has_ready():
+                    self._dispatch()
+                    continue
+                if pending and pending[0][0] < t:
+                    self.now = pending[0][0]
+                    continue
+                break
+
+            job = self._running
+            finish = self._run_start + self._run_remaining
+            slice_end = min(finish, self._run_limit)
+            next_arrival = pending[0][0] if pending else math.inf
+
+            if next_arrival < slice_end:
+                if next_arrival >= t:
+                    break
+                self.now = next_arrival
+                self._arrive_while_running(job)
+                continue
+            if slice_end >= t:
+                break
+
+            self.now = slice_end
+            self.busy_time += slice_end - self._run_start
+            job.remaining = finish - slice_end
+            self._running = None
+            # Arrivals at the same instant queue ahead of the returning job
+            self._admit()
+            if job.remaining:
+                self._events.append(Event(self.now, PREEMPT, job.pid))
+                self._requeue(job, False)
+            else:
+                self._complete(job)
+
+        if t != math.inf:
+            self.now = t
+
+    def drain(self):
+        """Run until every submitted process has completed."""
+        self.advance_to(math.inf)
+
+    def poll_events(self):
+        """Return and clear the events emitted since the last poll."""
+        events = self._events
+        self._events = []
+        return events
+
+    def metrics(self):
+        """Rolling averages over the processes completed so far."""
+        n = self.completed
+        elapsed = self.now - self._first_arrival if self._first_arrival is not None else 0
+        busy = self.busy_time
+        if self._running is not None:
+            busy += max(0, self.now - self._run_start)
+        return {
+            'completed': n,
+            'average': {
+                'Waiting': self._total_waiting / n if n else 0.0,
+                'Turnaround': self._total_turnaround / n if n else 0.0,
+                'Response': self._total_response / n if n else 0.0,
+                'Utilization': (busy / elapsed) * 100 if elapsed > 0 else 0.0
+            }
+        }
+
+    # Internals
+
+    def _admit(self):
+        pending = self._pending
+        while pending and pending[0][0] <= self.now:
+            job = heapq.heappop(pending)[2]
+            if self._first_arrival is None:
+                self._first_arrival = job.arrival
+            self._push(job)
+
+    def _dispatch(self):
+        job = self._pop()
+        if job.first_start is None:
+            job.first_start = self.now
+        self._running = job
+        self._run_start = self.now
+        self._run_remaining = job.remaining
+        self._run_limit = self.now + self._slice_limit(job)
+        self._events.append(Event(self.now, DISPATCH, job.pid))
+
+    def _arrive_while_running(self, running):
+        remaining = self._run_start + self._run_remaining - self.now
+        preempt = False
+        pending = self._pending
+        while pending and pending[0][0] <= self.now:
+            job = heapq.heappop(pending)[2]
+            self._push(job)
+            if not preempt and self._preempts(job, running, remaining):
+                preempt = True
+        if preempt:
+            self.busy_time += self.now - self._run_start
+            running.remaining = remaining
+            self._running = None
+            self._events.append(Event(self.now, PREEMPT, running.pid))
+            self._requeue(running, True)
+
+    def _complete(self, job):
+        turnaround = self.now - job.arrival
+        self.completed += 1
+        self._total_turnaround += turnaround
+        self._total_waiting += turnaround - job.burst
+        self._total_response += job.first_start - job.arrival
+        self._events.append(Event(self.now, COMPLETE, job.pid))
+
+
+class FCFSScheduler(OnlineScheduler):
+
+    def __init__(self):
+        super().__init__()
+        self._ready = deque()
+
+    def _push(self, job):
+        self._ready.append(job)
+
+    def _pop(self):
+        return self._ready.popleft()
+
+    def _has_ready(self):
+        return bool(self._ready)
+
+
+class _HeapScheduler(OnlineScheduler):
+    # Ready heap of (key..., seq, job) entries
+
+    def __init__(self, preemptive=False):
+        super().__init__()
+        self.preemptive = preemptive
+        self._ready = []
+
+    def _key(self, job):
+        raise NotImplementedError
+
+    def _push(self, job):
+        heapq.heappush(self._ready, (self._key(job), job.seq, job))
+
+    def _pop(self):
+        return heapq.heappop(self._ready)[2]
+
+    def _has_ready(self):
+        return bool(self._ready)
+
+
+class SJFScheduler(_HeapScheduler):
+    """Shortest job first; ``preemptive=True`` gives SRTF."""
+
+    def _key(self, job):
+        return job.remaining
+
+    def _preempts(self, job, running, running_remaining):
+        return self.preemptive and self._ready[0][0] < running_remaining
+
+
+class PriorityScheduler(_HeapScheduler):
+    """Lower number = higher priority; ties break on arrival order."""
+
+    def _key(self, job):
+        return job.priority
+
+    def _preempts(self, job, running, running_remaining):
+        return self.preemptive and self._ready[0][:2] < (running.priority, running.seq)
+
+
+class RoundRobinScheduler(FCFSScheduler):
+
+    def __init__(self, quantum=DEFAULT_QUANTUM):
+        super().__init__()
+        self.quantum = quantum
+
+    def _slice_limit(self, job):
+        return self.quantum
+
+
+class MLFQScheduler(OnlineScheduler):
+    """Multilevel feedback queue with the same rules as ``algorithms.mlfq``."""
+
+    def __init__(self, quantum=DEFAULT_QUANTUM, quanta=None, boost_interval=None):
+        super().__init__()
+        if quanta is None:
+            quanta = (quantum, 2 * quantum, 4 * quantum)
+        if boost_interval is None:
+            boost_interval = 10 * quanta[-1]
+        self.quanta = tuple(quanta)
+        self.boost_interval = boost_interval
+        self._next_boost = boost_interval
+        self._queues = [deque() for _ in self.quanta]
+        self._waiting = 0
+
+    def _push(self, job):
+        self._queues[job.level].append(job)
+        self._waiting += 1
+
+    def _pop(self):
+        # Periodic priority boost, applied lazily at dispatch time
+        if self.now >= self._next_boost:
+            top = self._queues[0]
+            for q in self._queues[1:]:
+                for job in q:
+                    job.level = 0
+                top.extend(q)
+                q.clear()
+            self._next_boost = (self.now // self.boost_interval + 1) * self.boost_interval
+        self._waiting -= 1
+        for q in self._queues:
+            if q:
+                return q.popleft()
+
+    def _has_ready(self):
+        return self._waiting > 0
+
+    def _slice_limit(self, job):
+        return self.quanta[job.level]
+
+    def _preempts(self, job, running, running_remaining):
+        return running.level > 0
+
+    def _requeue(self, job, preempted):
+        if not preempted and job.level < len(self.quanta) - 1:
+            job.level += 1
+        self._push(job)
+
+
+def scheduler_for(algorithm, quantum=DEFAULT_QUANTUM):
+    """The online scheduler matching one of ``algorithms.ALGORITHMS``."""
+    if algorithm == "FCFS":
+        return FCFSScheduler()
+    elif algorithm == "SJF (Non-Preemptive)":
+        return SJFScheduler(preemptive=False)
+    elif algorithm == "SJF (Preemptive)":
+        return SJFScheduler(preemptive=True)
+    elif algorithm == "Priority (Non-Preemptive)":
+        return PriorityScheduler(preemptive=False)
+    elif algorithm == "Priority (Preemptive)":
+        return PriorityScheduler(preemptive=True)
+    elif algorithm == "Round Robin":
+        return RoundRobinScheduler(quantum)
+    elif algorithm == "Multilevel Feedback Queue":
+        return MLFQScheduler(quantum)
+    raise ValueError(f"Unknown scheduling algorithm: {algorithm!r}")
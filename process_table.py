@@ -0,0 +1,145 @@
+"""Process list model and a virtualized table view for the GUI.
+
+``ProcessModel`` is the canonical process list: a ``Workload`` built from
+appended chunks, so generating or clearing a million processes is a few
+array operations.  ``VirtualTable`` shows it (or a ``MetricsModel`` over
+per-process metrics) through a ``ttk.Treeview`` that only ever holds the
+rows currently on screen; scrolling rewrites the values of those rows from
+the model instead of creating a widget item per process.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from workload import TYPE_CODES, TYPE_NAMES, Workload
+
+COLUMNS = ("PID", "Arrival", "Burst", "Priority", "Type")
+
+
+class ProcessModel:
+    """Processes entered in the GUI, held as one columnar ``Workload``.
+
+    Appended chunks are concatenated on the next read, so adding rows
+    doesn't copy the whole table each time.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, pid, arrival, burst, priority=1, process_type=TYPE_NAMES[0]):
+        if process_type not in TYPE_CODES:
+            raise ValueError(f"Unknown process type: {process_type!r}")
+        self.extend(Workload([arrival], [burst], [priority], [TYPE_CODES[process_type]], [str(pid)]))
+
+    def extend(self, workload):
+        if len(workload):
+            self._parts.append(workload)
+            self._len += len(workload)
+
+    def clear(self):
+        self._parts = []
+        self._len = 0
+
+    @property
+    def workload(self):
+        parts = self._parts
+        if not parts:
+            return Workload([], [], pid=np.empty(0, dtype=str))
+        if len(parts) > 1:
+            self._parts = parts = [Workload(
+                *(np.concatenate([getattr(w, name) for w in parts])
+                  for name in ('arrival', 'burst', 'priority', 'type_code', 'pid')))]
+        return parts[0]
+
+    def rows(self, start, stop):
+        """Display tuples for rows ``start`` to ``stop``."""
+        wl = self.workload
+        window = slice(start, stop)
+        return list(zip(wl.pid[window].tolist(), wl.arrival[window].tolist(),
+                        wl.burst[window].tolist(), wl.priority[window].tolist(),
+                        [TYPE_NAMES[code] for code in wl.type_code[window].tolist()]))
+
+
+class MetricsModel:
+    """Rows of a ``ProcessMetrics`` for a ``VirtualTable``.
+
+    ``columns`` are ``ProcessMetrics.COLUMNS`` names; only the visible
+    window is converted to Python values.
+    """
+
+    def __init__(self, metrics, columns=("PID", "Waiting", "Turnaround", "Response")):
+        self.metrics = metrics
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.metrics)
+
+    def rows(self, start, stop):
+        view = self.metrics[start:stop]
+        return list(zip(*(getattr(view, column.lower()).tolist() for column in self.columns)))
+
+
+class VirtualTable(ttk.Frame):
+    """A fixed-height table that renders only the visible model rows."""
+
+    def __init__(self, parent, model, columns=COLUMNS, height=5):
+        super().__init__(parent)
+        self.model = model
+        self.height = height
+        self.top = 0
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings",
+                                 height=height, selectmode="none")
+        for column in columns:
+            self.tree.heading(column, text=column)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.X, expand=True)
+
+        self.tree.bind("<MouseWheel>", self._wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.top - 1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.top + 1))
+        self.refresh()
+
+    def scroll_to(self, top):
+        self.top = top
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the visible rows, e.g. after the model changed."""
+        n = len(self.model)
+        self.top = max(0, min(self.top, n - self.height))
+        values = self.model.rows(self.top, self.top + self.height)
+
+        # Reuse the existing items; only the row count at the end changes
+        items = self.tree.get_children()
+        for item in items[len(values):]:
+            self.tree.delete(item)
+        for k, row in enumerate(values):
+            if k < len(items):
+                self.tree.item(items[k], values=row)
+            else:
+                self.tree.insert("", tk.END, values=row)
+
+        if n:
+            self.scrollbar.set(self.top / n, (self.top + len(values)) / n)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll(self, action, amount, unit=None):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.model)))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def _wheel(self, event):
+        steps = max(1, abs(event.delta) // 120)
+        self.scroll_to(self.top - steps if event.delta > 0 else self.top + steps)
+        return "break"
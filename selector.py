@@ -0,0 +1,199 @@
+"""Simulation-driven algorithm selection for auto mode.
+
+``select_algorithm`` picks the policy (and quantum) that scores best on
+an objective by actually running the candidates, within a time budget:
+
+* Candidates are first run on a short arrival-order prefix of the
+  workload.  While the budget allows, the better half is kept and the
+  prefix grows (successive halving), up to the whole workload.
+* Exact results on one CPU prune candidates that cannot win, so they
+  are never simulated:
+
+  - FCFS has a closed form (completion times are a prefix maximum over
+    cumulative bursts), so it is scored without a simulation;
+  - preemptive SJF (shortest remaining time first) minimises mean waiting
+    and turnaround time, so it bounds every other policy on those;
+  - every policy here is work-conserving, so the makespan, and with it
+    the throughput, is the same for all of them; FCFS reaches it with
+    the fewest dispatches.
+
+Simulations go through ``cache.run_cached``, so repeated selections on
+the same workload reuse earlier results.
+"""
+import time
+
+import numpy as np
+
+from algorithms import ALGORITHMS, DEFAULT_QUANTUM, QUANTUM_ALGORITHMS
+from cache import run_cached
+from workload import as_workload
+
+OBJECTIVES = {
+    'waiting': "Average waiting time",
+    'turnaround': "Average turnaround time",
+    'response': "Average response time",
+    'response_p99': "p99 response time",
+    'throughput': "Throughput (processes per time unit)",
+}
+
+DEFAULT_BUDGET = 2.0        # seconds
+INITIAL_SAMPLE = 2000       # processes in the first prefix
+GROWTH = 4                  # prefix growth per round
+
+_FCFS = ("FCFS", None)
+_SRPT = ("SJF (Preemptive)", None)
+
+
+def fcfs_closed_form(workload):
+    """``(arrival, burst, start, finish)`` of FCFS on one CPU, in arrival order.
+
+    With ``S`` the cumulative bursts, the i-th arrival finishes at
+    ``S[i] + max(arrival[j] - S[j - 1] for j <= i)``.
+    """
+    order = workload.arrival_order()
+    arrival = workload.arrival[order]
+    burst = workload.burst[order]
+    total = np.cumsum(burst)
+    finish = total + np.maximum.accumulate(arrival - (total - burst))
+    return arrival, burst, finish - burst, finish
+
+
+def _score(objective, arrival, burst, start, finish, waiting=None):
+    # Lower is better; throughput is scored as time per process.  Waiting
+    # is passed in when processes also block on I/O.
+    if objective == 'waiting':
+        if waiting is None:
+            waiting = finish - arrival - burst
+        return float(waiting.mean())
+    elif objective == 'turnaround':
+        return float((finish - arrival).mean())
+    elif objective == 'response':
+        return float((start - arrival).mean())
+    elif objective == 'response_p99':
+        return float(np.percentile(start - arrival, 99))
+    elif objective == 'throughput':
+        return int(finish.max() - arrival.min()) / len(arrival)
+    raise ValueError(f"Unknown objective: {objective!r}")
+
+
+def objective_value(objective, score):
+    """Turn an internal score back into the objective's own units."""
+    if objective == 'throughput':
+        return 1 / score if score else float('inf')
+    return score
+
+
+def candidates(algorithms=ALGORITHMS, quanta=(DEFAULT_QUANTUM,)):
+    """``(algorithm, quantum)`` pairs; quantum is None where it doesn't apply."""
+    pairs = []
+    for algorithm in algorithms:
+        if algorithm in QUANTUM_ALGORITHMS:
+            pairs.extend((algorithm, q) for q in dict.fromkeys(quanta))
+        else:
+            pairs.append((algorithm, None))
+    return pairs
+
+
+def select_algorithm(processes, objective='waiting', algorithms=ALGORITHMS,
+                     quanta=(DEFAULT_QUANTUM,), budget=DEFAULT_BUDGET, cpus=1, mode="global",
+                     cache=None, initial_sample=INITIAL_SAMPLE, progress=None, switch_cost=0,
+                     io_profiles=None):
+    """Pick the best ``(algorithm, quantum)`` for ``objective``.
+
+    Returns a dict with the winning ``algorithm`` and ``quantum`` (None
+    if it takes none), its objective ``value`` on the largest prefix run,
+    that prefix's size as ``sample``, and ``evaluated``: one row per
+    candidate and round saying how it was scored (``closed-form``,
+    ``simulated`` or ``pruned``), or ``skipped`` if the budget ran out
+    before it was run.
+
+    The bounds only hold on one CPU without context switch costs or I/O
+    (``switch_cost`` and ``io_profiles`` as in ``run_algorithm``);
+    otherwise every candidate is simulated.  ``progress`` receives the
+    fraction of the budget used.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective!r}")
+    workload = as_workload(processes)
+    n = len(workload)
+    if n == 0:
+        raise ValueError("No processes to select an algorithm for")
+    started = time.perf_counter()
+    order = workload.arrival_order()
+    exact = cpus == 1 and not switch_cost and not io_profiles
+
+    def report():
+        if progress is not None:
+            progress(min(1.0, (time.perf_counter() - started) / budget))
+
+    def simulate(algorithm, quantum, sample):
+        schedule, metrics = run_cached(cache, algorithm, sample,
+                                       DEFAULT_QUANTUM if quantum is None else quantum, cpus, mode,
+                                       switch_cost=switch_cost, io_profiles=io_profiles)
+        report()
+        p = metrics['per_process']
+        return _score(objective, p.arrival, p.burst, p.start, p.finish, p.waiting), len(schedule)
+
+    alive = candidates(algorithms, quanta)
+    size = min(n, initial_sample)
+    evaluated = []
+    while True:
+        round_started = time.perf_counter()
+        sample = workload.take(order[:size]) if size < n else workload
+        scores = {}
+        dispatches = {}
+
+        def record(candidate, score, how):
+            evaluated.append({'algorithm': candidate[0], 'quantum': candidate[1], 'sample': size,
+                              'value': None if score is None else objective_value(objective, score),
+                              'how': how})
+
+        # Exact one-CPU results first: they are also the pruning bounds
+        bound = 0.0
+        if exact and (_FCFS in alive or objective == 'throughput'):
+            fcfs = _score(objective, *fcfs_closed_form(sample))
+            if objective == 'throughput':
+                bound = fcfs
+            if _FCFS in alive:
+                scores[_FCFS], dispatches[_FCFS] = fcfs, size
+                record(_FCFS, fcfs, "closed-form")
+        if exact and objective in ('waiting', 'turnaround') and _SRPT in alive:
+            bound, dispatches[_SRPT] = simulate(*_SRPT, sample)
+            scores[_SRPT] = bound
+            record(_SRPT, bound, "simulated")
+
+        for i, candidate in enumerate(alive):
+            if candidate in scores:
+                continue
+            if scores and bound >= min(scores.values()):
+                record(candidate, None, "pruned")
+                continue
+            if scores and time.perf_counter() - started > budget:
+                # Out of time: the rest are left unscored this round
+                for rest in alive[i:]:
+                    if rest not in scores:
+                        record(rest, None, "skipped")
+                break
+            scores[candidate], dispatches[candidate] = simulate(*candidate, sample)
+            record(candidate, scores[candidate], "simulated")
+
+        # Ties go to the candidate with fewer dispatches
+        ranked = sorted(scores, key=lambda c: (scores[c], dispatches[c]))
+        best = ranked[0]
+        alive = ranked[:max(1, len(ranked) // 2)]
+        # Estimate the next round assuming cost linear in prefix size
+        next_size = min(n, size * GROWTH)
+        estimate = ((time.perf_counter() - round_started) * next_size / size
+                    * len(alive) / len(ranked))
+        if size == n or len(alive) == 1 or time.perf_counter() - started + estimate > budget:
+            break
+        size = next_size
+
+    return {
+        'algorithm': best[0],
+        'quantum': best[1],
+        'objective': objective,
+        'value': objective_value(objective, scores[best]),
+        'sample': size,
+        'evaluated': evaluated,
+    }
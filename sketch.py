@@ -0,0 +1,110 @@
+"""Constant-memory quantile sketch for tail-latency metrics.
+
+``QuantileSketch`` follows DDSketch: a value ``v > 0`` is counted in
+bucket ``ceil(log(v) / log(gamma))`` with ``gamma = (1 + a) / (1 - a)``,
+so every quantile it reports is within relative error ``a`` of the exact
+one.  Zeros (a process dispatched the moment it arrives) get their own
+counter.  Buckets span the range of values seen rather than their count,
+so memory stays constant however long a trace is; if the range ever
+needs more than ``max_buckets``, the lowest buckets are merged, which
+only loosens the accuracy of the smallest quantiles.
+
+Values are added a NumPy array at a time, and sketches can be merged,
+so per-chunk or per-worker sketches combine into one.
+"""
+import math
+
+import numpy as np
+
+DEFAULT_ACCURACY = 0.01
+DEFAULT_MAX_BUCKETS = 2048
+PERCENTILES = (50, 95, 99)
+
+
+class QuantileSketch:
+    """Quantiles of non-negative values within relative error ``accuracy``."""
+
+    __slots__ = ('accuracy', 'max_buckets', '_log_gamma', '_counts', '_offset', 'zeros', 'count',
+                 'min', 'max')
+
+    def __init__(self, accuracy=DEFAULT_ACCURACY, max_buckets=DEFAULT_MAX_BUCKETS):
+        if not 0 < accuracy < 1:
+            raise ValueError("accuracy must be between 0 and 1")
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._offset = 0        # bucket index of _counts[0]
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def add(self, values):
+        """Count a value or an array of values (all >= 0)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        low, high = values.min(), values.max()
+        if low < 0:
+            raise ValueError("QuantileSketch only holds non-negative values")
+        self.count += len(values)
+        self.min = min(self.min, float(low))
+        self.max = max(self.max, float(high))
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        if len(positive):
+            keys = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+            self._add_buckets(int(keys.min()), np.bincount(keys - keys.min()))
+
+    def merge(self, other):
+        """Fold ``other`` (built with the same accuracy) into this sketch."""
+        if other.accuracy != self.accuracy:
+            raise ValueError("Can only merge sketches with the same accuracy")
+        self.count += other.count
+        self.zeros += other.zeros
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(other._counts):
+            self._add_buckets(other._offset, other._counts)
+
+    def quantile(self, q):
+        """Value at quantile ``q`` in [0, 1], or None if the sketch is empty."""
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0.0
+        cumulative = np.cumsum(self._counts)
+        bucket = int(np.searchsorted(cumulative, rank - self.zeros, side='right'))
+        # Midpoint of the bucket in relative terms, clamped to what was seen
+        gamma = math.exp(self._log_gamma)
+        value = 2 * gamma ** (bucket + self._offset) / (gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def percentiles(self, qs=PERCENTILES):
+        """``{'p50': ..., 'p95': ..., 'p99': ...}`` for the given percentiles."""
+        return {f"p{q:g}": self.quantile(q / 100) for q in qs}
+
+    def _add_buckets(self, offset, counts):
+        lo, hi = offset, offset + len(counts)
+        if len(self._counts):
+            lo, hi = min(lo, self._offset), max(hi, self._offset + len(self._counts))
+        if lo != self._offset or hi - lo != len(self._counts):
+            grown = np.zeros(hi - lo, dtype=np.int64)
+            grown[self._offset - lo:self._offset - lo + len(self._counts)] = self._counts
+            self._counts, self._offset = grown, lo
+        self._counts[offset - lo:offset - lo + len(counts)] += counts
+        if len(self._counts) > self.max_buckets:
+            # Collapse the lowest buckets into the first one that is kept
+            extra = len(self._counts) - self.max_buckets
+            self._counts[extra] += self._counts[:extra].sum()
+            self._counts = self._counts[extra:].copy()
+            self._offset += extra
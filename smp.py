@@ -0,0 +1,585 @@
+"""Multi-core (SMP) scheduling simulation.
+
+Simulates ``cpus`` identical cores running one of the ``ALGORITHMS``
+policies.  Two run-queue layouts are supported:
+
+* ``global``: one shared ready queue; any idle core takes the best task.
+* ``per-cpu``: one ready queue per core.  Arrivals go to an idle core if
+  there is one, otherwise to the less loaded of two random cores ("power
+  of two choices").  A core that runs dry steals the best task from the
+  longest queue, and idle cores try again whenever a queue grows, so no
+  core idles while work is queued.  Every ``balance_interval`` time
+  units, tasks move from queues above the average length to the
+  shortest queues.
+
+A process may be restricted to a set of cores (affinity).  Preemptive
+policies preempt the running task that ranks worst (global) or the task
+on the core the arrival was placed on (per-cpu).
+
+Context switch costs and I/O bursts work as in ``algorithms.py``, on
+any number of cores: ``switch_cost`` delays a dispatch of a different
+process than the core last ran, and ``run_smp`` splits each process
+into CPU phases by type with ``io_profiles``.  I/O requests queue for
+``io_devices`` shared first-come first-served devices.
+
+The loop is event-driven like the single-CPU engines.  Slice ends sit in a
+heap keyed by time, idle cores in a min-heap, and running tasks in a heap
+keyed by how easily they can be preempted.  Each event costs
+O(log n + log cpus); the only per-core scans are work stealing and
+balancing.
+
+Slices are yielded as ``(key, start, end, cpu)``; ``run_smp`` collects
+them into a ``Schedule`` whose ``cpu`` array gives each slice's core.
+"""
+import heapq
+import math
+import random
+from array import array
+from itertools import chain, count
+
+import numpy as np
+
+import instrument
+from algorithms import DEFAULT_IO_DEVICES, DEFAULT_QUANTUM, PROGRESS_INTERVAL, _END
+from algorithms import io_intervals, io_patterns
+from workload import Schedule, Workload, as_workload
+
+MODES = ("global", "per-cpu")
+DEFAULT_BALANCE_INTERVAL = 100
+
+# Queued tasks passed over per dispatch while looking for one the core's
+# affinity allows, while other cores are still busy
+AFFINITY_SCAN = 64
+
+# smp_slices stats added to the instrumentation counters
+_COUNTED = ('migrations', 'steals', 'balanced', 'switches', 'io_requests', 'scans')
+
+
+class _Task:
+    __slots__ = ('key', 'remaining', 'priority', 'seq', 'level', 'mask', 'cpu', 'left', 'io')
+
+    def __init__(self, key, burst, priority, seq, mask, io=None):
+        self.key = key
+        self.remaining = burst      # CPU time left in the current phase
+        self.priority = priority
+        self.seq = seq
+        self.level = 0
+        self.mask = mask
+        self.cpu = None
+        self.left = 0               # CPU time in later phases
+        self.io = io
+        if io is not None and burst > io[0]:
+            self.remaining = io[0]
+            self.left = burst - io[0]
+
+
+def _policy(algorithm, quantum):
+    """``(rank, victim_key, beats, quanta)`` for one of ``ALGORITHMS``.
+
+    ``rank(task)`` orders ready queues.  For preemptive policies,
+    ``victim_key(task, start)`` scores a task dispatched at ``start``, and
+    ``beats(task, key, now)`` says whether a queued task should preempt
+    it.  ``quanta`` holds the slice length per MLFQ level (one entry for
+    Round Robin), or is None if tasks run to completion.
+    """
+    tick = count().__next__
+    if algorithm == "FCFS":
+        return (lambda t: (t.seq, 0)), None, None, None
+    elif algorithm in ("SJF (Non-Preemptive)", "SJF (Preemptive)"):
+        if algorithm == "SJF (Non-Preemptive)":
+            return (lambda t: (t.remaining, t.seq)), None, None, None
+        # A running task's remaining time shrinks with the clock, so key it
+        # on its finish time instead
+        return ((lambda t: (t.remaining, t.seq)), (lambda t, start: start + t.remaining),
+                (lambda t, finish, now: t.remaining < finish - now), None)
+    elif algorithm in ("Priority (Non-Preemptive)", "Priority (Preemptive)"):
+        if algorithm == "Priority (Non-Preemptive)":
+            return (lambda t: (t.priority, t.seq)), None, None, None
+        return ((lambda t: (t.priority, t.seq)), (lambda t, start: t.priority),
+                (lambda t, priority, now: t.priority < priority), None)
+    elif algorithm == "Round Robin":
+        return (lambda t: (tick(), 0)), None, None, (quantum,)
+    elif algorithm == "Multilevel Feedback Queue":
+        return ((lambda t: (t.level, tick())), (lambda t, start: t.level),
+                (lambda t, level, now: t.level < level), (quantum, 2 * quantum, 4 * quantum))
+    raise ValueError(f"Unknown scheduling algorithm: {algorithm!r}")
+
+
+def smp_slices(jobs, algorithm, cpus, quantum=DEFAULT_QUANTUM, mode="global", masks=None,
+               steal=True, balance_interval=DEFAULT_BALANCE_INTERVAL, seed=0, stats=None,
+               switch_cost=0, io=None, io_devices=DEFAULT_IO_DEVICES, io_log=None, counts=None):
+    """Schedule ``(key, arrival, burst, priority)`` jobs on ``cpus`` cores.
+
+    Yields ``(key, start, end, cpu)`` slices.  ``masks`` maps a job key to
+    a bitmask of the cores it may run on (missing or None: any core).
+    ``io`` maps a job key to its ``(cpu, io)`` burst pattern (None: no
+    I/O); each I/O request appends ``key, start, end`` to the ``io_log``
+    array, as in ``algorithms.IOQueue``.  If ``stats`` is a dict it
+    receives dispatch, migration, steal, balancing, context switch and I/O
+    request counts, and the number of queue entries and cores scanned
+    past, when the generator finishes.  With a ``counts`` Counter, heap
+    operations on the run queues and event heaps are counted into it (see
+    ``instrument.py``).
+    """
+    if cpus < 1:
+        raise ValueError("Need at least one CPU")
+    if mode not in MODES:
+        raise ValueError(f"Unknown SMP mode: {mode!r}")
+    if switch_cost < 0:
+        raise ValueError("Context switch cost can't be negative")
+    if io is not None and io_devices < 1:
+        raise ValueError("Need at least one I/O device")
+    rank, victim_key, beats, quanta = _policy(algorithm, quantum)
+    per_cpu = mode == "per-cpu"
+    boost_interval = 10 * quanta[-1] if algorithm == "Multilevel Feedback Queue" else None
+    next_boost = boost_interval or math.inf
+    if not per_cpu or not balance_interval:
+        balance_interval = None
+    next_balance = balance_interval or math.inf
+    rng = random.Random(seed)
+    # The I/O device and completion heaps below use heapq directly
+    ops = instrument.heap_ops(counts)
+    heappush, heappop, heapify, heapreplace = (ops.heappush, ops.heappop, ops.heapify,
+                                               ops.heapreplace)
+
+    ready = []                                  # global mode: (rank..., task)
+    queues = [[] for _ in range(cpus)]          # per-cpu mode
+    running = [None] * cpus
+    run_start = [0] * cpus
+    last_key = [None] * cpus                    # process the core last ran
+    vkey = [None] * cpus                        # victim key of the running task
+    token = [0] * cpus                          # invalidates stale heap entries
+    events = []                                 # (slice end, cpu, token)
+    switch_ends = []                            # (slice start after a switch, cpu, token)
+    io_events = []                              # (I/O done, request, task)
+    devices = [0] * io_devices                  # min-heap of device free times
+    victims = []                                # (-victim key, cpu, token)
+    free = [True] * cpus                        # nothing running or queued
+    free_heap = list(range(cpus))
+    in_free_heap = [True] * cpus
+    allowed_cache = {}
+    out = []
+    grown = []                                  # per-cpu queues pushed to this event
+    dispatches = migrations = steals = balanced = switches = io_requests = scans = 0
+
+    def allowed(mask):
+        cores = allowed_cache.get(mask)
+        if cores is None:
+            cores = allowed_cache[mask] = tuple(c for c in range(cpus) if mask >> c & 1)
+        return cores
+
+    def mark_free(c):
+        free[c] = True
+        if not in_free_heap[c]:
+            in_free_heap[c] = True
+            heappush(free_heap, c)
+
+    def lowest_free(mask):
+        if mask is None:
+            while free_heap and not free[free_heap[0]]:
+                in_free_heap[heappop(free_heap)] = False
+            return free_heap[0] if free_heap else None
+        for c in allowed(mask):
+            if free[c]:
+                return c
+        return None
+
+    def push(task, c):
+        entry = (*rank(task), task)
+        heappush(queues[c] if per_cpu else ready, entry)
+        if per_cpu:
+            free[c] = False
+            grown.append(c)
+
+    def pop_allowed(queue, c, limit):
+        # Best entry that may run on ``c``; passed-over entries go back
+        nonlocal scans
+        skipped = []
+        task = None
+        while queue:
+            entry = heappop(queue)
+            mask = entry[-1].mask
+            if mask is None or mask >> c & 1:
+                task = entry[-1]
+                break
+            skipped.append(entry)
+            if limit is not None and len(skipped) >= limit:
+                break
+        scans += len(skipped)
+        for entry in skipped:
+            heappush(queue, entry)
+        return task
+
+    def dispatch(c, task):
+        nonlocal dispatches, migrations, switches
+        dispatches += 1
+        if task.cpu is not None and task.cpu != c:
+            migrations += 1
+        task.cpu = c
+        running[c] = task
+        start = now
+        free[c] = False
+        token[c] += 1
+        if last_key[c] != task.key:
+            if last_key[c] is not None:
+                # The task only starts once the switch is done, and can
+                # only be preempted from then on
+                switches += 1
+                start += switch_cost
+                if beats is not None and switch_cost:
+                    heappush(switch_ends, (start, c, token[c]))
+            last_key[c] = task.key
+        run_start[c] = start
+        end = start + task.remaining
+        if quanta is not None:
+            end = min(end, start + quanta[task.level])
+        heappush(events, (end, c, token[c]))
+        if victim_key is not None:
+            vkey[c] = victim_key(task, start)
+            if not per_cpu:
+                if len(victims) > 4 * cpus + 64:
+                    # Drop entries for tasks that are no longer running
+                    victims[:] = [v for v in victims if v[2] == token[v[1]]]
+                    heapify(victims)
+                heappush(victims, (-vkey[c], c, token[c]))
+
+    def stop(c):
+        # End the running slice on ``c`` at ``now``; returns the task
+        task = running[c]
+        start = run_start[c]
+        if now > start:
+            out.append((task.key, start, now, c))
+            task.remaining -= now - start
+        running[c] = None
+        token[c] += 1
+        return task
+
+    def start_io(task):
+        # Next CPU phase after an FCFS wait for the first free device
+        nonlocal io_requests
+        io_requests += 1
+        phase = task.io[0] if task.io[0] < task.left else task.left
+        task.left -= phase
+        task.remaining = phase
+        done = max(now, heapq.heappop(devices)) + task.io[1]
+        heapq.heappush(devices, done)
+        heapq.heappush(io_events, (done, io_requests, task))
+        if io_log is not None:
+            io_log.extend((task.key, now, done))
+
+    def place(task):
+        # Per-cpu run queue for a task becoming ready: an idle core if any,
+        # else the less loaded of two random cores
+        c = lowest_free(task.mask)
+        if c is None:
+            cores = allowed(task.mask) if task.mask is not None else None
+            a = cores[rng.randrange(len(cores))] if cores else rng.randrange(cpus)
+            b = cores[rng.randrange(len(cores))] if cores else rng.randrange(cpus)
+            load_a = len(queues[a]) + (running[a] is not None)
+            load_b = len(queues[b]) + (running[b] is not None)
+            c = a if load_a <= load_b else b
+        push(task, c)
+        touched.add(c)
+
+    def take(c):
+        # Next task for idle core ``c`` in per-cpu mode, stealing if need be
+        nonlocal steals, scans
+        queue = queues[c]
+        if queue:
+            return heappop(queue)[-1]
+        if not steal:
+            return None
+        scans += cpus
+        victim = max(range(cpus), key=lambda i: len(queues[i]))
+        if not queues[victim]:
+            return None
+        task = pop_allowed(queues[victim], c, AFFINITY_SCAN)
+        if task is not None:
+            steals += 1
+        return task
+
+    def maybe_boost():
+        # MLFQ: every queued task goes back to the top level.  Like the
+        # single-CPU engine this is applied lazily, when a core dispatches.
+        nonlocal next_boost
+        if now < next_boost:
+            return False
+        next_boost = (now // boost_interval + 1) * boost_interval
+        for queue in (queues if per_cpu else [ready]):
+            # Re-rank in the old order, so each level stays first-in first-out
+            tasks = [entry[-1] for entry in sorted(queue)]
+            for task in tasks:
+                task.level = 0
+            queue[:] = [(*rank(task), task) for task in tasks]
+            heapify(queue)
+        return True
+
+    def balance():
+        nonlocal balanced, scans
+        scans += cpus
+        target = -(-sum(len(q) for q in queues) // cpus)
+        lightest = [(len(q), c) for c, q in enumerate(queues)]
+        heapify(lightest)
+        for donor in sorted(range(cpus), key=lambda i: -len(queues[i])):
+            queue = queues[donor]
+            while len(queue) > target and lightest[0][0] < target - 1:
+                load, c = lightest[0]
+                task = queue[-1][-1]
+                # Removing the last heap entry keeps the heap valid
+                if c == donor or (task.mask is not None and not task.mask >> c & 1):
+                    break
+                queue.pop()
+                push(task, c)
+                heapreplace(lightest, (load + 1, c))
+                touched.add(c)
+                balanced += 1
+
+    jobs = iter(jobs)
+    nxt = next(jobs, _END)
+    seq = 0
+    now = 0
+    touched = set()
+
+    # Queued tasks always have a core that will run them: in per-cpu mode
+    # a core with a non-empty queue is busy, and in global mode a queued
+    # task only waits while every core it may use is busy.  So pending
+    # events and arrivals are all the loop needs to check.
+    while nxt is not _END or events or io_events:
+        now = nxt[1]
+        if events and events[0][0] < now:
+            now = events[0][0]
+        if io_events and io_events[0][0] < now:
+            now = io_events[0][0]
+        if switch_ends and switch_ends[0][0] < now:
+            now = switch_ends[0][0]
+        touched.clear()
+
+        # Slices ending now
+        returning = []
+        while events and events[0][0] <= now:
+            _, c, tok = heappop(events)
+            if tok != token[c]:
+                continue
+            task = stop(c)
+            touched.add(c)
+            if task.remaining:
+                # Used its whole slice: MLFQ demotes it
+                if quanta is not None and task.level < len(quanta) - 1:
+                    task.level += 1
+                returning.append(task)
+            elif task.left:
+                start_io(task)
+            # A task going back on its own queue keeps the core from
+            # looking idle to the arrivals placed below
+            if not per_cpu or not (queues[c] or task.remaining):
+                mark_free(c)
+
+        # Arrivals queue ahead of tasks returning at the same instant
+        admitted = []
+        while nxt[1] <= now:
+            key = nxt[0]
+            task = _Task(key, nxt[2], nxt[3], seq, masks.get(key) if masks else None,
+                         io[key] if io is not None else None)
+            seq += 1
+            nxt = next(jobs, _END)
+            if per_cpu:
+                place(task)
+            else:
+                push(task, None)
+            admitted.append(task)
+        # Then tasks back from I/O, as new arrivals at the end of the queue
+        while io_events and io_events[0][0] <= now:
+            task = heapq.heappop(io_events)[2]
+            task.seq = seq
+            task.level = 0
+            seq += 1
+            if per_cpu:
+                place(task)
+            else:
+                push(task, None)
+            admitted.append(task)
+        for task in returning:
+            push(task, task.cpu)
+
+        if now >= next_balance:
+            balance()
+            next_balance = (now // balance_interval + 1) * balance_interval
+
+        # Fill idle cores, then let arrivals preempt
+        if per_cpu:
+            for c in sorted(touched):
+                if running[c] is None:
+                    maybe_boost()
+                    task = take(c)
+                    if task is not None:
+                        dispatch(c, task)
+                    else:
+                        mark_free(c)
+            if beats is not None and admitted:
+                for c in sorted(touched):
+                    queue = queues[c]
+                    if (running[c] is not None and run_start[c] <= now and queue
+                            and beats(queue[0][-1], vkey[c], now)):
+                        push(stop(c), c)
+                        maybe_boost()
+                        dispatch(c, heappop(queue)[-1])
+        else:
+            if ready and lowest_free(None) is not None:
+                maybe_boost()
+            limit = AFFINITY_SCAN if events else None
+            skipped = []
+            while ready:
+                task = ready[0][-1]
+                c = lowest_free(task.mask)
+                if c is None:
+                    if task.mask is None or (limit is not None and len(skipped) >= limit):
+                        break
+                    skipped.append(heappop(ready))
+                    continue
+                heappop(ready)
+                dispatch(c, task)
+            for entry in skipped:
+                heappush(ready, entry)
+            if beats is not None and admitted:
+                switching = []
+                while ready and victims:
+                    neg_key, c, tok = victims[0]
+                    if tok != token[c]:
+                        heappop(victims)
+                        continue
+                    if run_start[c] > now:
+                        # Checked again once its switch is done
+                        switching.append(heappop(victims))
+                        continue
+                    task = ready[0][-1]
+                    if not beats(task, -neg_key, now) or (
+                            task.mask is not None and not task.mask >> c & 1):
+                        break
+                    heappop(victims)
+                    push(stop(c), None)
+                    maybe_boost()
+                    dispatch(c, pop_allowed(ready, c, None))
+                for entry in switching:
+                    heappush(victims, entry)
+
+        # Tasks whose switch is done face what queued up meanwhile
+        while switch_ends and switch_ends[0][0] <= now:
+            _, c, tok = heappop(switch_ends)
+            if tok != token[c]:
+                continue
+            queue = queues[c] if per_cpu else ready
+            if not queue:
+                continue
+            task = queue[0][-1]
+            if not beats(task, vkey[c], now) or (task.mask is not None and not task.mask >> c & 1):
+                continue
+            push(stop(c), c if per_cpu else None)
+            maybe_boost()
+            dispatch(c, heappop(queue)[-1])
+
+        # Idle cores steal from queues that grew while they were idle
+        if grown:
+            if (steal and any(queues[c] for c in grown)
+                    and lowest_free(None) is not None):
+                for c in range(cpus):
+                    if free[c]:
+                        maybe_boost()
+                        task = take(c)
+                        if task is not None:
+                            dispatch(c, task)
+            grown.clear()
+
+        yield from out
+        out.clear()
+
+    if stats is not None:
+        stats.update(dispatches=dispatches, migrations=migrations, steals=steals, balanced=balanced,
+                     switches=switches, io_requests=io_requests, scans=scans)
+
+
+def affinity_mask(cores, cpus):
+    """Bitmask for an iterable of core ids; None means any core."""
+    if cores is None:
+        return None
+    mask = 0
+    for c in cores:
+        if not 0 <= c < cpus:
+            raise ValueError(f"Affinity names CPU {c}, but there are only {cpus}")
+        mask |= 1 << c
+    if not mask:
+        raise ValueError("Affinity must allow at least one CPU")
+    return mask
+
+
+def run_smp(algorithm, processes, cpus=1, quantum=DEFAULT_QUANTUM, mode="global", affinity=None,
+            steal=True, balance_interval=DEFAULT_BALANCE_INTERVAL, seed=0, stats=None,
+            progress=None, switch_cost=0, io_profiles=None, io_devices=DEFAULT_IO_DEVICES,
+            counts=None):
+    """Schedule a workload on ``cpus`` cores; returns a ``Schedule``.
+
+    ``affinity`` holds one entry per process (None or an iterable of core
+    ids).  If it is omitted and ``processes`` are dicts, their
+    ``'affinity'`` keys are used.  ``io_profiles`` maps process type names
+    to ``(cpu, io)`` burst patterns (see ``algorithms.IO_PROFILES``; types
+    left out do no I/O), and the schedule then carries ``io_intervals``
+    and ``blocked`` (see ``workload.Schedule``).  ``progress`` and
+    ``counts`` work as in ``algorithms.run_algorithm``.
+    """
+    if counts is None:
+        counts = instrument.counts_for(algorithm)
+    if counts is not None and stats is None:
+        stats = {}
+    with instrument.phase('ingest'):
+        if affinity is None and not isinstance(processes, Workload):
+            processes = list(processes)
+            if any(p.get('affinity') is not None for p in processes):
+                affinity = [p.get('affinity') for p in processes]
+        workload = as_workload(processes)
+        order = workload.arrival_order()
+        masks = None
+        if affinity is not None:
+            if len(affinity) != len(workload):
+                raise ValueError("affinity needs one entry per process")
+            # Engine keys are positions in arrival order
+            by_row = [affinity_mask(cores, cpus) for cores in affinity]
+            masks = {key: by_row[row] for key, row in enumerate(order.tolist())
+                     if by_row[row] is not None}
+
+        io = io_log = None
+        if io_profiles:
+            io = io_patterns(workload, io_profiles, order)
+            io_log = array('q')
+
+        jobs = zip(range(len(workload)), workload.arrival[order].tolist(),
+                   workload.burst[order].tolist(), workload.priority[order].tolist())
+
+    with instrument.phase('schedule'):
+        slices = smp_slices(jobs, algorithm, cpus, quantum, mode, masks, steal, balance_interval,
+                            seed, stats, switch_cost, io, io_devices, io_log, counts)
+        data = array('q')
+        if progress is None:
+            data.extend(chain.from_iterable(slices))
+        else:
+            total = int(workload.burst.sum()) or 1
+            done = 0
+            for n, piece in enumerate(slices, 1):
+                data.extend(piece)
+                done += piece[2] - piece[1]
+                if not n % PROGRESS_INTERVAL:
+                    progress(done / total)
+            progress(1.0)
+        if data:
+            table = np.frombuffer(data, dtype=np.int64).reshape(-1, 4)
+        else:
+            table = np.empty((0, 4), dtype=np.int64)
+        intervals = blocked = None
+        if io_log is not None:
+            intervals, blocked = io_intervals(io_log, order)
+        schedule = Schedule(workload, table[:, 1], table[:, 2], order[table[:, 0]],
+                            cpu=table[:, 3], cpus=cpus, blocked=blocked,
+                            io_intervals=intervals)
+
+    if counts is not None:
+        instrument.count_run(counts, stats['dispatches'], len(workload) + stats['io_requests'])
+        counts.update({name: stats[name] for name in _COUNTED})
+    return schedule
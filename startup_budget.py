@@ -0,0 +1,89 @@
+"""Import-time budget check for the simulator's entry points.
+
+Each module is imported in a fresh interpreter with ``python -X importtime``
+and its cumulative import time is compared with its budget.  Modules that
+must stay out of the startup path (matplotlib, scikit-learn, ...) are also
+checked.  Exits with status 1 if any budget is exceeded, so it can run as a
+regression check in CI::
+
+    python startup_budget.py            # check all budgets
+    python startup_budget.py --profile  # also list the slowest imports
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Cumulative import time budget in milliseconds, and modules each entry
+# point must not pull in at import time
+BUDGETS = {
+    'algorithms': (300, ('tkinter', 'matplotlib', 'sklearn')),
+    'metrics': (300, ('tkinter', 'matplotlib', 'sklearn')),
+    'online': (300, ('tkinter', 'matplotlib', 'sklearn')),
+    'main': (300, ('matplotlib', 'sklearn')),
+}
+
+RUNS = 5
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_profile(module):
+    """Run ``import module`` under -X importtime.
+
+    Returns ``(rows, loaded)`` where ``rows`` are ``(cumulative_us, name)``
+    pairs from the importtime report and ``loaded`` is the set of top-level
+    packages in ``sys.modules`` afterwards.
+    """
+    code = f"import sys, {module}; print(','.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE,
+                          capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return rows, set(proc.stdout.strip().split(","))
+
+
+def measure(module, runs=RUNS):
+    """Median cumulative import time of ``module`` in milliseconds."""
+    times = []
+    rows = loaded = None
+    for _ in range(runs):
+        rows, loaded = import_profile(module)
+        times.append(next(us for us, name in reversed(rows) if name.strip() == module) / 1000)
+    return statistics.median(times), rows, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check import-time budgets.")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS), help="modules to check")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--profile", action="store_true", help="list the slowest imports of each module")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        budget, forbidden = BUDGETS.get(module, (300, ()))
+        elapsed, rows, loaded = measure(module, args.runs)
+        leaked = sorted(set(forbidden) & loaded)
+        ok = elapsed <= budget and not leaked
+        failed = failed or not ok
+        status = "ok" if ok else "FAIL"
+        print(f"{module:<12} {elapsed:7.1f} ms  (budget {budget} ms)  {status}")
+        if leaked:
+            print(f"    imports {', '.join(leaked)} at startup")
+        if args.profile:
+            # Imports made directly by the module (one indent level down)
+            top = [(us, name.strip()) for us, name in rows
+                   if len(name) - len(name.lstrip()) == 3]
+            for us, name in sorted(top, reverse=True)[:10]:
+                print(f"    {us / 1000:7.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
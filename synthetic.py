@@ -0,0 +1,172 @@
+"""Vectorized synthetic workload generator.
+
+Builds ``Workload`` tables with NumPy's ``Generator`` rather than one
+``random`` call per field, so millions of processes take well under a
+second.  Three things can be configured independently:
+
+* the arrival process: ``uniform``, ``poisson`` or ``bursty`` (batches of
+  processes arriving together, with Poisson-distributed batch starts);
+* the burst-time distribution: ``uniform``, ``exponential``,
+  ``lognormal`` or ``pareto`` (the last two are heavy-tailed);
+* the mix of process types, each with its own burst scale and priority
+  range (``TYPE_PROFILES``).
+
+Arrival rates are derived from the offered ``load`` (mean burst times
+arrival rate), so ``load=1.0`` keeps the CPU just saturated.  The same
+``seed`` always gives the same workload.
+
+Write a large trace for ``traces.py`` with::
+
+    python synthetic.py 10000000 --arrival bursty --burst pareto --seed 1 -o big.bin
+"""
+import argparse
+
+import numpy as np
+
+from workload import TYPE_NAMES, Workload
+
+ARRIVAL_PROCESSES = ("uniform", "poisson", "bursty")
+BURST_DISTRIBUTIONS = ("uniform", "exponential", "lognormal", "pareto")
+
+# Relative burst length and priority range (inclusive) per process type
+TYPE_PROFILES = {
+    "CPU-Bound": {'burst_scale': 4.0, 'priority': (3, 5)},
+    "I/O-Bound": {'burst_scale': 1.0, 'priority': (2, 4)},
+    "Interactive": {'burst_scale': 0.25, 'priority': (1, 2)},
+}
+DEFAULT_TYPE_MIX = (0.4, 0.4, 0.2)
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _unit_bursts(rng, n, distribution, sigma, alpha):
+    # Samples with mean 1, scaled per process type by the caller
+    if distribution == "uniform":
+        return rng.uniform(0.0, 2.0, n)
+    elif distribution == "exponential":
+        return rng.exponential(1.0, n)
+    elif distribution == "lognormal":
+        return rng.lognormal(-sigma * sigma / 2, sigma, n)
+    elif distribution == "pareto":
+        if alpha <= 1:
+            raise ValueError("Pareto shape alpha must be > 1 for a finite mean")
+        # numpy's pareto is Lomax; shift to a classic Pareto with mean 1
+        return (rng.pareto(alpha, n) + 1) * ((alpha - 1) / alpha)
+    raise ValueError(f"Unknown burst distribution: {distribution!r}")
+
+
+def _interarrivals(rng, n, process, rate, batch_size):
+    # Gaps before each arrival (the first is measured from time 0)
+    if process == "uniform":
+        # n points spread uniformly over the span n arrivals need at ``rate``
+        times = np.sort(rng.uniform(0.0, n / rate, n))
+        return np.diff(times, prepend=0.0)
+    elif process == "poisson":
+        return rng.exponential(1 / rate, n)
+    elif process == "bursty":
+        # Batches with geometric sizes; batch starts form a Poisson process
+        # with the rate that keeps the overall arrival rate at ``rate``
+        sizes = rng.geometric(1 / batch_size, int(np.ceil(n / batch_size)) + 16)
+        while sizes.sum() < n:
+            sizes = np.concatenate([sizes, rng.geometric(1 / batch_size, len(sizes))])
+        gaps = np.zeros(n)
+        firsts = np.cumsum(sizes)[:-1]
+        firsts = firsts[firsts < n]
+        gaps[0] = rng.exponential(batch_size / rate)
+        gaps[firsts] = rng.exponential(batch_size / rate, len(firsts))
+        return gaps
+    raise ValueError(f"Unknown arrival process: {process!r}")
+
+
+def generate_workload(n, seed=None, arrival="poisson", burst="lognormal", mean_burst=10.0,
+                      load=0.9, type_mix=DEFAULT_TYPE_MIX, sigma=1.0, alpha=2.5, batch_size=8,
+                      start=0, first_pid=1, rng=None):
+    """A synthetic workload of ``n`` processes, sorted by arrival.
+
+    ``mean_burst`` is the mean over the whole mix; each type's mean is
+    scaled by its ``burst_scale``.  ``sigma`` is the lognormal shape,
+    ``alpha`` the Pareto shape and ``batch_size`` the mean number of
+    processes per batch for bursty arrivals.  ``start`` and
+    ``first_pid`` offset the arrival times and pids (used when
+    generating in chunks); pass ``rng`` to continue an existing stream.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    if load <= 0 or mean_burst <= 0:
+        raise ValueError("load and mean_burst must be positive")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    mix = np.asarray(type_mix, dtype=np.float64)
+    if len(mix) != len(TYPE_NAMES) or mix.min() < 0 or mix.sum() <= 0:
+        raise ValueError(f"type_mix needs {len(TYPE_NAMES)} non-negative weights")
+    mix = mix / mix.sum()
+
+    profiles = [TYPE_PROFILES[name] for name in TYPE_NAMES]
+    scale = np.array([p['burst_scale'] for p in profiles])
+    low = np.array([p['priority'][0] for p in profiles])
+    high = np.array([p['priority'][1] for p in profiles])
+
+    type_code = rng.choice(len(TYPE_NAMES), size=n, p=mix).astype(np.int8)
+    # Normalise the per-type scales so the mix-weighted mean is mean_burst
+    type_mean = mean_burst * scale / (mix @ scale)
+    bursts = np.maximum(1, np.rint(_unit_bursts(rng, n, burst, sigma, alpha) * type_mean[type_code]))
+    span = high - low + 1
+    priority = low[type_code] + (rng.random(n) * span[type_code]).astype(np.int64)
+
+    rate = load / mean_burst
+    times = np.cumsum(_interarrivals(rng, n, arrival, rate, batch_size))
+    arrivals = start + np.floor(times).astype(np.int64)
+
+    return Workload(arrivals, bursts, priority, type_code, np.arange(first_pid, first_pid + n))
+
+
+def generate_chunks(n, chunk_size=DEFAULT_CHUNK_SIZE, seed=None, **options):
+    """Yield a workload of ``n`` processes as arrival-ordered chunks.
+
+    Each chunk continues the previous one's clock and pid sequence, so the
+    stream can be written with ``traces.write_binary`` or replayed with
+    ``traces.stream_metrics`` without holding it all in memory.
+    """
+    rng = np.random.default_rng(seed)
+    start = options.pop('start', 0)
+    first_pid = options.pop('first_pid', 1)
+    done = 0
+    while done < n:
+        size = min(chunk_size, n - done)
+        chunk = generate_workload(size, rng=rng, start=start, first_pid=first_pid + done, **options)
+        done += size
+        start = int(chunk.arrival[-1])
+        yield chunk
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic workload trace.")
+    parser.add_argument("processes", type=int, help="number of processes")
+    parser.add_argument("--arrival", default="poisson", choices=ARRIVAL_PROCESSES)
+    parser.add_argument("--burst", default="lognormal", choices=BURST_DISTRIBUTIONS)
+    parser.add_argument("--mean-burst", type=float, default=10.0)
+    parser.add_argument("--load", type=float, default=0.9, help="offered load (1.0 = saturated)")
+    parser.add_argument("--type-mix", type=float, nargs=len(TYPE_NAMES), default=DEFAULT_TYPE_MIX,
+                        metavar="WEIGHT", help="weights for " + ", ".join(TYPE_NAMES))
+    parser.add_argument("--sigma", type=float, default=1.0, help="lognormal shape")
+    parser.add_argument("--alpha", type=float, default=2.5, help="Pareto shape (> 1)")
+    parser.add_argument("--batch-size", type=float, default=8, help="mean batch size for bursty arrivals")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", "-o", required=True, help="binary trace file to write")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    from traces import write_binary
+
+    chunks = generate_chunks(args.processes, args.chunk_size, seed=args.seed, arrival=args.arrival,
+                             burst=args.burst, mean_burst=args.mean_burst, load=args.load,
+                             type_mix=args.type_mix, sigma=args.sigma, alpha=args.alpha,
+                             batch_size=args.batch_size)
+    count = write_binary(args.output, chunks)
+    print(f"Wrote {count} processes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+
+from algorithms import run_algorithm
+
+
+def random_processes(seed, n=12):
+    # Small integer times so ties, simultaneous arrivals and idle gaps are common
+    rng = np.random.default_rng(seed)
+    span = int(rng.integers(1, 80))
+    arrival = rng.integers(0, span, n)
+    burst = rng.integers(1, 9, n)
+    priority = rng.integers(1, 4, n)
+    return [{'pid': pid, 'arrival': int(a), 'burst': int(b), 'priority': int(p), 'type': "CPU-Bound"}
+            for pid, (a, b, p) in enumerate(zip(arrival, burst, priority), 1)]
+
+
+def tick_schedule(processes, pick):
+    """Reference simulation one time unit at a time.
+
+    ``pick(ready, running, t)`` chooses the job to run for the next tick
+    from the arrived, unfinished jobs (``running`` is the one that ran the
+    last tick, or None).  Jobs are ``[arrival order, pid, remaining,
+    priority]`` lists.  Consecutive ticks of a job form one slice.
+    """
+    order = sorted(range(len(processes)), key=lambda i: processes[i]['arrival'])
+    pending = [[seq, processes[i]['pid'], processes[i]['burst'], processes[i]['priority'],
+                processes[i]['arrival']] for seq, i in enumerate(order)]
+    ready = []
+    slices = []
+    running = None
+    t = 0
+    while pending or ready:
+        while pending and pending[0][4] <= t:
+            ready.append(pending.pop(0))
+        if not ready:
+            running = None
+            t += 1
+            continue
+        job = pick(ready, running, t)
+        if slices and slices[-1][0] == job[1] and slices[-1][2] == t:
+            slices[-1][2] = t + 1
+        else:
+            slices.append([job[1], t, t + 1])
+        job[2] -= 1
+        t += 1
+        running = job
+        if not job[2]:
+            ready.remove(job)
+            running = None
+    return [tuple(s) for s in slices]
+
+
+def engine_schedule(algorithm, processes, **kwargs):
+    return [(s['pid'], s['start'], s['end']) for s in run_algorithm(algorithm, processes, **kwargs)]
+
+
+def sjf_pick(ready, running, t):
+    # Run to completion; then the shortest burst, ties in arrival order
+    if running is not None:
+        return running
+    return min(ready, key=lambda job: (job[2], job[0]))
+
+
+def srtf_pick(ready, running, t):
+    # Only a strictly shorter remaining time preempts
+    best = min(ready, key=lambda job: (job[2], job[0]))
+    if running is not None and best[2] >= running[2]:
+        return running
+    return best
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("algorithm, pick", [("SJF (Non-Preemptive)", sjf_pick),
+                                             ("SJF (Preemptive)", srtf_pick)])
+def test_sjf_matches_reference(algorithm, pick, seed):
+    processes = random_processes(seed)
+    assert engine_schedule(algorithm, processes) == tick_schedule(processes, pick)
+
+
+def test_srtf_ties_do_not_preempt():
+    processes = [{'pid': 1, 'arrival': 0, 'burst': 4, 'priority': 1, 'type': "CPU-Bound"},
+                 {'pid': 2, 'arrival': 2, 'burst': 2, 'priority': 1, 'type': "CPU-Bound"},
+                 {'pid': 3, 'arrival': 2, 'burst': 1, 'priority': 1, 'type': "CPU-Bound"},
+                 {'pid': 4, 'arrival': 9, 'burst': 3, 'priority': 1, 'type': "CPU-Bound"}]
+    # pid 2 ties with what pid 1 has left, pid 3 is shorter; idle from 7 to 9
+    assert engine_schedule("SJF (Preemptive)", processes) == [
+        (1, 0, 2), (3, 2, 3), (1, 3, 5), (2, 5, 7), (4, 9, 12)]
+
+
+def priority_pick(ready, running, t):
+    # Lower number first, ties in arrival order; run to completion
+    if running is not None:
+        return running
+    return min(ready, key=lambda job: (job[3], job[0]))
+
+
+def preemptive_priority_pick(ready, running, t):
+    # Arrivals come later in arrival order, so only a strictly higher
+    # priority takes over
+    return min(ready, key=lambda job: (job[3], job[0]))
+
+
+@pytest.mark.parametrize("seed", range(200))
+@pytest.mark.parametrize("algorithm, pick", [("Priority (Non-Preemptive)", priority_pick),
+                                             ("Priority (Preemptive)", preemptive_priority_pick)])
+def test_priority_matches_reference(algorithm, pick, seed):
+    processes = random_processes(seed)
+    assert engine_schedule(algorithm, processes) == tick_schedule(processes, pick)
+
+
+def mlfq_tick_schedule(processes, quantum):
+    """Reference MLFQ one time unit at a time, one slice per dispatch.
+
+    Levels get ``quantum``, 2x and 4x time slices.  Arrivals join the top
+    level and preempt a job running below it; a job that uses its whole
+    slice drops a level; every ``10 * 4 * quantum`` all waiting jobs go
+    back to the top.
+    """
+    quanta = (quantum, 2 * quantum, 4 * quantum)
+    boost_interval = 10 * quanta[-1]
+    order = sorted(processes, key=lambda p: p['arrival'])
+    pending = [[p['pid'], p['burst'], p['arrival']] for p in order]
+    queues = [[] for _ in quanta]
+    slices = []
+    next_boost = boost_interval
+    t = 0
+
+    def admit():
+        while pending and pending[0][2] <= t:
+            queues[0].append(pending.pop(0))
+
+    while pending or any(queues):
+        admit()
+        if not any(queues):
+            t += 1
+            continue
+        if t >= next_boost:
+            for queue in queues[1:]:
+                queues[0].extend(queue)
+                queue.clear()
+            next_boost = (t // boost_interval + 1) * boost_interval
+        level = next(lvl for lvl, queue in enumerate(queues) if queue)
+        job = queues[level].pop(0)
+        start = t
+        while True:
+            job[1] -= 1
+            t += 1
+            if not job[1]:
+                break
+            if t - start == quanta[level]:
+                admit()
+                queues[min(level + 1, len(quanta) - 1)].append(job)
+                break
+            if level and pending and pending[0][2] <= t:
+                admit()
+                queues[level].append(job)
+                break
+        slices.append((job[0], start, t))
+    return slices
+
+
+@pytest.mark.parametrize("seed", range(100))
+@pytest.mark.parametrize("quantum", [1, 2, 3, 5])
+def test_mlfq_matches_reference(quantum, seed):
+    processes = random_processes(seed)
+    assert (engine_schedule("Multilevel Feedback Queue", processes, quantum=quantum)
+            == mlfq_tick_schedule(processes, quantum))
+
+
+def test_mlfq_demotion():
+    processes = [{'pid': 1, 'arrival': 0, 'burst': 20, 'priority': 1, 'type': "CPU-Bound"},
+                 {'pid': 2, 'arrival': 5, 'burst': 1, 'priority': 1, 'type': "CPU-Bound"}]
+    # 2, 4 and 8 time unit slices; pid 2 preempts pid 1 on the second level,
+    # which keeps its level until it uses a whole slice
+    assert engine_schedule("Multilevel Feedback Queue", processes[:1], quantum=2) == [
+        (1, 0, 2), (1, 2, 6), (1, 6, 14), (1, 14, 20)]
+    assert engine_schedule("Multilevel Feedback Queue", processes, quantum=2) == [
+        (1, 0, 2), (1, 2, 5), (2, 5, 6), (1, 6, 10), (1, 10, 18), (1, 18, 21)]
@@ -0,0 +1,34 @@
+import threading
+from collections import Counter
+
+import pytest
+
+import instrument
+from algorithms import ALGORITHMS, IO_PROFILES, run_algorithm
+from synthetic import generate_workload
+
+
+def test_other_threads_not_counted():
+    workload = generate_workload(500, seed=1)
+    with instrument.instrumented() as instr:
+        worker = threading.Thread(target=run_algorithm, args=("Round Robin", workload))
+        worker.start()
+        worker.join()
+        assert not instr.counters
+        counts = Counter()
+        worker = threading.Thread(target=run_algorithm, args=("Round Robin", workload),
+                                  kwargs={'counts': counts})
+        worker.start()
+        worker.join()
+    assert not instr.counters
+    assert counts['runs'] == 1 and counts['queue_pop'] == counts['dispatches']
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_io_heaps_not_counted(algorithm):
+    # The I/O device heaps stay out of the counts: every run-queue pop is
+    # still a dispatch
+    counts = Counter()
+    run_algorithm(algorithm, generate_workload(500, seed=2), io_profiles=IO_PROFILES, counts=counts)
+    pops = counts['heap_pop'] + counts['queue_pop']
+    assert pops == (0 if algorithm == "FCFS" else counts['dispatches'])
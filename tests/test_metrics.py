@@ -0,0 +1,66 @@
+import pytest
+
+from algorithms import run_algorithm
+from metrics import calculate_metrics
+from synthetic import generate_workload
+from workload import Workload
+
+
+def reference_metrics(events, keys):
+    """The per-slice dict computation ``calculate_metrics`` replaced.
+
+    Slices are grouped by ``keys`` (one per slice).  Utilization is over
+    the span from the first arrival, as ``calculate_metrics`` defines it.
+    """
+    processes = {}
+    for key, event in zip(keys, events):
+        data = processes.setdefault(key, {'pid': event['pid'], 'arrival': event['arrival'],
+                                          'burst': event['burst'], 'starts': [], 'ends': []})
+        data['starts'].append(event['start'])
+        data['ends'].append(event['end'])
+    per_process = []
+    for data in processes.values():
+        start, end = min(data['starts']), max(data['ends'])
+        turnaround = end - data['arrival']
+        per_process.append({'PID': data['pid'], 'Arrival': data['arrival'], 'Burst': data['burst'],
+                            'Start': start, 'Finish': end, 'Waiting': turnaround - data['burst'],
+                            'Turnaround': turnaround, 'Response': start - data['arrival']})
+    n = len(per_process)
+    span = max(p['Finish'] for p in per_process) - min(p['Arrival'] for p in per_process)
+    busy = sum(event['end'] - event['start'] for event in events)
+    return per_process, {
+        'Waiting': sum(p['Waiting'] for p in per_process) / n,
+        'Turnaround': sum(p['Turnaround'] for p in per_process) / n,
+        'Response': sum(p['Response'] for p in per_process) / n,
+        'Utilization': busy / span * 100,
+    }
+
+
+def duplicate_pid_workload(seed):
+    # Light load leaves idle gaps; pids repeat every 7 processes
+    workload = generate_workload(60, seed=seed, load=0.6, mean_burst=6)
+    return Workload(workload.arrival, workload.burst, workload.priority, workload.type_code,
+                    workload.pid % 7)
+
+
+def assert_same(metrics, expected):
+    per_process, average = expected
+    assert list(metrics['per_process']) == per_process
+    assert metrics['average'] == pytest.approx(average)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("algorithm", ["FCFS", "SJF (Preemptive)", "Round Robin",
+                                       "Multilevel Feedback Queue"])
+def test_schedule_matches_reference(algorithm, seed):
+    # Processes are workload rows, so repeated pids stay separate
+    schedule = run_algorithm(algorithm, duplicate_pid_workload(seed), quantum=2)
+    assert_same(calculate_metrics(schedule), reference_metrics(list(schedule), schedule.row.tolist()))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("algorithm", ["SJF (Preemptive)", "Round Robin"])
+def test_slice_dicts_match_reference(algorithm, seed):
+    # Legacy slice dicts only carry pids, so repeated pids are one process
+    events = run_algorithm(algorithm, duplicate_pid_workload(seed), quantum=2).to_dicts()
+    assert_same(calculate_metrics(events), reference_metrics(events, [e['pid'] for e in events]))
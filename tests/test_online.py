@@ -0,0 +1,44 @@
+from itertools import groupby
+
+import pytest
+
+from algorithms import ALGORITHMS, run_algorithm
+from metrics import calculate_metrics
+from online import COMPLETE, DISPATCH, scheduler_for
+from synthetic import generate_workload
+
+
+def replay(scheduler, processes):
+    """Submit ``processes`` as the clock reaches them; returns the slices."""
+    events = []
+    for arrival, batch in groupby(processes, key=lambda p: p['arrival']):
+        scheduler.advance_to(arrival)
+        events.extend(scheduler.poll_events())
+        for process in batch:
+            scheduler.submit(process)
+    scheduler.drain()
+    events.extend(scheduler.poll_events())
+
+    slices = []
+    for time, kind, pid in events:
+        if kind == DISPATCH:
+            slices.append([pid, time, None])
+        else:
+            assert slices[-1][0] == pid and slices[-1][2] is None
+            slices[-1][2] = time
+    assert sum(kind == COMPLETE for _, kind, _ in events) == len(processes)
+    return [tuple(s) for s in slices]
+
+
+@pytest.mark.parametrize("arrival", ["poisson", "bursty"])
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_online_matches_batch(algorithm, arrival):
+    processes = generate_workload(400, seed=7, arrival=arrival, mean_burst=6).to_records()
+    scheduler = scheduler_for(algorithm, 2)
+    slices = replay(scheduler, processes)
+
+    batch = run_algorithm(algorithm, processes, quantum=2)
+    assert slices == [(s['pid'], s['start'], s['end']) for s in batch]
+    metrics = scheduler.metrics()
+    assert metrics['completed'] == len(processes)
+    assert metrics['average'] == pytest.approx(calculate_metrics(batch)['average'])
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from algorithms import ALGORITHMS
+from smp import MODES, run_smp
+from synthetic import generate_workload
+
+
+def idle_with_work(schedule):
+    """Time during which a core sat idle while a process was ready to run."""
+    workload = schedule.workload
+    finish = np.zeros(len(workload), dtype=np.int64)
+    np.maximum.at(finish, schedule.row, schedule.end)
+    n, m = len(workload), len(schedule)
+    times = np.concatenate([workload.arrival, finish, schedule.start, schedule.end])
+    present = np.concatenate([np.ones(n), -np.ones(n), np.zeros(2 * m)])
+    running = np.concatenate([np.zeros(2 * n), np.ones(m), -np.ones(m)])
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    present = np.cumsum(present[order])
+    running = np.cumsum(running[order])
+    # The state between two event times is the one after all events at the first
+    last = np.r_[times[1:] != times[:-1], True]
+    times, present, running = times[last], present[last], running[last]
+    idle = (running[:-1] < schedule.cpus) & (present[:-1] > running[:-1])
+    return int(np.diff(times)[idle].sum())
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+@pytest.mark.parametrize("seed", [0, 1])
+def test_work_conserving(algorithm, mode, seed):
+    # Never an idle core while a queue holds work (no affinity, stealing on)
+    workload = generate_workload(1000, seed=seed, load=0.9 * 8)
+    schedule = run_smp(algorithm, workload, cpus=8, quantum=2, mode=mode)
+    assert idle_with_work(schedule) == 0
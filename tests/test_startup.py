@@ -0,0 +1,19 @@
+import pytest
+
+from startup_budget import BUDGETS, measure
+
+
+@pytest.mark.parametrize("module", ["algorithms", "metrics", "main"])
+def test_import_within_budget(module):
+    if module == "main":
+        pytest.importorskip("tkinter")
+    budget, forbidden = BUDGETS[module]
+    elapsed, _, loaded = measure(module, runs=3)
+    assert elapsed <= budget
+    assert not set(forbidden) & loaded
+
+
+def test_main_leaves_heavy_packages_unloaded():
+    pytest.importorskip("tkinter")
+    _, _, loaded = measure("main", runs=1)
+    assert 'sklearn' not in loaded and 'matplotlib' not in loaded
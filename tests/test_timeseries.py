@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from algorithms import IO_PROFILES, run_algorithm
+from metrics import process_metrics
+from smp import run_smp
+from synthetic import generate_workload
+from timeseries import schedule_series
+
+
+def ready_per_unit(schedule):
+    """Runnable-but-not-running process count over each time unit."""
+    per_process = process_metrics(schedule)
+    origin, end = int(per_process.arrival.min()), int(per_process.finish.max())
+    steps = np.zeros(end - origin + 1, dtype=np.int64)
+    intervals = schedule.io_intervals
+    for times, sign in [(per_process.arrival, 1), (per_process.finish, -1),
+                        (schedule.start, -1), (schedule.end, 1),
+                        (intervals[:, 1], -1), (intervals[:, 2], 1)]:
+        np.add.at(steps, np.asarray(times) - origin, sign)
+    return np.cumsum(steps)[:-1]
+
+
+def simulate(cpus, algorithm, processes):
+    if cpus == 1:
+        return run_algorithm(algorithm, processes, quantum=4, io_profiles=IO_PROFILES)
+    return run_smp(algorithm, processes, cpus, quantum=4, io_profiles=IO_PROFILES)
+
+
+@pytest.mark.parametrize("cpus", [1, 2])
+def test_blocked_process_is_not_ready(cpus):
+    processes = [{'pid': 1, 'arrival': 0, 'burst': 20, 'priority': 1, 'type': "I/O-Bound"}]
+    schedule = simulate(cpus, "Round Robin", processes)
+    assert schedule.blocked.sum() > 0
+    assert not schedule_series(schedule, window=1)['ready_queue'].any()
+
+
+@pytest.mark.parametrize("cpus", [1, 3])
+@pytest.mark.parametrize("algorithm", ["Round Robin", "Multilevel Feedback Queue"])
+def test_ready_queue_with_io(cpus, algorithm):
+    schedule = simulate(cpus, algorithm, generate_workload(300, seed=3))
+    expected = ready_per_unit(schedule)
+    assert expected.min() >= 0
+    np.testing.assert_array_equal(schedule_series(schedule, window=1)['ready_queue'], expected)
@@ -0,0 +1,16 @@
+import pytest
+
+from traces import iter_trace_chunks
+
+
+def test_csv_types(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("pid,arrival,burst,type\n1,0,3,CPU-Bound\n2,1,2,\n3,2,2, Interactive\n")
+    assert [chunk.type_code.tolist() for chunk in iter_trace_chunks(str(path))] == [[0, 0, 2]]
+
+
+def test_csv_rejects_unknown_type(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("pid,arrival,burst,type\n1,0,3,CPU-Bound\n2,1,2,IO-Bound\n")
+    with pytest.raises(ValueError, match="unknown process type 'IO-Bound'"):
+        list(iter_trace_chunks(str(path)))
@@ -0,0 +1,14 @@
+import pytest
+
+from workload import TYPE_CODES, Workload
+
+
+def test_from_records_types():
+    records = [{'pid': 1, 'arrival': 0, 'burst': 2},
+               {'pid': 2, 'arrival': 1, 'burst': 3, 'type': "Interactive"}]
+    assert Workload.from_records(records).type_code.tolist() == [0, TYPE_CODES["Interactive"]]
+
+
+def test_from_records_rejects_unknown_type():
+    with pytest.raises(ValueError, match="Unknown process type: 'IO-Bound'"):
+        Workload.from_records([{'pid': 1, 'arrival': 0, 'burst': 2, 'type': "IO-Bound"}])
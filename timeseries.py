@@ -0,0 +1,170 @@
+"""Windowed time series of a schedule: ready-queue length, utilization and
+context switches.
+
+The timeline is cut into fixed windows of ``window`` time units from
+``origin``.  For each window ``TimeSeries`` reports:
+
+* ``ready_queue``: mean number of processes that have arrived and are
+  runnable but not running: not finished, and not blocked on I/O;
+* ``utilization``: percentage of the window the cores were busy;
+* ``context_switches``: dispatches of a different process than the one
+  that last ran on that core.
+
+The first two are exact time averages.  Each counts something that
+steps up or down at event times, so its integral over a window is a sum
+of ramps ``max(0, t - event)``.  Each ramp adds a partial amount to the
+window the event falls in and a full window to every later window.  The
+latter is kept as a slope count that one ``cumsum`` turns into totals.
+Events are therefore added as NumPy arrays in any order and any number
+of batches, which is how ``traces.stream_metrics`` feeds it.
+"""
+import csv
+
+import numpy as np
+
+DEFAULT_WINDOWS = 100       # windows over a schedule when no width is given
+SERIES_FIELDS = ['time', 'ready_queue', 'utilization', 'context_switches']
+
+
+class _Integral:
+    # Per-window integral of a step function built from +1/-1 ramps
+
+    __slots__ = ('partial', 'slope')
+
+    def __init__(self):
+        self.partial = np.zeros(0, dtype=np.int64)
+        self.slope = np.zeros(1, dtype=np.int64)
+
+    def grow(self, windows):
+        extra = windows - len(self.partial)
+        if extra > 0:
+            self.partial = np.concatenate([self.partial, np.zeros(extra, dtype=np.int64)])
+            self.slope = np.concatenate([self.slope, np.zeros(extra, dtype=np.int64)])
+
+    def add(self, index, remainder, sign):
+        # ``remainder``: time from each event to the end of its window
+        np.add.at(self.partial, index, sign * remainder)
+        np.add.at(self.slope, index + 1, sign)
+
+    def totals(self, windows, width):
+        return self.partial[:windows] + width * np.cumsum(self.slope)[:windows]
+
+
+class TimeSeries:
+    """Accumulates schedule events into per-window totals."""
+
+    def __init__(self, window, origin=0, cpus=1):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = int(window)
+        self.origin = int(origin)
+        self.cpus = cpus
+        self._present = _Integral()     # arrived and not finished
+        self._busy = _Integral()        # running
+        self._blocked = _Integral()     # waiting for or doing I/O
+        self._switches = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._switches)
+
+    def _index(self, times):
+        offset = np.asarray(times, dtype=np.int64) - self.origin
+        if len(offset) and offset.min() < 0:
+            raise ValueError("Event before the start of the time series")
+        index = offset // self.window
+        if len(index):
+            windows = int(index.max()) + 1
+            if windows > len(self):
+                self._present.grow(windows)
+                self._busy.grow(windows)
+                self._blocked.grow(windows)
+                self._switches = np.concatenate(
+                    [self._switches, np.zeros(windows - len(self), dtype=np.int64)])
+        return index, (index + 1) * self.window - offset
+
+    def add_arrivals(self, times):
+        self._present.add(*self._index(times), 1)
+
+    def add_completions(self, times):
+        self._present.add(*self._index(times), -1)
+
+    def add_slices(self, start, end):
+        """Count the busy time of slices ``[start, end)``."""
+        self._busy.add(*self._index(start), 1)
+        self._busy.add(*self._index(end), -1)
+
+    def add_blocked(self, start, end):
+        """Count processes blocked on I/O over ``[start, end)``."""
+        self._blocked.add(*self._index(start), 1)
+        self._blocked.add(*self._index(end), -1)
+
+    def add_switches(self, times):
+        index, _ = self._index(times)
+        self._switches += np.bincount(index, minlength=len(self))
+
+    def to_dict(self, end=None):
+        """The series as parallel arrays, one element per window.
+
+        ``end`` (usually the last completion) drops windows starting at or
+        after it, which only hold the final events.
+        """
+        n = len(self)
+        if end is not None:
+            n = min(n, max(1, -(-(int(end) - self.origin) // self.window)))
+        width = self.window
+        busy = self._busy.totals(n, width)
+        return {
+            'window': width,
+            'time': self.origin + width * np.arange(n, dtype=np.int64),
+            'ready_queue': (self._present.totals(n, width) - busy
+                            - self._blocked.totals(n, width)) / width,
+            'utilization': busy / (width * self.cpus) * 100,
+            'context_switches': self._switches[:n].copy(),
+        }
+
+
+def switch_times(schedule):
+    """Start times of the slices that switch their core to another process."""
+    if schedule.cpu is None:
+        order = np.arange(len(schedule))
+        same_core = np.ones(max(len(schedule) - 1, 0), dtype=bool)
+    else:
+        # Schedules from smp.py interleave cores; walk each core in time order
+        order = np.lexsort((schedule.start, schedule.cpu))
+        cpu = schedule.cpu[order]
+        same_core = cpu[1:] == cpu[:-1]
+    row = schedule.row[order]
+    switched = same_core & (row[1:] != row[:-1])
+    return schedule.start[order[1:][switched]]
+
+
+def schedule_series(schedule, window=None, windows=DEFAULT_WINDOWS):
+    """``TimeSeries.to_dict()`` of a whole schedule.
+
+    Without a ``window`` width, the span from the first arrival to the
+    last completion is cut into about ``windows`` windows.
+    """
+    from metrics import process_metrics
+
+    per_process = process_metrics(schedule)
+    if not len(per_process):
+        return None
+    origin = int(per_process.arrival.min())
+    end = int(per_process.finish.max())
+    if window is None:
+        window = max(1, -(-(end - origin) // windows))
+    series = TimeSeries(window, origin, schedule.cpus)
+    series.add_arrivals(per_process.arrival)
+    series.add_completions(per_process.finish)
+    series.add_slices(schedule.start, schedule.end)
+    if schedule.io_intervals is not None:
+        series.add_blocked(schedule.io_intervals[:, 1], schedule.io_intervals[:, 2])
+    series.add_switches(switch_times(schedule))
+    return series.to_dict(end)
+
+
+def write_csv(series, out):
+    """Write a series dict as CSV, one row per window."""
+    writer = csv.writer(out)
+    writer.writerow(SERIES_FIELDS)
+    writer.writerows(zip(*(series[name].tolist() for name in SERIES_FIELDS)))
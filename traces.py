@@ -0,0 +1,377 @@
+"""Streaming ingestion of large workload traces.
+
+Traces are read lazily as arrival-ordered ``Workload`` chunks and flattened
+into the ``(key, arrival, burst, priority)`` job stream the engine's
+``*_slices`` generators consume, so replaying a trace holds one chunk plus
+the scheduler's ready queue in memory rather than the whole trace.
+
+Supported inputs:
+
+* CSV with a header naming at least ``arrival`` and ``burst`` (optionally
+  ``pid``, ``priority`` and ``type``), read in chunks with ``np.loadtxt``.
+* Parquet with the same column names, read batch by batch via pyarrow
+  (only imported when a Parquet file is opened).
+* A fixed-width binary format (``write_binary``) that is opened with
+  ``np.memmap``, so re-runs skip parsing entirely.
+
+Run ``python traces.py --help`` to replay or convert a trace from the
+command line.
+"""
+import argparse
+import os
+import sys
+from array import array
+from contextlib import ExitStack
+from itertools import islice
+
+import numpy as np
+
+import instrument
+from algorithms import ALGORITHMS, DEFAULT_QUANTUM, iter_slices
+from sketch import QuantileSketch
+from timeseries import TimeSeries, write_csv
+from workload import TYPE_CODES, Workload
+
+DEFAULT_CHUNK_SIZE = 65536
+# Completed processes buffered before stream_metrics feeds its sketches
+FLUSH_SIZE = 4096
+
+# Binary layout: 16-byte header (magic + little-endian uint64 record
+# count) followed by fixed-width 32-byte records.
+BINARY_MAGIC = b"CPUWKLD1"
+BINARY_HEADER_SIZE = 16
+RECORD_DTYPE = np.dtype({
+    'names': ['arrival', 'burst', 'pid', 'priority', 'type_code'],
+    'formats': ['<i8', '<i8', '<i8', '<i4', 'i1'],
+    'offsets': [0, 8, 16, 24, 28],
+    'itemsize': 32,
+})
+
+
+def _type_codes(names, path):
+    # An empty type means CPU-Bound, as a process dict without one does
+    unique, inverse = np.unique(names, return_inverse=True)
+    for name in unique.tolist():
+        if name and name not in TYPE_CODES:
+            raise ValueError(f"{path}: unknown process type {name!r}")
+    codes = np.array([TYPE_CODES.get(name, 0) for name in unique.tolist()], dtype=np.int8)
+    return codes[inverse.reshape(-1)]
+
+
+def iter_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``Workload`` chunks of at most ``chunk_size`` rows from a CSV trace."""
+    with open(path, newline="") as f:
+        header = [name.strip().lower() for name in f.readline().split(",")]
+        try:
+            arrival_col = header.index('arrival')
+            burst_col = header.index('burst')
+        except ValueError:
+            raise ValueError(f"{path}: CSV header must name 'arrival' and 'burst' columns") from None
+        numeric = [arrival_col, burst_col]
+        if 'priority' in header:
+            numeric.append(header.index('priority'))
+        text = [header.index(name) for name in ('pid', 'type') if name in header]
+
+        row = 0
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                return
+            values = np.loadtxt(lines, delimiter=",", dtype=np.int64, usecols=numeric, ndmin=2)
+            n = len(values)
+            priority = values[:, 2] if len(numeric) == 3 else None
+            pid = np.arange(row + 1, row + n + 1)
+            type_code = None
+            if text:
+                strings = np.loadtxt(lines, delimiter=",", dtype=str, usecols=text, ndmin=2)
+                strings = np.char.strip(strings)
+                column = 0
+                if 'pid' in header:
+                    pid = strings[:, column]
+                    column += 1
+                if 'type' in header:
+                    type_code = _type_codes(strings[:, column], path)
+            yield Workload(values[:, 0], values[:, 1], priority, type_code, pid)
+            row += n
+
+
+def iter_parquet_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``Workload`` chunks from a Parquet trace (requires pyarrow)."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet traces requires pyarrow (pip install pyarrow)") from None
+
+    parquet = pq.ParquetFile(path)
+    names = set(parquet.schema_arrow.names)
+    columns = [name for name in ('pid', 'arrival', 'burst', 'priority', 'type') if name in names]
+    row = 0
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+        data = {name: batch.column(name).to_numpy(zero_copy_only=False) for name in columns}
+        n = batch.num_rows
+        type_code = _type_codes(data['type'].astype(str), path) if 'type' in data else None
+        yield Workload(data['arrival'], data['burst'], data.get('priority'), type_code,
+                       data.get('pid', np.arange(row + 1, row + n + 1)))
+        row += n
+
+
+def open_binary(path):
+    """Memory-map a binary trace as a ``Workload`` without reading it."""
+    with open(path, "rb") as f:
+        header = f.read(BINARY_HEADER_SIZE)
+    if len(header) != BINARY_HEADER_SIZE or header[:8] != BINARY_MAGIC:
+        raise ValueError(f"{path}: not a binary workload trace")
+    count = int.from_bytes(header[8:], "little")
+    if count == 0:
+        records = np.zeros(0, dtype=RECORD_DTYPE)
+    else:
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=BINARY_HEADER_SIZE,
+                            shape=(count,))
+    return Workload(records['arrival'], records['burst'], records['priority'],
+                    records['type_code'], records['pid'])
+
+
+def iter_binary_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield memory-mapped ``Workload`` chunks of a binary trace."""
+    workload = open_binary(path)
+    for lo in range(0, len(workload), chunk_size):
+        yield workload.take(slice(lo, lo + chunk_size))
+
+
+def pack_records(chunk, row=0):
+    """``chunk`` as ``RECORD_DTYPE`` records.
+
+    String pids are replaced by row numbers, counting from ``row + 1``.
+    """
+    records = np.zeros(len(chunk), dtype=RECORD_DTYPE)
+    records['arrival'] = chunk.arrival
+    records['burst'] = chunk.burst
+    records['priority'] = chunk.priority
+    records['type_code'] = chunk.type_code
+    if np.issubdtype(chunk.pid.dtype, np.integer):
+        records['pid'] = chunk.pid
+    else:
+        records['pid'] = np.arange(row + 1, row + len(chunk) + 1)
+    return records
+
+
+def write_binary(path, chunks):
+    """Write a ``Workload`` (or an iterable of chunks) as a binary trace.
+
+    Pids must be integers; string pids are replaced by the row number.
+    Returns the number of records written.
+    """
+    if isinstance(chunks, Workload):
+        chunks = [chunks]
+    count = 0
+    with open(path, "wb") as f:
+        f.write(BINARY_MAGIC + bytes(8))
+        for chunk in chunks:
+            f.write(pack_records(chunk, count).tobytes())
+            count += len(chunk)
+        f.seek(8)
+        f.write(count.to_bytes(8, "little"))
+    return count
+
+
+def iter_trace_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Pick the chunk reader for ``path`` from its extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return iter_csv_chunks(path, chunk_size)
+    if ext in (".parquet", ".pq"):
+        return iter_parquet_chunks(path, chunk_size)
+    return iter_binary_chunks(path, chunk_size)
+
+
+def iter_jobs(chunks):
+    """Flatten workload chunks into ``(pid, arrival, burst, priority)`` jobs.
+
+    Raises ``ValueError`` if arrivals ever go backwards, since the engines
+    need the trace in arrival order.
+    """
+    last = None
+    for chunk in instrument.timed(chunks, 'ingest'):
+        if not len(chunk):
+            continue
+        with instrument.phase('ingest'):
+            arrival = chunk.arrival
+            if (last is not None and arrival[0] < last) or (np.diff(arrival) < 0).any():
+                raise ValueError("Trace is not sorted by arrival time")
+            last = arrival[-1]
+            jobs = zip(chunk.pid.tolist(), arrival.tolist(), chunk.burst.tolist(),
+                       chunk.priority.tolist())
+        yield from jobs
+
+
+def stream_schedule(algorithm, chunks, quantum=DEFAULT_QUANTUM):
+    """Lazily yield ``(pid, start, end)`` slices for a chunked trace."""
+    return iter_slices(algorithm, iter_jobs(chunks), quantum)
+
+
+def stream_metrics(algorithm, chunks, quantum=DEFAULT_QUANTUM, window=None, counts=None):
+    """Average and percentile metrics of a chunked trace without
+    materialising the schedule.
+
+    Only processes that have arrived but not finished are tracked, and
+    percentiles come from fixed-size quantile sketches, so memory follows
+    the ready queue rather than the trace length.  With a ``window`` width
+    the result also holds a ``timeseries.TimeSeries`` dict under
+    ``'series'``.  ``counts`` works as in ``algorithms.run_algorithm``.
+    """
+    live = {}
+    first_arrival = []
+    # [arrival, burst, first start, finish] per completed process, and
+    # (start, end) per slice and switch times when windowed; all turned
+    # into metrics a buffer at a time by flush()
+    done = []
+    slice_times = array('q')
+    switches = array('q')
+    names = ('Waiting', 'Turnaround', 'Response')
+    sketches = {name: QuantileSketch() for name in names}
+    totals = dict.fromkeys(names, 0)
+    series = []
+    count = 0
+    makespan = None
+
+    def jobs():
+        # Re-key by sequence number so duplicate pids can't collide
+        for seq, (pid, arrival, burst, priority) in enumerate(iter_jobs(chunks)):
+            if not seq:
+                first_arrival.append(arrival)
+            live[seq] = [arrival, burst, None, 0]
+            yield seq, arrival, burst, priority
+
+    @instrument.phase('metrics')
+    def flush():
+        nonlocal count, makespan
+        if done:
+            arrival, burst, first_start, finish = np.array(done, dtype=np.int64).T
+            turnaround = finish - arrival
+            for name, values in zip(names, (turnaround - burst, turnaround, first_start - arrival)):
+                sketches[name].add(values)
+                totals[name] += int(values.sum())
+            count += len(finish)
+            last = int(finish.max())
+            makespan = last if makespan is None else max(makespan, last)
+            if window is not None:
+                if not series:
+                    series.append(TimeSeries(window, first_arrival[0]))
+                series[0].add_arrivals(arrival)
+                series[0].add_completions(finish)
+        if window is not None and series:
+            start, end = np.frombuffer(slice_times, dtype=np.int64).reshape(-1, 2).T
+            series[0].add_slices(start, end)
+            series[0].add_switches(np.frombuffer(switches, dtype=np.int64))
+        # Drop the views before emptying the buffers
+        start = end = None
+        del done[:], slice_times[:], switches[:]
+
+    slices = busy = 0
+    previous = None
+    # Plain locals: the loop runs once per slice
+    windowed = window is not None
+    record = done.append
+    until_flush = FLUSH_SIZE
+
+    if counts is None:
+        counts = instrument.counts_for(algorithm)
+    with instrument.phase('schedule'):
+        for seq, start, end in iter_slices(algorithm, jobs(), quantum, counts=counts):
+            slices += 1
+            busy += end - start
+            if windowed:
+                slice_times.extend((start, end))
+                if previous is not None and seq != previous:
+                    switches.append(start)
+                previous = seq
+            job = live[seq]
+            if job[2] is None:
+                job[2] = start
+            job[3] += end - start
+            if job[3] >= job[1]:
+                # The served-time slot is no longer needed; reuse it for the finish
+                job = live.pop(seq)
+                job[3] = end
+                record(job)
+                until_flush -= 1
+                if not until_flush:
+                    flush()
+                    until_flush = FLUSH_SIZE
+        flush()
+        if counts is not None:
+            instrument.count_run(counts, slices, count)
+
+    if not count:
+        return None
+    span = makespan - first_arrival[0]
+    result = {
+        'processes': count,
+        'slices': slices,
+        'makespan': makespan,
+        'average': {
+            'Waiting': totals['Waiting'] / count,
+            'Turnaround': totals['Turnaround'] / count,
+            'Response': totals['Response'] / count,
+            'Utilization': (busy / span) * 100 if span > 0 else 0.0
+        },
+        'percentiles': {name: sketch.percentiles() for name, sketch in sketches.items()}
+    }
+    if series:
+        result['series'] = series[0].to_dict(makespan)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay or convert a workload trace.")
+    parser.add_argument("trace", help="CSV, Parquet or binary trace, sorted by arrival")
+    parser.add_argument("--algorithm", default="FCFS", choices=ALGORITHMS, metavar="ALGORITHM")
+    parser.add_argument("--quantum", type=int, default=DEFAULT_QUANTUM)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--convert", metavar="OUT", help="write the trace as a binary file instead of replaying it")
+    parser.add_argument("--window", type=int, default=None,
+                        help="width of the time-series windows (default: no time series)")
+    parser.add_argument("--timeseries", metavar="CSV",
+                        help="write ready-queue length, utilization and context switches per window")
+    parser.add_argument("--stats", action="store_true",
+                        help="print heap, queue and dispatch counts and the time spent per phase")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the replay: cProfile stats for a .prof file, "
+                             "otherwise collapsed stacks for a flame graph")
+    args = parser.parse_args(argv)
+
+    chunks = iter_trace_chunks(args.trace, args.chunk_size)
+    if args.convert:
+        count = write_binary(args.convert, chunks)
+        print(f"Wrote {count} processes to {args.convert}")
+        return
+
+    if args.timeseries and args.window is None:
+        parser.error("--timeseries needs --window")
+    with ExitStack() as stack:
+        instr = stack.enter_context(instrument.instrumented()) if args.stats else None
+        if args.profile:
+            stack.enter_context(instrument.profiled(args.profile))
+        result = stream_metrics(args.algorithm, chunks, args.quantum, args.window)
+    if instr is not None:
+        print(instr.report())
+    if args.profile:
+        print(f"Wrote profile to {args.profile}")
+    if result is None:
+        print("Trace is empty")
+        return
+    print(f"{args.algorithm}: {result['processes']} processes, {result['slices']} slices, "
+          f"makespan {result['makespan']}")
+    for name, value in result['average'].items():
+        unit = "%" if name == 'Utilization' else ""
+        print(f"  {name}: {value:.2f}{unit}")
+    for name, values in result['percentiles'].items():
+        print(f"  {name} " + ", ".join(f"{p}: {v:.2f}" for p, v in values.items()))
+    if args.timeseries:
+        with open(args.timeseries, "w", newline="") as f:
+            write_csv(result['series'], f)
+        print(f"Wrote {len(result['series']['time'])} windows to {args.timeseries}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Background tasks for the GUI.
+
+``BackgroundTask`` runs a function on a daemon thread so long simulations
+don't block the Tk main loop.  The function receives a ``progress``
+callable to report completion (0.0-1.0); once the task is cancelled the
+next ``progress`` call raises ``Cancelled``, which unwinds the worker.
+Nothing here touches Tk: the GUI polls ``state``/``progress`` from a
+``root.after`` callback and picks up ``result`` on the main thread.
+"""
+import threading
+
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class Cancelled(Exception):
+    pass
+
+
+class BackgroundTask:
+
+    def __init__(self, fn, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.state = RUNNING
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def finished(self):
+        return self.state != RUNNING
+
+    def report(self, fraction):
+        # Called from the worker thread
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.progress = fraction
+
+    def _run(self):
+        try:
+            result = self.fn(self.report, *self.args, **self.kwargs)
+        except Cancelled:
+            self.state = CANCELLED
+        except Exception as e:
+            self.error = e
+            self.state = FAILED
+        else:
+            self.result = result
+            self.progress = 1.0
+            # Publish the result before the state change the GUI polls for
+            self.state = DONE
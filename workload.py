@@ -0,0 +1,203 @@
+"""Columnar process tables and schedule logs.
+
+``Workload`` stores processes as parallel NumPy arrays (structure of
+arrays) instead of one dict per process, and ``Schedule`` stores Gantt
+slices as parallel start/end/row arrays.  Both convert back to the dict
+records used by the GUI only when asked to, one row at a time.
+"""
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+
+TYPE_NAMES = ("CPU-Bound", "I/O-Bound", "Interactive")
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+
+def _type_code(name):
+    code = TYPE_CODES.get(name)
+    if code is None:
+        raise ValueError(f"Unknown process type: {name!r}")
+    return code
+
+
+class Workload:
+    """A process table held as parallel arrays, one row per process."""
+
+    __slots__ = ('pid', 'arrival', 'burst', 'priority', 'type_code')
+
+    def __init__(self, arrival, burst, priority=None, type_code=None, pid=None):
+        self.arrival = np.asarray(arrival, dtype=np.int64)
+        n = len(self.arrival)
+        self.burst = np.asarray(burst, dtype=np.int64)
+        if priority is None:
+            priority = np.ones(n, dtype=np.int32)
+        self.priority = np.asarray(priority, dtype=np.int32)
+        if type_code is None:
+            type_code = np.zeros(n, dtype=np.int8)
+        self.type_code = np.asarray(type_code, dtype=np.int8)
+        if pid is None:
+            pid = np.arange(1, n + 1)
+        self.pid = np.asarray(pid)
+
+        for name in ('burst', 'priority', 'type_code', 'pid'):
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"Workload column {name!r} has the wrong length")
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a workload from a list of process dicts.
+
+        A missing ``'type'`` means CPU-Bound; an unknown one raises
+        ``ValueError``.
+        """
+        records = list(records)
+        return cls(
+            arrival=[p['arrival'] for p in records],
+            burst=[p['burst'] for p in records],
+            priority=[p.get('priority', 1) for p in records],
+            type_code=[_type_code(p.get('type', TYPE_NAMES[0])) for p in records],
+            pid=[p['pid'] for p in records],
+        )
+
+    def __len__(self):
+        return len(self.arrival)
+
+    def record(self, i):
+        return {
+            'pid': self.pid[i].item(),
+            'arrival': int(self.arrival[i]),
+            'burst': int(self.burst[i]),
+            'priority': int(self.priority[i]),
+            'type': TYPE_NAMES[self.type_code[i]]
+        }
+
+    def to_records(self):
+        pids = self.pid.tolist()
+        types = [TYPE_NAMES[code] for code in self.type_code.tolist()]
+        return [
+            {'pid': pid, 'arrival': arrival, 'burst': burst, 'priority': priority, 'type': ptype}
+            for pid, arrival, burst, priority, ptype in zip(
+                pids, self.arrival.tolist(), self.burst.tolist(), self.priority.tolist(), types)
+        ]
+
+    def take(self, rows):
+        """A new workload holding only ``rows`` (indices or a boolean mask)."""
+        return Workload(self.arrival[rows], self.burst[rows], self.priority[rows],
+                        self.type_code[rows], self.pid[rows])
+
+    def arrival_order(self):
+        """Row indices sorted by arrival time, ties kept in input order."""
+        return np.argsort(self.arrival, kind='stable')
+
+
+def as_workload(processes):
+    """Accept either a ``Workload`` or a list of process dicts."""
+    if isinstance(processes, Workload):
+        return processes
+    return Workload.from_records(processes)
+
+
+class ScheduleLog:
+    """Append-only slice log the scheduling engines write into.
+
+    Slices are packed as ``(row, start, end)`` triples into a single
+    ``array('q')``, so the hot loops pay one ``extend`` call per slice and
+    ``freeze`` can hand the buffer to NumPy without copying.
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self):
+        self._data = array('q')
+
+    @property
+    def extend(self):
+        return self._data.extend
+
+    def __len__(self):
+        return len(self._data) // 3
+
+    def freeze(self, workload, order=None):
+        """Build the ``Schedule``; ``order`` maps logged rows back to ``workload``."""
+        if self._data:
+            table = np.frombuffer(self._data, dtype=np.int64).reshape(-1, 3)
+        else:
+            table = np.empty((0, 3), dtype=np.int64)
+        rows = table[:, 0]
+        if order is not None:
+            rows = order[rows]
+        return Schedule(workload, table[:, 1], table[:, 2], rows)
+
+
+class Schedule(Sequence):
+    """Gantt slices as parallel ``start``/``end``/``row`` arrays.
+
+    ``row`` indexes into ``workload``.  Indexing or iterating yields the
+    legacy slice dicts (``pid``, ``start``, ``end``, ``arrival``, ``burst``)
+    built on demand; slicing returns another ``Schedule`` over views of the
+    same arrays.
+
+    Multi-core schedules (see ``smp.py``) also carry the core each slice
+    ran on in ``cpu`` and the core count in ``cpus``; their dicts gain a
+    ``cpu`` key.  Schedules simulated with I/O bursts carry ``blocked``:
+    the time each workload row spent waiting for or doing I/O, and
+    ``io_intervals``: one ``(row, start, end)`` row per I/O request.
+    """
+
+    __slots__ = ('workload', 'start', 'end', 'row', 'cpu', 'cpus', 'blocked', 'io_intervals')
+
+    def __init__(self, workload, start, end, row, cpu=None, cpus=1, blocked=None,
+                 io_intervals=None):
+        self.workload = workload
+        self.start = start
+        self.end = end
+        self.row = row
+        self.cpu = cpu
+        self.cpus = cpus
+        self.blocked = blocked
+        self.io_intervals = io_intervals
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            cpu = self.cpu[i] if self.cpu is not None else None
+            return Schedule(self.workload, self.start[i], self.end[i], self.row[i], cpu, self.cpus,
+                            self.blocked, self.io_intervals)
+        row = self.row[i]
+        wl = self.workload
+        event = {
+            'pid': wl.pid[row].item(),
+            'start': int(self.start[i]),
+            'end': int(self.end[i]),
+            'arrival': int(wl.arrival[row]),
+            'burst': int(wl.burst[row])
+        }
+        if self.cpu is not None:
+            event['cpu'] = int(self.cpu[i])
+        return event
+
+    def __iter__(self):
+        wl = self.workload
+        rows = self.row
+        pids = wl.pid[rows].tolist()
+        arrivals = wl.arrival[rows].tolist()
+        bursts = wl.burst[rows].tolist()
+        if self.cpu is not None:
+            for pid, start, end, arrival, burst, cpu in zip(
+                    pids, self.start.tolist(), self.end.tolist(), arrivals, bursts, self.cpu.tolist()):
+                yield {'pid': pid, 'start': start, 'end': end, 'arrival': arrival, 'burst': burst,
+                       'cpu': cpu}
+            return
+        for pid, start, end, arrival, burst in zip(
+                pids, self.start.tolist(), self.end.tolist(), arrivals, bursts):
+            yield {'pid': pid, 'start': start, 'end': end, 'arrival': arrival, 'burst': burst}
+
+    def to_dicts(self):
+        return list(self)
+
+    @property
+    def pid(self):
+        return self.workload.pid[self.row]